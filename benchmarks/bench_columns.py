@@ -0,0 +1,81 @@
+""" Compare pulling columns of numbers out of a log by making NMEA objects
+    with NMEAStream.iter_objects against parse_columns, for time and peak
+    memory.
+
+    Run from the root of the repository:
+
+        python benchmarks/bench_columns.py [size in MB]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, '.')
+
+from pynmea.columns import numpy, parse_columns
+from pynmea.streamer import NMEAStream
+
+
+SOURCE = os.path.join('tests', 'test_data', 'test_data.gps')
+
+
+def make_data(size_mb):
+    with open(SOURCE, 'r') as source_fd:
+        block = source_fd.read()
+    return block * (size_mb * 1024 * 1024 // len(block) + 1)
+
+
+SEN_TYPES = ('GPGGA', 'GPRMC')
+NUMBERS = {'GPGGA': ('timestamp', 'latitude', 'longitude', 'num_sats',
+                     'horizontal_dil', 'antenna_altitude'),
+           'GPRMC': ('timestamp', 'lat', 'lon', 'spd_over_grnd',
+                     'true_course')}
+
+
+def by_objects(data):
+    """ What it takes by hand: keep the objects, then build each column """
+    kept = dict((sen_type, []) for sen_type in SEN_TYPES)
+    for nmea_ob in NMEAStream().iter_objects(data=data):
+        if nmea_ob.sen_type in kept:
+            kept[nmea_ob.sen_type].append(nmea_ob)
+    return dict((sen_type, dict((name, [float(getattr(ob, name))
+                                        for ob in kept[sen_type]])
+                                for name in NUMBERS[sen_type]))
+                for sen_type in SEN_TYPES)
+
+
+def by_columns(data, use_numpy):
+    return parse_columns(data=data, sen_types=SEN_TYPES, use_numpy=use_numpy)
+
+
+def measure(func, *args):
+    # Time and memory are measured separately, as tracing allocations slows
+    # everything down a lot.
+    start = time.time()
+    func(*args)
+    seconds = time.time() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    data = make_data(size_mb)
+
+    runs = [('objects', by_objects, (data,)),
+            ('columns (python)', by_columns, (data, False))]
+    if numpy is not None:
+        runs.append(('columns (numpy)', by_columns, (data, True)))
+
+    print('%-18s %10s %12s' % ('', 'seconds', 'peak MB'))
+    for name, func, args in runs:
+        seconds, peak = measure(func, *args)
+        print('%-18s %10.2f %12.1f' % (name, seconds, peak / 1048576.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+""" Compare reading a large log through NMEAStream on an open file against
+    MappedNMEAStream.
+
+    Run from the root of the repository:
+
+        python benchmarks/bench_mmap.py [size in MB]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+from pynmea.streamer import MappedNMEAStream, NMEAStream
+
+
+SOURCE = os.path.join('tests', 'test_data', 'test_data.gps')
+
+
+def make_log(path, size_mb):
+    with open(SOURCE, 'rb') as source_fd:
+        block = source_fd.read()
+    with open(path, 'wb') as log_fd:
+        for _ in range(size_mb * 1024 * 1024 // len(block) + 1):
+            log_fd.write(block)
+
+
+def read_all(streamer):
+    count = 0
+    next_data = streamer.get_strings()
+    while next_data:
+        count += len(next_data)
+        next_data = streamer.get_strings()
+    return count
+
+
+def file_text(path):
+    with open(path, 'r') as log_fd:
+        return read_all(NMEAStream(stream_obj=log_fd))
+
+
+def file_bytes(path):
+    with open(path, 'rb') as log_fd:
+        return read_all(NMEAStream(stream_obj=log_fd))
+
+
+def mapped(path):
+    with MappedNMEAStream(path) as streamer:
+        return read_all(streamer)
+
+
+def mapped_iter(path):
+    with MappedNMEAStream(path) as streamer:
+        return sum(1 for _ in streamer.iter_strings())
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    log_fd, path = tempfile.mkstemp(suffix='.gps')
+    os.close(log_fd)
+    try:
+        make_log(path, size_mb)
+        total = os.path.getsize(path)
+        print('%-24s %12s %12s %10s' % ('reader', 'sentences', 'sent/sec',
+                                         'MB/sec'))
+        for reader in (file_text, file_bytes, mapped, mapped_iter):
+            start = time.time()
+            count = reader(path)
+            seconds = time.time() - start
+            print('%-24s %12d %12d %10.1f' % (reader.__name__, count,
+                                               count / seconds,
+                                               total / seconds / 1e6))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
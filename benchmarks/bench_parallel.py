@@ -0,0 +1,71 @@
+""" Time parse_file_parallel on a large log with 1 to N workers, against
+    parsing it in this process with NMEAStream.iter_objects.
+
+    Run from the root of the repository:
+
+        python benchmarks/bench_parallel.py [size in MB] [max workers]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+from pynmea.parallel import parse_file_parallel
+from pynmea.streamer import NMEAStream
+
+
+SOURCE = os.path.join('tests', 'test_data', 'test_data.gps')
+
+
+def make_log(path, size_mb):
+    with open(SOURCE, 'rb') as source_fd:
+        block = source_fd.read()
+    with open(path, 'wb') as log_fd:
+        for _ in range(size_mb * 1024 * 1024 // len(block) + 1):
+            log_fd.write(block)
+
+
+def count(nmea_objects):
+    return sum(1 for _ in nmea_objects)
+
+
+def rmc_position(nmea_ob):
+    """ The kind of thing to hand to func: keep only what is needed """
+    if nmea_ob.sen_type == 'GPRMC':
+        return nmea_ob.lat, nmea_ob.lon
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    log_fd, path = tempfile.mkstemp(suffix='.gps')
+    os.close(log_fd)
+    try:
+        make_log(path, size_mb)
+        print('%-16s %12s %12s %10s' % ('reader', 'sentences', 'sent/sec',
+                                         'speedup'))
+
+        start = time.time()
+        with open(path, 'r') as log_fd:
+            total = count(NMEAStream(log_fd).iter_objects())
+        baseline = time.time() - start
+        print('%-16s %12d %12d %10.2f' % ('iter_objects', total,
+                                           total / baseline, 1.0))
+
+        for func in (None, rmc_position):
+            for workers in range(1, max_workers + 1):
+                start = time.time()
+                count(parse_file_parallel(path, workers=workers, func=func))
+                seconds = time.time() - start
+                name = 'workers=%d%s' % (workers, ' func' if func else '')
+                print('%-16s %12d %12d %10.2f' % (name, total,
+                                                   total / seconds,
+                                                   baseline / seconds))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+""" Time and size the construction and parsing of the busiest sentence types.
+
+    Run from the root of the repository:
+
+        python benchmarks/bench_sentences.py
+"""
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, '.')
+
+from pynmea.nmea import GPGGA, GPGSV, GPRMC
+
+
+SENTENCES = (
+    (GPGGA, '$GPGGA,184333.07,1929.439,S,02410.387,E,1,04,2.8,100.00,M,-33.9,M,,0000*65'),
+    (GPRMC, '$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B'),
+    (GPGSV, '$GPGSV,3,1,11,03,03,111,00,04,15,270,00,06,01,010,00,13,06,292,00*74'),
+)
+
+NUMBER = 100000
+KEEP = 10000
+
+
+def parse_one(sen_class, nmea_str):
+    nmea_ob = sen_class()
+    nmea_ob.parse(nmea_str)
+    return nmea_ob
+
+
+def parse_lazy(sen_class, nmea_str):
+    """ Lazy parsing, for an object that is only checked for its type """
+    nmea_ob = sen_class()
+    nmea_ob.parse(nmea_str, lazy=True)
+    return nmea_ob.sen_type
+
+
+def bytes_per_object(sen_class, nmea_str):
+    """ Average memory held by each parsed object, including its parts and
+        field values but not the sentence string itself, which is shared.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [parse_one(sen_class, nmea_str) for _ in range(KEEP)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) // len(kept)
+
+
+def instance_size(sen_class, nmea_str):
+    """ Size of the object itself (and its __dict__, if it has one), not
+        counting the field values.
+    """
+    nmea_ob = parse_one(sen_class, nmea_str)
+    size = sys.getsizeof(nmea_ob)
+    if hasattr(nmea_ob, '__dict__'):
+        size += sys.getsizeof(nmea_ob.__dict__)
+    return size
+
+
+def main():
+    print('%-8s %14s %14s %14s %14s' % ('type', 'usec/sentence',
+                                        'lazy, unused', 'bytes/object',
+                                        'bytes/instance'))
+    for sen_class, nmea_str in SENTENCES:
+        seconds = min(timeit.repeat(lambda: parse_one(sen_class, nmea_str),
+                                    number=NUMBER, repeat=3))
+        lazy_seconds = min(timeit.repeat(
+            lambda: parse_lazy(sen_class, nmea_str),
+            number=NUMBER, repeat=3))
+        print('%-8s %14.2f %14.2f %14d %14d' % (
+            sen_class.__name__, seconds / NUMBER * 1e6,
+            lazy_seconds / NUMBER * 1e6,
+            bytes_per_object(sen_class, nmea_str),
+            instance_size(sen_class, nmea_str)))
+
+
+if __name__ == '__main__':
+    main()
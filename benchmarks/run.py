@@ -0,0 +1,397 @@
+""" The benchmark suite. Times the main paths through the library on data
+    from pynmea.generator (so every run sees the same data), reporting
+    sentences/sec, bytes/sec and peak memory, and compares the results with
+    a saved baseline. Exits with status 1 if anything is slower (or uses
+    more memory) than the baseline by more than the threshold.
+
+    Run from the root of the repository:
+
+        python benchmarks/run.py              compare with the baseline
+        python benchmarks/run.py --save       record a new baseline
+        python benchmarks/run.py -k parse     only benchmarks with 'parse'
+                                              in their name
+
+    Timings depend on the machine, so record a baseline on the machine the
+    comparisons will be run on, before making the change to be checked.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, '.')
+
+from pynmea.assemblers import (FixAssembler, RouteAssembler,
+                               SkyViewAssembler)
+from pynmea.cache import ParseCache
+from pynmea.generator import NMEAGenerator
+from pynmea.merge import merge_streams
+from pynmea.nmea import GPRMC, SENTENCE_TYPES, parse
+from pynmea.streamer import NMEAStream
+from pynmea.utils import checksum_calc
+from pynmea.writer import NMEAWriter
+
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+STREAM_SIZE = 1024 * 1024
+PER_CLASS = 2000
+REPEAT = 5
+
+# Changes in peak memory smaller than this are noise
+MEMORY_SLACK = 64 * 1024
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """ Register a benchmark. The function is given the test data and
+        returns (run, sentences, size): a function to time, and the number
+        of sentences and bytes that one call of it handles.
+    """
+    def register(func):
+        BENCHMARKS.append((name, func))
+        return func
+    return register
+
+
+class TestData(object):
+    """ The data the benchmarks run on, made once """
+    def __init__(self, stream_size, per_class):
+        self.stream = NMEAGenerator(seed=1).generate(stream_size)
+        self.stream_sentences = len(NMEAStream()._split(self.stream))
+
+        all_types = NMEAGenerator(seed=1, mix='all')
+        self.by_type = dict((sen_type, []) for sen_type in SENTENCE_TYPES)
+        while min(len(lines) for lines in self.by_type.values()) < per_class:
+            for line in all_types.fix():
+                self.by_type[line[1:6]].append(line.rstrip())
+        for sen_type in self.by_type:
+            del self.by_type[sen_type][per_class:]
+
+
+@benchmark('stream._split')
+def bench_split(data):
+    streamer = NMEAStream()
+    return (lambda: streamer._split(data.stream), data.stream_sentences,
+            len(data.stream))
+
+
+def _read_all(method, data, **options):
+    def run():
+        streamer = NMEAStream(io.StringIO(data.stream, newline=''),
+                              **options)
+        read = getattr(streamer, method)
+        while read(size=4096) or streamer.head:
+            pass
+    return run, data.stream_sentences, len(data.stream)
+
+
+@benchmark('stream._read')
+def bench_read(data):
+    return _read_all('_read', data)
+
+
+@benchmark('stream.get_objects')
+def bench_get_objects(data):
+    return _read_all('get_objects', data)
+
+
+@benchmark('stream.include')
+def bench_get_objects_include(data):
+    # Sentences/sec counts every sentence in the stream, kept or not
+    return _read_all('get_objects', data, include=('GPRMC', 'GPGGA'))
+
+
+@benchmark('stream.fields')
+def bench_get_objects_fields(data):
+    return _read_all('get_objects', data, fields={
+        'GPRMC': ('timestamp', 'lat', 'lat_dir', 'lon', 'lon_dir'),
+        'GPGGA': ('timestamp', 'latitude', 'lat_direction', 'longitude',
+                  'lon_direction')})
+
+
+def _iter_all(data, **options):
+    def run():
+        streamer = NMEAStream(io.StringIO(data.stream, newline=''),
+                              **options)
+        for _ in streamer.iter_objects(size=4096):
+            pass
+    return run, data.stream_sentences, len(data.stream)
+
+
+@benchmark('stream.iter_objects')
+def bench_iter_objects(data):
+    return _iter_all(data)
+
+
+@benchmark('stream.reuse')
+def bench_iter_objects_reuse(data):
+    return _iter_all(data, reuse=True)
+
+
+@benchmark('checksum_calc')
+def bench_checksum(data):
+    sentences = NMEAStream()._split(data.stream)
+
+    def run():
+        for sentence in sentences:
+            checksum_calc(sentence)
+    return run, len(sentences), sum(len(sentence) for sentence in sentences)
+
+
+def _bench_parse(sen_type):
+    def bench(data):
+        sentences = data.by_type[sen_type]
+        sen_class = SENTENCE_TYPES[sen_type]
+
+        def run():
+            for sentence in sentences:
+                sen_class().parse(sentence)
+        return (run, len(sentences),
+                sum(len(sentence) for sentence in sentences))
+    return bench
+
+
+for _sen_type in sorted(SENTENCE_TYPES):
+    benchmark('parse.' + _sen_type)(_bench_parse(_sen_type))
+
+
+@benchmark('parse.GPRMC.fields')
+def bench_parse_fields(data):
+    sentences = data.by_type['GPRMC']
+    fields = ('timestamp', 'lat', 'lat_dir', 'lon', 'lon_dir')
+
+    def run():
+        for sentence in sentences:
+            GPRMC().parse(sentence, fields=fields)
+    return run, len(sentences), sum(len(sentence) for sentence in sentences)
+
+
+@benchmark('nmea.parse')
+def bench_parse_any(data):
+    sentences = NMEAStream()._split(data.stream)
+
+    def run():
+        for sentence in sentences:
+            parse(sentence)
+    return run, len(sentences), sum(len(sentence) for sentence in sentences)
+
+
+@benchmark('assemble.fixes')
+def bench_fixes(data):
+    nmea_objects = list(NMEAStream().iter_objects(data=data.stream))
+
+    def run():
+        for _ in FixAssembler().iter_fixes(nmea_objects):
+            pass
+    return run, len(nmea_objects), len(data.stream)
+
+
+@benchmark('assemble.skyview')
+def bench_skyview(data):
+    nmea_objects = [nmea_ob for nmea_ob in
+                    NMEAStream().iter_objects(data=data.stream)
+                    if nmea_ob.sen_type == 'GPGSV']
+
+    def run():
+        for _ in SkyViewAssembler().iter_views(nmea_objects):
+            pass
+    return run, len(nmea_objects), sum(len(nmea_ob.nmea_sentence)
+                                       for nmea_ob in nmea_objects)
+
+
+@benchmark('assemble.routes')
+def bench_routes(data):
+    # A chartplotter repeating its route, with the waypoint it is heading to
+    sentences = []
+    for rte, wpl in zip(data.by_type['GPRTE'], data.by_type['GPWPL']):
+        sentences += [rte, wpl]
+    nmea_objects = [parse(sentence) for sentence in sentences]
+
+    def run():
+        for _ in RouteAssembler().iter_routes(nmea_objects):
+            pass
+    return run, len(sentences), sum(len(sentence) for sentence in sentences)
+
+
+def _moored(data):
+    """ Sentences as from a vessel at anchor: the same few, over and over,
+        with a fix that changes every time
+    """
+    vtg, gsa, pgrmm = [data.by_type[sen_type][0]
+                       for sen_type in ('GPVTG', 'GPGSA', 'PGRMM')]
+    sentences = []
+    for rmc in data.by_type['GPRMC']:
+        sentences += [rmc, vtg, gsa, pgrmm]
+    return sentences
+
+
+@benchmark('cache.moored')
+def bench_cache(data):
+    sentences = _moored(data)
+
+    def run():
+        cache = ParseCache(maxsize=256)
+        for sentence in sentences:
+            cache.parse(sentence)
+    return run, len(sentences), sum(len(sentence) for sentence in sentences)
+
+
+@benchmark('cache.moored.none')
+def bench_no_cache(data):
+    sentences = _moored(data)
+
+    def run():
+        for sentence in sentences:
+            parse(sentence)
+    return run, len(sentences), sum(len(sentence) for sentence in sentences)
+
+
+@benchmark('write.objects')
+def bench_write_objects(data):
+    nmea_objects = list(NMEAStream().iter_objects(data=data.stream))
+
+    def run():
+        with NMEAWriter(io.StringIO()) as writer:
+            writer.write_many(nmea_objects)
+    return run, len(nmea_objects), len(data.stream)
+
+
+@benchmark('write.fields')
+def bench_write_fields(data):
+    rows = [(nmea_ob.sen_type, nmea_ob.parts[1:])
+            for nmea_ob in NMEAStream().iter_objects(data=data.stream)]
+
+    def run():
+        with NMEAWriter(io.StringIO()) as writer:
+            for sen_type, fields in rows:
+                writer.write_fields(sen_type, fields)
+    return run, len(rows), len(data.stream)
+
+
+@benchmark('merge.streams')
+def bench_merge(data):
+    # Four receivers, started at the same time, each with its own log
+    sources = [list(NMEAStream().iter_objects(
+        data=NMEAGenerator(seed=seed).generate(STREAM_SIZE // 4)))
+        for seed in range(4)]
+    sentences = sum(len(nmea_objects) for nmea_objects in sources)
+    size = sum(len(nmea_ob.nmea_sentence) for nmea_objects in sources
+               for nmea_ob in nmea_objects)
+
+    def run():
+        for _ in merge_streams(sources):
+            pass
+    return run, sentences, size
+
+
+def measure(run, sentences, size, repeat):
+    """ Best of repeat timings, then one more run to find peak memory, as
+        tracing allocations slows everything down. As with timeit, garbage
+        collection is turned off while timing, so that it doesn't land on
+        whichever benchmark happens to be running.
+    """
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            seconds = time.perf_counter() - start
+            if best is None or seconds < best:
+                best = seconds
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'sentences_per_sec': sentences / best,
+            'bytes_per_sec': size / best,
+            'peak_memory': peak}
+
+
+def compare(result, baseline, threshold):
+    """ Return a list of what got worse than baseline by more than threshold
+        (a fraction), as text.
+    """
+    problems = []
+    for metric in ('sentences_per_sec', 'bytes_per_sec'):
+        if result[metric] < baseline[metric] * (1 - threshold):
+            problems.append('%s %.0f, was %.0f (%+.0f%%)' % (
+                metric, result[metric], baseline[metric],
+                (result[metric] / baseline[metric] - 1) * 100))
+    peak, old_peak = result['peak_memory'], baseline['peak_memory']
+    if peak > old_peak * (1 + threshold) and peak - old_peak > MEMORY_SLACK:
+        problems.append('peak_memory %d, was %d' % (peak, old_peak))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='baseline file (default: %(default)s)')
+    parser.add_argument('--save', action='store_true',
+                        help='save the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fraction worse than the baseline that counts '
+                             'as a regression (default: %(default)s)')
+    parser.add_argument('-k', dest='match', default='',
+                        help='only run benchmarks with this in their name')
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_fd:
+            baseline = json.load(baseline_fd)['results']
+
+    data = TestData(STREAM_SIZE, PER_CLASS)
+    results = {}
+    failures = 0
+    print('%-22s %14s %12s %12s  %s' % ('benchmark', 'sentences/s', 'MB/s',
+                                        'peak KB', 'vs baseline'))
+    for name, setup in BENCHMARKS:
+        if args.match not in name:
+            continue
+        result = results[name] = measure(*setup(data), repeat=args.repeat)
+
+        if name not in baseline:
+            status = 'new'
+        else:
+            problems = compare(result, baseline[name], args.threshold)
+            status = 'REGRESSED: ' + '; '.join(problems) if problems else (
+                '%+.0f%%' % ((result['sentences_per_sec'] /
+                              baseline[name]['sentences_per_sec'] - 1) * 100))
+            failures += bool(problems)
+        print('%-22s %14.0f %12.2f %12.0f  %s' % (
+            name, result['sentences_per_sec'],
+            result['bytes_per_sec'] / 1048576.0,
+            result['peak_memory'] / 1024.0, status))
+
+    if args.save:
+        # Only replace the results for the benchmarks that were run
+        baseline.update(results)
+        saved = {'python': platform.python_version(),
+                 'machine': platform.platform(),
+                 'results': baseline}
+        with open(args.baseline, 'w') as baseline_fd:
+            json.dump(saved, baseline_fd, indent=1, sort_keys=True)
+        print('Saved baseline to %s' % args.baseline)
+    elif failures:
+        print('%d benchmark(s) regressed by more than %d%%' % (
+            failures, args.threshold * 100))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
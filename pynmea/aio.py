@@ -0,0 +1,77 @@
+""" Reading streams of nmea data from asyncio. This needs Python 3.6 or later,
+    so it is kept apart from pynmea.streamer, which doesn't.
+"""
+from pynmea.streamer import NMEAStream
+
+
+class AsyncNMEAStream(NMEAStream):
+    """ An NMEAStream for use with asyncio, so that many devices can be read
+        from one event loop without a thread for each.
+    """
+    def __init__(self, reader, validate=False, max_sentence=4096,
+                 overflow='resync', size=1024, lazy=False, include=None,
+                 exclude=None, fields=None, cache=None, reuse=False):
+        """ reader is an asyncio.StreamReader, or anything else with a
+            coroutine read(size) that returns no data at the end of the
+            stream. Sentences are split out exactly as NMEAStream does.
+
+            Nothing is read until a sentence is asked for, and then no more
+            than size at a time, so a slow consumer leaves data in the
+            reader. Once its buffer is full, a StreamReader stops reading
+            from the connection and the sender is held back.
+
+            Use with async for:
+                async for nmea_str in stream:
+                    ...
+                async for nmea_ob in stream.iter_objects():
+                    ...
+        """
+        super(AsyncNMEAStream, self).__init__(
+            stream_obj=reader, validate=validate, max_sentence=max_sentence,
+            overflow=overflow, lazy=lazy, include=include, exclude=exclude,
+            fields=fields, cache=cache, reuse=reuse)
+        self.size = size
+
+    def __aiter__(self):
+        return self.iter_strings()
+
+    async def get_strings(self, size=None):
+        """ Wait for one read from the reader and return the sentences that
+            it completes, which may be none. At the end of the stream, returns
+            whatever was left over.
+        """
+        read_data = await self.stream.read(size or self.size)
+        if not read_data:
+            return self._flush()
+        ready = self._frame(read_data)
+        return self._split(ready) if ready else []
+
+    async def get_objects(self, size=None):
+        """ As get_strings, but return a list of NMEA objects
+        """
+        return self._to_objects(await self.get_strings(size))
+
+    async def iter_strings(self, size=None):
+        """ Asynchronously yield sentences until the end of the stream
+        """
+        size = size or self.size
+        while True:
+            read_data = await self.stream.read(size)
+            if not read_data:
+                break
+            ready = self._frame(read_data)
+            if ready:
+                for nmea_str in self._split(ready):
+                    yield nmea_str
+
+        for nmea_str in self._flush():
+            yield nmea_str
+
+    async def iter_objects(self, size=None):
+        """ As iter_strings, but yield NMEA objects. Unrecognised sentences
+            are skipped.
+        """
+        async for nmea_str in self.iter_strings(size):
+            nmea_ob = self._to_object(nmea_str, self.reuse)
+            if nmea_ob is not None:
+                yield nmea_ob
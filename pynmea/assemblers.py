@@ -0,0 +1,552 @@
+""" Put related sentences back together: the sentences of one fix, the parts
+    of a multi sentence message and so on. Each assembler is fed NMEA objects
+    one at a time (from NMEAStream.iter_objects, say) and hands back whatever
+    it has finished.
+"""
+import array
+import collections
+import time
+
+
+def _number(raw, kind=float):
+    """ A numeric field as kind, or None if it is empty or missing """
+    return kind(raw) if raw else None
+
+
+# One position fix. time is a datetime.time and date a datetime.date, both in
+# UTC. lat and lon are decimal degrees, altitude is in meters, speed in knots
+# and course in degrees true. quality is the GGA fix quality (0 is no fix),
+# fix_type the GSA fix type (1 none, 2 2D, 3 3D) and valid is True or False
+# from RMC. Anything not given by the sentences of the epoch is None.
+# sen_types is the types that went into the fix, in the order they came.
+Fix = collections.namedtuple(
+    'Fix', 'time date lat lon altitude speed course quality num_sats '
+           'fix_type pdop hdop vdop valid sen_types')
+
+_EMPTY_FIX = dict((field, None) for field in Fix._fields)
+
+
+# Each of these reads every value it needs before setting any, so that if
+# one can't be read (ValueError) the fix is left as it was
+
+def _from_gga(fix, nmea_ob):
+    values = (nmea_ob.time, nmea_ob.lat_degrees, nmea_ob.lon_degrees,
+              nmea_ob.altitude,
+              _number(getattr(nmea_ob, 'gps_qual', ''), int),
+              _number(getattr(nmea_ob, 'num_sats', ''), int),
+              _number(getattr(nmea_ob, 'horizontal_dil', '')))
+    (fix['time'], fix['lat'], fix['lon'], fix['altitude'], fix['quality'],
+     fix['num_sats'], hdop) = values
+    if fix['hdop'] is None:
+        fix['hdop'] = hdop
+
+
+def _from_rmc(fix, nmea_ob):
+    values = (nmea_ob.time, nmea_ob.lat_degrees, nmea_ob.lon_degrees,
+              nmea_ob.speed, nmea_ob.course, nmea_ob.datetime)
+    (fix['time'], fix['lat'], fix['lon'], fix['speed'], fix['course'],
+     when) = values
+    if when is not None:
+        fix['date'] = when.date()
+    fix['valid'] = getattr(nmea_ob, 'data_validity', '') == 'A'
+
+
+def _from_vtg(fix, nmea_ob):
+    values = (_number(getattr(nmea_ob, 'true_track', '')),
+              _number(getattr(nmea_ob, 'spd_over_grnd_kts', '')))
+    fix['course'], fix['speed'] = values
+
+
+def _from_gsa(fix, nmea_ob):
+    values = (_number(getattr(nmea_ob, 'mode_fix_type', ''), int),
+              _number(getattr(nmea_ob, 'pdop', '')),
+              _number(getattr(nmea_ob, 'hdop', '')),
+              _number(getattr(nmea_ob, 'vdop', '')))
+    fix['fix_type'], fix['pdop'], fix['hdop'], fix['vdop'] = values
+
+
+FIX_SENTENCES = {'GPGGA': _from_gga, 'GPRMC': _from_rmc,
+                 'GPVTG': _from_vtg, 'GPGSA': _from_gsa}
+
+
+class FixAssembler(object):
+    """ Groups the GGA, RMC, VTG and GSA sentences of each epoch into a Fix.
+
+        Sentences with a timestamp (GGA, RMC) say which epoch they belong to.
+        Those without (VTG, GSA) go in the epoch of the last timestamp seen,
+        or the next one if the epoch they would join has already been
+        handed back.
+
+        An epoch is finished, and its Fix handed back, as soon as one of each
+        type in expect has been seen, or else when:
+            a sentence from a later epoch arrives
+            it has been open for more than timeout seconds (if timeout is
+                given). This is checked as sentences arrive, and by expire()
+            flush() is called, at the end of the data
+        Only one epoch is open at once, so the work per sentence and the
+        memory used stay the same however long the stream is. Sentences
+        that turn up for an epoch that has already been handed back are
+        dropped and counted in late. Sentences with a field that can't be
+        read (a time, date, position or number that is garbled) are dropped
+        and counted in bad.
+    """
+    def __init__(self, expect=('GPGGA', 'GPRMC', 'GPVTG', 'GPGSA'),
+                 timeout=None, clock=None):
+        """ clock is the function timeout is measured with, time.monotonic
+            by default (time.time where there isn't one)
+        """
+        for sen_type in expect:
+            if sen_type not in FIX_SENTENCES:
+                raise ValueError('Not a fix sentence: %r' % (sen_type,))
+        self.expect = frozenset(expect)
+        self.timeout = timeout
+        self.clock = clock or getattr(time, 'monotonic', time.time)
+        self.late = 0
+        self.bad = 0
+        self._fix = None
+        self._epoch = None
+        self._opened = None
+        self._done = None
+
+    def add(self, nmea_ob):
+        """ Add one NMEA object. Returns a tuple of the fixes that it
+            finished, which is usually empty. Objects of other types are
+            ignored.
+        """
+        update = FIX_SENTENCES.get(nmea_ob.sen_type)
+        if update is None:
+            return self.expire()
+
+        raw_time = getattr(nmea_ob, 'timestamp', None)
+        try:
+            epoch = _number(raw_time) if raw_time is not None else None
+        except ValueError:
+            self.bad += 1
+            return self.expire()
+        if epoch is not None and epoch == self._done:
+            self.late += 1
+            return self.expire()
+        new_epoch = (epoch is not None and self._fix is not None and
+                     self._epoch not in (None, epoch))
+
+        if self._fix is None or new_epoch:
+            fix = dict(_EMPTY_FIX)
+            fix['sen_types'] = []
+        else:
+            fix = self._fix
+        try:
+            update(fix, nmea_ob)
+        except ValueError:
+            self.bad += 1
+            return self.expire()
+
+        finished = ()
+        if new_epoch:
+            finished = (self._finish(),)
+        if self._fix is None:
+            self._epoch = epoch
+            self._opened = self.clock()
+        elif epoch is not None:
+            self._epoch = epoch
+        self._fix = fix
+
+        fix['sen_types'].append(nmea_ob.sen_type)
+        if self.expect.issubset(fix['sen_types']):
+            finished += (self._finish(),)
+        else:
+            finished += self.expire()
+        return finished
+
+    def expire(self):
+        """ Hand back the open epoch, as a tuple of one Fix, if it has timed
+            out. Otherwise returns an empty tuple. Call this from time to
+            time when no data is arriving, to get a fix out of a stream that
+            has gone quiet.
+        """
+        if (self.timeout is not None and self._fix is not None and
+                self.clock() - self._opened > self.timeout):
+            return (self._finish(),)
+        return ()
+
+    def flush(self):
+        """ Hand back the open epoch, as a tuple of one Fix, whatever state
+            it is in. Returns an empty tuple if there isn't one.
+        """
+        if self._fix is None:
+            return ()
+        return (self._finish(),)
+
+    def _finish(self):
+        fix = self._fix
+        fix['sen_types'] = tuple(fix['sen_types'])
+        self._done = self._epoch
+        self._fix = None
+        self._epoch = None
+        return Fix(**fix)
+
+    def iter_fixes(self, nmea_objects):
+        """ Yield the fixes from an iterable of NMEA objects, flushing at
+            the end
+        """
+        for nmea_ob in nmea_objects:
+            for fix in self.add(nmea_ob):
+                yield fix
+        for fix in self.flush():
+            yield fix
+
+
+# The fields of the (up to) four satellites in each GSV sentence
+_GSV_SATELLITES = tuple(
+    ('sv_prn_num_%d' % n, 'elevation_deg_%d' % n, 'azimuth_%d' % n,
+     'snr_%d' % n) for n in range(1, 5))
+
+# msg_num is a single digit, so a cycle has at most 9 sentences
+MAX_GSV_MESSAGES = 9
+_MAX_IN_VIEW = MAX_GSV_MESSAGES * 4
+
+
+def _gsv_value(raw):
+    """ A GSV elevation, azimuth or SNR as an int, -1 if it is empty """
+    return int(raw) if raw else -1
+
+
+class SkyView(object):
+    """ The satellites in view for one talker (GP, GL, ...), as of the last
+        complete GSV cycle.
+
+        elevation, azimuth and snr are arrays indexed by PRN, holding the
+        values for the satellites in view and -1 everywhere else (an empty
+        SNR, for a satellite that is not being tracked, is -1 too). Only
+        PRNs up to max_prn are kept in them. satellites() gives the
+        satellites in view in the order they were listed.
+
+        All of the arrays are made once and written over in place at the
+        end of each cycle, so keep a copy of anything wanted from a cycle
+        before the next one comes in.
+    """
+    def __init__(self, talker, max_prn=255):
+        self.talker = talker
+        self.max_prn = max_prn
+        self.elevation = array.array('h', [-1]) * (max_prn + 1)
+        self.azimuth = array.array('h', [-1]) * (max_prn + 1)
+        self.snr = array.array('h', [-1]) * (max_prn + 1)
+        # From the last complete cycle: the number of satellites listed, and
+        # the number the receiver said were in view
+        self.count = 0
+        self.num_sv_in_view = 0
+        self.cycles = 0
+        self.incomplete = 0
+
+        # prn, elevation, azimuth, snr for each satellite listed, for the
+        # last complete cycle and the one being received
+        self._rows = array.array('h', [0]) * (_MAX_IN_VIEW * 4)
+        self._pending = array.array('h', [0]) * (_MAX_IN_VIEW * 4)
+        self._pending_count = 0
+        self._num_messages = 0
+        # The msg_num wanted next: 0 between cycles, -1 while skipping the
+        # rest of a broken one
+        self._next_msg = 0
+
+    def add(self, nmea_ob):
+        """ Add one GSV sentence. Returns True if it completed a cycle and
+            the tables have been updated.
+
+            A cycle is incomplete, and thrown away, if a sentence in it is
+            missing, out of order or can't be read, or if a new cycle
+            starts before it is finished. Each one is counted in incomplete.
+        """
+        try:
+            num_messages = int(nmea_ob.num_messages)
+            msg_num = int(nmea_ob.msg_num)
+        except (AttributeError, ValueError):
+            return self._broken()
+        if not 1 <= msg_num <= num_messages <= MAX_GSV_MESSAGES:
+            return self._broken()
+
+        if msg_num == 1:
+            if self._next_msg > 0:
+                # The last cycle was cut short
+                self.incomplete += 1
+            self._num_messages = num_messages
+            self._pending_count = 0
+        elif (msg_num != self._next_msg or
+              num_messages != self._num_messages):
+            return self._broken()
+
+        pending = self._pending
+        index = self._pending_count * 4
+        try:
+            for prn_field, elev_field, azim_field, snr_field in \
+                    _GSV_SATELLITES:
+                prn = getattr(nmea_ob, prn_field, '')
+                if not prn:
+                    continue
+                pending[index] = int(prn)
+                pending[index + 1] = _gsv_value(
+                    getattr(nmea_ob, elev_field, ''))
+                pending[index + 2] = _gsv_value(
+                    getattr(nmea_ob, azim_field, ''))
+                pending[index + 3] = _gsv_value(
+                    getattr(nmea_ob, snr_field, ''))
+                index += 4
+        except (ValueError, OverflowError):
+            return self._broken()
+        self._pending_count = index // 4
+
+        if msg_num < num_messages:
+            self._next_msg = msg_num + 1
+            return False
+
+        self._next_msg = 0
+        try:
+            self.num_sv_in_view = int(nmea_ob.num_sv_in_view)
+        except (AttributeError, ValueError):
+            self.num_sv_in_view = self._pending_count
+        self._update()
+        return True
+
+    def _broken(self):
+        """ Throw away the cycle being received """
+        if self._next_msg != -1:
+            self.incomplete += 1
+            self._next_msg = -1
+        return False
+
+    def _update(self):
+        """ Make the cycle just received the current one """
+        max_prn = self.max_prn
+        elevation, azimuth, snr = self.elevation, self.azimuth, self.snr
+        rows = self._rows
+        for index in range(0, self.count * 4, 4):
+            prn = rows[index]
+            if 0 <= prn <= max_prn:
+                elevation[prn] = azimuth[prn] = snr[prn] = -1
+
+        self._rows, self._pending = self._pending, rows
+        rows = self._rows
+        self.count = self._pending_count
+        for index in range(0, self.count * 4, 4):
+            prn = rows[index]
+            if 0 <= prn <= max_prn:
+                elevation[prn] = rows[index + 1]
+                azimuth[prn] = rows[index + 2]
+                snr[prn] = rows[index + 3]
+        self.cycles += 1
+
+    def satellites(self):
+        """ Yield (prn, elevation, azimuth, snr) for each satellite in view,
+            with -1 for values that were not given
+        """
+        rows = self._rows
+        for index in range(0, self.count * 4, 4):
+            yield tuple(rows[index:index + 4])
+
+
+class SkyViewAssembler(object):
+    """ Puts the GSV sentences of each cycle back together, keeping a
+        SkyView for each talker in views. Any sentence type ending in GSV
+        is taken, so that the cycles of several constellations (GPGSV,
+        GLGSV, ...) can be interleaved in one stream; register the GPGSV
+        class for the other talkers to parse them.
+    """
+    def __init__(self, max_prn=255):
+        self.max_prn = max_prn
+        self.views = {}
+        self._finished = {}
+
+    def add(self, nmea_ob):
+        """ Add one NMEA object. Returns a tuple holding the SkyView that it
+            completed a cycle of, or an empty tuple. Objects of other types
+            are ignored.
+        """
+        sen_type = nmea_ob.sen_type
+        if not sen_type.endswith('GSV'):
+            return ()
+        talker = sen_type[:-3]
+        try:
+            view = self.views[talker]
+        except KeyError:
+            view = self.views[talker] = SkyView(talker, self.max_prn)
+            self._finished[talker] = (view,)
+        if view.add(nmea_ob):
+            return self._finished[talker]
+        return ()
+
+    @property
+    def incomplete(self):
+        """ The number of incomplete cycles thrown away, for all talkers """
+        return sum(view.incomplete for view in self.views.values())
+
+    def iter_views(self, nmea_objects):
+        """ Yield a SkyView from an iterable of NMEA objects each time one of
+            them completes a cycle. It is the same object for each cycle of
+            a talker, updated in place.
+        """
+        for nmea_ob in nmea_objects:
+            for view in self.add(nmea_ob):
+                yield view
+
+
+# A waypoint of a route, with its position in decimal degrees from the last
+# GPWPL for it, or None for both if there hasn't been one.
+Waypoint = collections.namedtuple('Waypoint', 'waypoint_id lat lon')
+
+# A complete route. start_type is 'c' for a complete route or 'w' for a
+# working route, where the first waypoint is the one being steered from.
+# waypoints is a tuple of Waypoint, in order.
+Route = collections.namedtuple('Route', 'route_id start_type waypoints')
+
+
+class RouteAssembler(object):
+    """ Puts the GPRTE sentences of each route back together and fills in the
+        positions of its waypoints from a cache of the GPWPL sentences seen,
+        keyed on waypoint ID.
+
+        A Route is only handed back when it is new or has changed: when a
+        complete set of GPRTE sentences for it differs from the last set,
+        or when a GPWPL changes the position of one of its waypoints. A set
+        of GPRTE sentences that are the same, character for character, as
+        the last set for the route are only compared, not read, so a route
+        that is repeated over and over costs next to nothing. The last Route
+        handed back for each route ID is kept in routes.
+
+        A set is incomplete, and thrown away, if a sentence in it is missing
+        or out of order, or a new set for the route starts before it is
+        finished, or a sentence in it can't be read. Each one is counted in
+        incomplete. GPWPL sentences with a position that can't be read are
+        dropped and counted in bad.
+    """
+    def __init__(self):
+        self.waypoints = {}
+        self.routes = {}
+        self.incomplete = 0
+        self.bad = 0
+        # route_id -> the sentences of its last complete set
+        self._last = {}
+        # route_id -> [num_in_seq, (nmea_sentence, start_type,
+        # waypoint_list) of each sentence so far, whether they are the same
+        # as the last set] for sets being received, or None while
+        # skipping the rest of a broken one
+        self._pending = {}
+        # waypoint_id -> the IDs of the routes it is in
+        self._used = {}
+
+    def add(self, nmea_ob):
+        """ Add one NMEA object. Returns a tuple of the routes it made new or
+            changed, which is usually empty. Objects other than GPRTE and
+            GPWPL are ignored.
+        """
+        if nmea_ob.sen_type == 'GPRTE':
+            return self._add_route(nmea_ob)
+        if nmea_ob.sen_type == 'GPWPL':
+            return self._add_waypoint(nmea_ob)
+        return ()
+
+    def _add_route(self, nmea_ob):
+        route_id = getattr(nmea_ob, 'active_route_id', '')
+        if isinstance(route_id, list):
+            # Cut short, so that the waypoint list is where the ID should be
+            return self._broken('')
+        try:
+            num_in_seq = int(nmea_ob.num_in_seq)
+            sen_num = int(nmea_ob.sen_num)
+        except (AttributeError, TypeError, ValueError):
+            return self._broken(route_id)
+
+        pending = self._pending.get(route_id)
+        if sen_num == 1:
+            if pending is not None:
+                # The last set was cut short
+                self.incomplete += 1
+            pending = self._pending[route_id] = [num_in_seq, [], True]
+        elif (pending is None or num_in_seq != pending[0] or
+              sen_num != len(pending[1]) + 1):
+            return self._broken(route_id)
+
+        # Only what is needed is kept, not the object, which the stream may
+        # parse the next sentence into
+        received = pending[1]
+        received.append((nmea_ob.nmea_sentence,
+                         getattr(nmea_ob, 'start_type', ''),
+                         list(getattr(nmea_ob, 'waypoint_list', ()))))
+        if pending[2]:
+            last = self._last.get(route_id, ())
+            pending[2] = (len(last) == num_in_seq and
+                          last[sen_num - 1] == nmea_ob.nmea_sentence)
+        if sen_num < num_in_seq:
+            return ()
+
+        del self._pending[route_id]
+        if pending[2]:
+            # Nothing has changed
+            return ()
+        self._last[route_id] = tuple(sentence for sentence, _, _ in received)
+
+        waypoint_ids = []
+        for _, _, waypoint_list in received:
+            waypoint_ids.extend(waypoint_id for waypoint_id in waypoint_list
+                                if waypoint_id)
+        start_type = received[0][1]
+        if isinstance(start_type, list):
+            start_type = ''
+        route = Route(route_id, start_type,
+                      tuple(self._waypoint(waypoint_id)
+                            for waypoint_id in waypoint_ids))
+        if route == self.routes.get(route_id):
+            return ()
+        self._publish(route)
+        return (route,)
+
+    def _broken(self, route_id):
+        """ Throw away the set being received for route_id """
+        if self._pending.get(route_id, ()) is not None:
+            self.incomplete += 1
+            self._pending[route_id] = None
+        return ()
+
+    def _waypoint(self, waypoint_id):
+        waypoint = self.waypoints.get(waypoint_id)
+        if waypoint is None:
+            return Waypoint(waypoint_id, None, None)
+        return waypoint
+
+    def _publish(self, route):
+        old = self.routes.get(route.route_id)
+        if old is not None:
+            for waypoint in old.waypoints:
+                self._used[waypoint.waypoint_id].discard(route.route_id)
+        for waypoint in route.waypoints:
+            self._used.setdefault(waypoint.waypoint_id, set()).add(
+                route.route_id)
+        self.routes[route.route_id] = route
+
+    def _add_waypoint(self, nmea_ob):
+        waypoint_id = getattr(nmea_ob, 'waypoint_id', '')
+        if not waypoint_id:
+            return ()
+        try:
+            waypoint = Waypoint(waypoint_id, nmea_ob.lat_degrees,
+                                nmea_ob.lon_degrees)
+        except ValueError:
+            self.bad += 1
+            return ()
+        if self.waypoints.get(waypoint_id) == waypoint:
+            return ()
+        self.waypoints[waypoint_id] = waypoint
+
+        changed = []
+        for route_id in sorted(self._used.get(waypoint_id, ())):
+            route = self.routes[route_id]
+            route = route._replace(waypoints=tuple(
+                waypoint if old.waypoint_id == waypoint_id else old
+                for old in route.waypoints))
+            self.routes[route_id] = route
+            changed.append(route)
+        return tuple(changed)
+
+    def iter_routes(self, nmea_objects):
+        """ Yield each new or changed Route from an iterable of NMEA objects
+        """
+        for nmea_ob in nmea_objects:
+            for route in self.add(nmea_ob):
+                yield route
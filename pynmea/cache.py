@@ -0,0 +1,77 @@
+""" Cache parsed sentences, for streams where the same sentences come up
+    again and again
+"""
+import collections
+
+from pynmea.nmea import parse
+
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', 'hits misses evictions maxsize currsize')
+
+
+class ParseCache(object):
+    """ A bounded cache of NMEA objects, keyed on the raw sentence they were
+        parsed from. When it is full, the least recently used sentence is
+        dropped to make room.
+
+        A sentence that is already in the cache gets back the very same
+        object as last time, not a copy, so treat objects from the cache as
+        read only: don't set their attributes or parse anything else into
+        them. Anything worked out from their fields (lat_degrees, time and
+        so on) is then only worked out once, too.
+
+        One cache can be shared by several NMEAStreams (pass it as their
+        cache).
+    """
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cache = collections.OrderedDict()
+
+    def parse(self, nmea_str):
+        """ Return the NMEA object for nmea_str (str or bytes), parsing it
+            only if it is not in the cache. As nmea.parse, raises
+            UnknownSentenceTypeError for types that are not known; those are
+            not cached.
+        """
+        if isinstance(nmea_str, bytearray):
+            nmea_str = bytes(nmea_str)
+        cache = self._cache
+        try:
+            nmea_ob = cache[nmea_str]
+        except KeyError:
+            nmea_ob = parse(nmea_str)
+            self.misses += 1
+            cache[nmea_str] = nmea_ob
+            if len(cache) > self.maxsize:
+                cache.popitem(last=False)
+                self.evictions += 1
+            return nmea_ob
+        # Move it to the most recently used end. OrderedDict.move_to_end
+        # would do, but Python 2.7 doesn't have it.
+        cache[nmea_str] = cache.pop(nmea_str)
+        self.hits += 1
+        return nmea_ob
+
+    def cache_info(self):
+        """ Return the hits, misses, evictions, maxsize and current size, as
+            a CacheInfo
+        """
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize,
+                         len(self._cache))
+
+    def clear(self):
+        """ Empty the cache and reset the statistics """
+        self._cache.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, nmea_str):
+        return nmea_str in self._cache
@@ -0,0 +1,232 @@
+""" Parse a stream of sentences straight into columns, one table per sentence
+    type, for analysis. No NMEA objects are made along the way.
+"""
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pynmea.nmea import NMEASentence, SENTENCE_TYPES
+from pynmea.streamer import NMEAStream
+from pynmea.utils import verify_checksum
+
+
+_NAN = float('nan')
+
+# Rows of a table are held as text until there are this many of them, then
+# converted and added on to the columns.
+BATCH_ROWS = 4096
+
+# The fields that are numbers, in any sentence type. Every other field
+# (times, dates, IDs, flags, units and so on) is kept as text, so that
+# nothing is lost from values like '003000.00' or '0007'.
+NUMBER_FIELDS = frozenset([
+    # Positions, in the sentence's own ddmm.mmmm form
+    'lat', 'lon', 'latitude', 'longitude', 'lat_next', 'lon_next',
+    'waypoint_lat', 'waypoint_lon', 'dest_lat', 'dest_lon',
+    # Speeds
+    'spd_over_grnd', 'spd_over_grnd_kts', 'spd_over_grnd_kmph',
+    'lon_water_spd', 'trans_water_spd', 'lon_grnd_spd', 'trans_grnd_spd',
+    'dest_velocity', 'velocity',
+    # Courses, bearings and headings
+    'true_course', 'crse_over_grnd', 'true_track', 'mag_track', 'heading',
+    'deviation', 'variation', 'mag_variation', 'bearing_t', 'bearing_true',
+    'bearing_mag', 'bearing_deg_true', 'bearing_deg_mag', 'bearing_to_dest',
+    'bearing_pres_dest', 'heading_to_dest', 'dest_true_bearing',
+    # Distances, depths and heights
+    'antenna_altitude', 'altitude', 'geo_sep', 'feet', 'meters', 'fathoms',
+    'circle_rad', 'cross_track_err_mag', 'cross_track_error',
+    'cross_track_err_dist', 'nautical_miles', 'range_next', 'dest_range',
+    'dist_nautical_miles', 'dist_km', 'update_dist',
+    # Satellites and accuracy
+    'num_sats', 'horizontal_dil', 'pdop', 'hdop', 'vdop', 'num_sv_in_view',
+    'elevation_deg_1', 'elevation_deg_2', 'elevation_deg_3',
+    'elevation_deg_4', 'azimuth_1', 'azimuth_2', 'azimuth_3', 'azimuth_4',
+    'snr_1', 'snr_2', 'snr_3', 'snr_4', 'hpe', 'vpe', 'osepe', 'ele_angle',
+    'num_iterations', 'num_doppler_intervals', 'age_gps_data',
+    # Counts and parts of dates
+    'num_messages', 'msg_num', 'total_num_msgs', 'day', 'month', 'year',
+    'local_zone', 'local_zone_minutes'])
+
+
+def parse_columns(stream_obj=None, data=None, sen_types=None, validate=False,
+                  use_numpy=None, size=65536):
+    """ Read every sentence from stream_obj (a file like object giving text
+        or bytes) or data and return a dict of tables, keyed on sentence type.
+        The columns of each table are the fields of that type's parse_map.
+
+        With numpy, each table is a structured array with one named field per
+        column. Without it (or with use_numpy=False) each table is a dict of
+        columns, keyed on field name, in parse_map order.
+
+        Each field has the same type whatever the data: the fields in
+        NUMBER_FIELDS are float (numpy.float64 or array('d')), with NaN for
+        values that are empty or not numbers, and the rest are text, left as
+        it was. Rows are converted a batch at a time, so only one batch of
+        text is held in memory per type.
+
+        Only the types in sen_types are kept, if it is given. Unknown types,
+        and types whose sentences hold variable length lists (GPR00, GPRTE),
+        are skipped. If validate is True, sentences without a correct checksum
+        are dropped.
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ImportError('use_numpy needs numpy to be installed')
+    if sen_types is not None:
+        sen_types = set(sen_types)
+
+    # A _Table for each sentence type, or None for types to skip
+    tables = {}
+    for nmea_str in _iter_strings(stream_obj, data, size, sen_types):
+        if validate and not verify_checksum(nmea_str):
+            continue
+        if not isinstance(nmea_str, str):
+            nmea_str = nmea_str.decode('latin-1')
+        star = nmea_str.rfind('*')
+        if star > nmea_str.rfind(','):
+            nmea_str = nmea_str[:star]
+        parts = nmea_str.split(',')
+
+        try:
+            table = tables[parts[0]]
+        except KeyError:
+            table = tables[parts[0]] = _new_table(parts[0], sen_types,
+                                                  use_numpy)
+        if table is not None:
+            table.add(parts)
+
+    return dict((sen_type, table.result())
+                for sen_type, table in tables.items()
+                if table is not None and table.length)
+
+
+def _iter_strings(stream_obj, data, size, sen_types):
+    """ Yield sentences from stream_obj or data, of sen_types only if it is
+        given. Data is fed through a slice at a time, rather than splitting
+        it all up at once.
+    """
+    streamer = NMEAStream(stream_obj, include=sen_types)
+    if data is None:
+        for nmea_str in streamer.iter_strings(size=size):
+            yield nmea_str
+        return
+
+    for start in range(0, len(data), size):
+        for nmea_str in streamer.get_strings(data=data[start:start + size]):
+            yield nmea_str
+    for nmea_str in streamer._flush():
+        yield nmea_str
+
+
+def _new_table(sen_type, sen_types, use_numpy):
+    """ Return a _Table to collect sen_type in, or None if the type is to be
+        skipped.
+    """
+    if sen_types is not None and sen_type not in sen_types:
+        return None
+    sen_class = SENTENCE_TYPES.get(sen_type)
+    if sen_class is None or sen_class.parse is not NMEASentence.parse:
+        # Unknown, or not one field per column
+        return None
+    return _Table(sen_class._fields, use_numpy)
+
+
+class _Table(object):
+    """ The columns for one sentence type, built up a batch at a time
+    """
+    def __init__(self, fields, use_numpy):
+        self.fields = fields
+        self.use_numpy = use_numpy
+        self.length = 0
+        self.rows = []
+        self.columns = [_Column(name in NUMBER_FIELDS, use_numpy)
+                        for name in fields]
+
+    def add(self, parts):
+        """ Add the split up fields of one sentence (type first) """
+        if len(parts) <= len(self.fields):
+            parts.extend([''] * (len(self.fields) + 1 - len(parts)))
+        self.rows.append(parts)
+        self.length += 1
+        if len(self.rows) >= BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        """ Convert the rows held as text and add them to the columns """
+        if not self.rows:
+            return
+        # Longer rows are cut short by zip
+        values = zip(*self.rows)
+        next(values)
+        for column, column_values in zip(self.columns, values):
+            column.add(column_values)
+        self.rows = []
+
+    def result(self):
+        self.flush()
+        columns = [(name, column.result())
+                   for name, column in zip(self.fields, self.columns)]
+        if not self.use_numpy:
+            return dict(columns)
+        table = numpy.empty(self.length, dtype=[(name, column.dtype)
+                                                for name, column in columns])
+        for name, column in columns:
+            table[name] = column
+        return table
+
+
+class _Column(object):
+    """ One column, as a list of converted batches. Columns of numbers are
+        float (numpy.float64 or array('d')), anything else is text.
+    """
+    def __init__(self, number, use_numpy):
+        if use_numpy:
+            self._convert = _numpy_floats if number else numpy.array
+        else:
+            self._convert = _python_floats if number else list
+        self.number = number
+        self.use_numpy = use_numpy
+        self.pieces = []
+
+    def add(self, values):
+        self.pieces.append(self._convert(values))
+
+    def result(self):
+        if self.use_numpy:
+            return numpy.concatenate(self.pieces)
+        column = self.pieces[0]
+        for piece in self.pieces[1:]:
+            column.extend(piece)
+        return column
+
+
+def _float(value):
+    """ value as a float, or NaN if it is empty or not a number """
+    try:
+        return float(value)
+    except ValueError:
+        return _NAN
+
+
+def _python_floats(values):
+    """ values as an array('d'), with NaN for anything that isn't a number
+    """
+    try:
+        return array.array('d', [float(value) if value else _NAN
+                                 for value in values])
+    except ValueError:
+        return array.array('d', [_float(value) for value in values])
+
+
+def _numpy_floats(values):
+    """ As _python_floats, giving a numpy array """
+    column = numpy.array(values)
+    try:
+        return numpy.where(column == '', 'nan', column).astype(numpy.float64)
+    except ValueError:
+        return numpy.array([_float(value) for value in values],
+                           dtype=numpy.float64)
@@ -3,4 +3,12 @@
 
 class NoDataGivenError(Exception):
     def __init__(self, message):
-        self.message = message
\ No newline at end of file
+        self.message = message
+
+
+class UnknownSentenceTypeError(Exception):
+    """ Raised when a sentence type has no class registered for it
+    """
+    def __init__(self, message, sen_type=None):
+        self.message = message
+        self.sen_type = sen_type
@@ -0,0 +1,538 @@
+""" Make up realistic NMEA data from a simulated vessel, for testing and
+    benchmarking. The same seed and settings always give the same data.
+"""
+import datetime
+import io
+import math
+import random
+
+from pynmea.utils import _TEXT, checksum_calc
+
+
+# Sentences per fix, by type. GPGSV counts whole sets of GSV sentences.
+DEFAULT_MIX = (('GPRMC', 1), ('GPGGA', 1), ('GPGSA', 1), ('GPGSV', 1),
+               ('GPGLL', 1), ('GPVTG', 1), ('GPZDA', 0.2))
+
+CORRUPTIONS = ('checksum', 'truncate', 'join', 'noise')
+
+_START = datetime.datetime(2010, 4, 21, 18, 43, 32)
+
+
+def _to_text(data):
+    """ data as text. On Python 2, where the sentences are made as str
+        (bytes), they have to be decoded for io's text files and StringIO,
+        which only take unicode.
+    """
+    if isinstance(data, _TEXT):
+        return data
+    return data.decode('latin-1')
+
+
+def _format_degrees(degrees, width):
+    """ Unsigned decimal degrees as degrees (width digits) then minutes to 4
+        places. The minutes are rounded in ten thousandths before being
+        split off, so that one that rounds up to 60 carries into the degrees
+        rather than coming out as 60.0000.
+    """
+    whole, minutes = divmod(int(round(degrees * 600000)), 600000)
+    return '%0*d%02d.%04d' % ((width, whole) + divmod(minutes, 10000))
+
+
+def _format_lat(degrees):
+    """ Signed decimal degrees as ddmm.mmmm and N or S """
+    direction = 'N' if degrees >= 0 else 'S'
+    return _format_degrees(abs(degrees), 2), direction
+
+
+def _format_lon(degrees):
+    """ Signed decimal degrees as dddmm.mmmm and E or W """
+    direction = 'E' if degrees >= 0 else 'W'
+    return _format_degrees(abs(degrees), 3), direction
+
+
+def _course_to(lat, lon, to_lat, to_lon):
+    """ (bearing in degrees true, distance in nautical miles) from one point
+        to another. Flat earth, which is plenty for the short legs made up
+        here.
+    """
+    north = (to_lat - lat) * 60
+    east = (to_lon - lon) * 60 * math.cos(math.radians((lat + to_lat) / 2))
+    bearing = math.degrees(math.atan2(east, north)) % 360
+    return bearing, math.hypot(north, east)
+
+
+class NMEAGenerator(object):
+    """ Generates sentences from a simulated vessel sailing a route of
+        waypoints, with a set of satellites overhead.
+
+        seed: anything random.Random accepts. Everything that comes out is
+            decided by the seed and the settings below.
+        rate: fixes per second. The simulated clock moves on 1/rate seconds
+            for each fix.
+        mix: the sentences to give for each fix, as (sentence type, number
+            per fix) pairs or a dict. Fractions spread a type out, so 0.2 is
+            one every five fixes. 'all' gives one of every type known here.
+        talkers: talker IDs to use in place of GP, picked at random for each
+            sentence (GN, GL and so on). Proprietary sentences are left alone.
+        corruption: the fraction of sentences (0 to 1) to damage, in one of
+            the ways in CORRUPTIONS: a wrong checksum, cut short, run into the
+            next sentence or with junk in front.
+        start: a datetime for the first fix, taken as UTC.
+        lat, lon: where the vessel starts, in decimal degrees.
+    """
+    def __init__(self, seed=0, rate=1.0, mix=DEFAULT_MIX, talkers=('GP',),
+                 corruption=0.0, start=_START, lat=-19.4910, lon=24.1730):
+        if mix == 'all':
+            mix = [(sen_type, 1) for sen_type in sorted(SENTENCE_FORMATS)]
+        elif isinstance(mix, dict):
+            mix = list(mix.items())
+        for sen_type, _ in mix:
+            if sen_type not in SENTENCE_FORMATS:
+                raise ValueError('No format for %r' % (sen_type,))
+        if not 0 <= corruption <= 1:
+            raise ValueError('corruption must be between 0 and 1')
+
+        self.random = random.Random(seed)
+        self.interval = datetime.timedelta(seconds=1.0 / rate)
+        self.mix = [(sen_type, float(per_fix)) for sen_type, per_fix in mix]
+        self.talkers = tuple(talkers)
+        self.corruption = corruption
+
+        self.time = start
+        self.lat = lat
+        self.lon = lon
+        self.speed = 6.0 + self.random.uniform(-1, 1)
+        self.course = self.random.uniform(0, 360)
+        self.variation = round(self.random.uniform(-10, 10), 1)
+        self.altitude = 100.0
+        self.depth = 20.0
+        self.hdop = 1.2
+
+        self._make_route()
+        self._make_satellites()
+        self._owed = dict((sen_type, 0.0) for sen_type, _ in self.mix)
+        self._almanac = 0
+
+    def _make_route(self):
+        """ A route of waypoints, roughly ahead of the vessel """
+        self.waypoints = []
+        lat, lon, course = self.lat, self.lon, self.course
+        for number in range(6):
+            course = (course + self.random.uniform(-60, 60)) % 360
+            leg = self.random.uniform(0.5, 2.0) / 60
+            lat += leg * math.cos(math.radians(course))
+            lon += (leg * math.sin(math.radians(course)) /
+                    math.cos(math.radians(lat)))
+            self.waypoints.append(('WP%03d' % (number + 1), lat, lon))
+        self.leg = 0
+        self.origin = ('START', self.lat, self.lon)
+
+    def _make_satellites(self):
+        prns = sorted(self.random.sample(range(1, 33), 12))
+        self.satellites = [[prn, self.random.uniform(5, 85),
+                            self.random.uniform(0, 360),
+                            self.random.uniform(20, 48)] for prn in prns]
+
+    # ------------------------------------------------------------------ #
+    # Simulation
+    # ------------------------------------------------------------------ #
+    @property
+    def destination(self):
+        return self.waypoints[self.leg]
+
+    def _to_destination(self):
+        _, to_lat, to_lon = self.destination
+        return _course_to(self.lat, self.lon, to_lat, to_lon)
+
+    def _cross_track(self):
+        """ Cross track error in nautical miles, and the side to steer to
+            correct it (L or R)
+        """
+        _, from_lat, from_lon = self.origin
+        _, to_lat, to_lon = self.destination
+        leg_bearing, _ = _course_to(from_lat, from_lon, to_lat, to_lon)
+        bearing, distance = _course_to(from_lat, from_lon, self.lat, self.lon)
+        error = distance * math.sin(math.radians(bearing - leg_bearing))
+        return abs(error), 'L' if error > 0 else 'R'
+
+    def step(self):
+        """ Move the simulation on by one fix """
+        seconds = self.interval.total_seconds()
+        self.time += self.interval
+
+        bearing, distance = self._to_destination()
+        if distance < 0.05:
+            # Arrived; head for the next waypoint
+            self.origin = self.destination
+            self.leg = (self.leg + 1) % len(self.waypoints)
+            bearing, distance = self._to_destination()
+        turn = (bearing - self.course + 180) % 360 - 180
+        self.course = (self.course + max(-10, min(10, turn)) * seconds +
+                       self.random.gauss(0, 1)) % 360
+        self.speed = max(0.5, min(12.0, self.speed +
+                                  self.random.gauss(0, 0.1)))
+
+        moved = self.speed * seconds / 3600 / 60
+        self.lat += moved * math.cos(math.radians(self.course))
+        self.lon += (moved * math.sin(math.radians(self.course)) /
+                     math.cos(math.radians(self.lat)))
+        self.altitude += self.random.gauss(0, 0.2)
+        self.depth = max(2.0, self.depth + self.random.gauss(0, 0.3))
+        self.hdop = max(0.6, min(5.0, self.hdop + self.random.gauss(0, 0.05)))
+
+        # Satellites wander slowly, so once a second is plenty
+        if self.time.second != (self.time - self.interval).second:
+            uniform = self.random.uniform
+            for satellite in self.satellites:
+                satellite[1] = max(0.0, min(90.0, satellite[1] +
+                                            uniform(-0.02, 0.02)))
+                satellite[2] = (satellite[2] + 0.004) % 360
+                satellite[3] = max(0.0, min(55.0, satellite[3] +
+                                            uniform(-1, 1)))
+
+    # ------------------------------------------------------------------ #
+    # Output
+    # ------------------------------------------------------------------ #
+    def iter_sentences(self):
+        """ Yield sentences (as text, each ending with \\r\\n) forever """
+        while True:
+            for sentence in self.fix():
+                yield sentence
+
+    def fix(self):
+        """ Return the sentences for one fix, as a list of text lines, then
+            move the simulation on.
+        """
+        lines = []
+        for sen_type, per_fix in self.mix:
+            owed = self._owed[sen_type] + per_fix
+            while owed >= 1:
+                owed -= 1
+                for fields in SENTENCE_FORMATS[sen_type](self):
+                    lines.append(self._sentence(sen_type, fields))
+            self._owed[sen_type] = owed
+        self.step()
+        return lines
+
+    def _sentence(self, sen_type, fields):
+        if sen_type.startswith('GP') and self.talkers != ('GP',):
+            sen_type = self.random.choice(self.talkers) + sen_type[2:]
+        body = ','.join([sen_type] + fields)
+        line = '$%s*%s\r\n' % (body, checksum_calc(body))
+        if self.corruption and self.random.random() < self.corruption:
+            line = self._corrupt(line)
+        return line
+
+    def _corrupt(self, line):
+        how = self.random.choice(CORRUPTIONS)
+        if how == 'checksum':
+            # Change a character, leaving the checksum as it was
+            at = self.random.randrange(1, line.index('*'))
+            changed = '0' if line[at] != '0' else '1'
+            return line[:at] + changed + line[at + 1:]
+        if how == 'truncate':
+            return line[:self.random.randrange(1, len(line) - 2)] + '\r\n'
+        if how == 'join':
+            return line[:-2]
+        junk = ''.join(self.random.choice('ABCXYZ0123456789,.*\r\n')
+                       for _ in range(self.random.randrange(1, 20)))
+        return junk + line
+
+    def generate(self, size):
+        """ Return as many whole sentences as fit in size characters, as one
+            string.
+        """
+        lines = []
+        total = 0
+        for line in self.iter_sentences():
+            total += len(line)
+            if total > size:
+                break
+            lines.append(line)
+        return ''.join(lines)
+
+    def stream(self, size, binary=False):
+        """ As generate, but return an in memory file object (io.BytesIO if
+            binary, io.StringIO otherwise) positioned at the start.
+        """
+        data = self.generate(size)
+        if binary:
+            return io.BytesIO(data.encode('latin-1'))
+        return io.StringIO(_to_text(data), newline='')
+
+    def write(self, file_obj, size, batch=1000):
+        """ Write as many whole sentences as fit in size characters to
+            file_obj (opened for text), a batch of sentences at a time so
+            that memory use stays small however big size is. Returns the
+            number of characters written.
+        """
+        total = 0
+        lines = []
+        for line in self.iter_sentences():
+            if total + len(line) > size:
+                break
+            total += len(line)
+            lines.append(line)
+            if len(lines) >= batch:
+                file_obj.write(_to_text(''.join(lines)))
+                lines = []
+        file_obj.write(_to_text(''.join(lines)))
+        return total
+
+    def write_file(self, path, size):
+        """ Write size characters (bytes) worth of sentences to a new file
+            at path. Returns the number written.
+        """
+        with io.open(path, 'w', encoding='latin-1', newline='') as out_fd:
+            return self.write(out_fd, size)
+
+
+# ---------------------------------------------------------------------- #
+# The fields of each sentence type, as lists of text. Each function returns
+# a list of sentences, as most types give one sentence at a time but some
+# (GPGSV) give a set.
+# ---------------------------------------------------------------------- #
+def _time(gen):
+    return gen.time.strftime('%H%M%S.') + '%02d' % (
+        gen.time.microsecond // 10000)
+
+
+def _date(gen):
+    return gen.time.strftime('%d%m%y')
+
+
+def _position(gen, lat=None, lon=None):
+    lat_text, lat_dir = _format_lat(gen.lat if lat is None else lat)
+    lon_text, lon_dir = _format_lon(gen.lon if lon is None else lon)
+    return [lat_text, lat_dir, lon_text, lon_dir]
+
+
+def _magnetic(gen, bearing):
+    return '%.1f' % ((bearing - gen.variation) % 360)
+
+
+def _variation(gen):
+    return ['%.1f' % abs(gen.variation), 'E' if gen.variation >= 0 else 'W']
+
+
+def _arrived(gen):
+    return 'A' if gen._to_destination()[1] < 0.1 else 'V'
+
+
+def _used_satellites(gen):
+    return [satellite for satellite in gen.satellites
+            if satellite[1] > 10 and satellite[3] > 25]
+
+
+def _gpaam(gen):
+    return [[_arrived(gen), 'V', '0.10', 'N', gen.destination[0]]]
+
+
+def _gpalm(gen):
+    index = gen._almanac % len(gen.satellites)
+    gen._almanac += 1
+    r = gen.random
+    return [[str(len(gen.satellites)), str(index + 1),
+             '%02d' % gen.satellites[index][0], '1572', '00',
+             '%04X' % r.randrange(0x10000), '%02X' % r.randrange(0x100),
+             '%04X' % r.randrange(0x10000), '%04X' % r.randrange(0x10000),
+             '%06X' % r.randrange(0x1000000), '%06X' % r.randrange(0x1000000),
+             '%06X' % r.randrange(0x1000000), '%06X' % r.randrange(0x1000000),
+             '%03X' % r.randrange(0x1000), '%03X' % r.randrange(0x1000)]]
+
+
+def _autopilot(gen):
+    error, steer = gen._cross_track()
+    bearing, _ = _leg(gen)
+    return ['A', 'A', '%.2f' % error, steer, 'N', _arrived(gen), 'V',
+            '%.1f' % bearing, 'T', gen.destination[0]]
+
+
+def _leg(gen):
+    """ Bearing and distance from the origin waypoint to the destination """
+    _, from_lat, from_lon = gen.origin
+    _, to_lat, to_lon = gen.destination
+    return _course_to(from_lat, from_lon, to_lat, to_lon)
+
+
+def _gpapa(gen):
+    return [_autopilot(gen)]
+
+
+def _gpapb(gen):
+    bearing, _ = gen._to_destination()
+    return [_autopilot(gen) + ['%.1f' % bearing, 'T', '%.1f' % bearing, 'T']]
+
+
+def _gpbec(gen):
+    name, lat, lon = gen.destination
+    bearing, distance = gen._to_destination()
+    return [[_time(gen)] + _position(gen, lat, lon) + [
+        '%.1f' % bearing, 'T', _magnetic(gen, bearing), 'M',
+        '%.1f' % distance, 'N', name, 'D']]
+
+
+def _gpbod(gen):
+    bearing, _ = _leg(gen)
+    return [['%.1f' % bearing, 'T', _magnetic(gen, bearing), 'M',
+             gen.destination[0], gen.origin[0]]]
+
+
+def _gpbwc(gen):
+    name, lat, lon = gen.destination
+    bearing, distance = gen._to_destination()
+    return [[_time(gen)] + _position(gen, lat, lon) + [
+        '%.1f' % bearing, 'T', _magnetic(gen, bearing), 'M',
+        '%.1f' % distance, 'N', name]]
+
+
+# The same fields, but for a rhumb line rather than a great circle
+_gpbwr = _gpbwc
+
+
+def _gpbww(gen):
+    bearing, _ = _leg(gen)
+    return [['%.1f' % bearing, 'T', _magnetic(gen, bearing), 'M',
+             gen.destination[0], gen.origin[0]]]
+
+
+def _gpdbt(gen):
+    return [['%.1f' % (gen.depth * 3.28084), 'f', '%.1f' % gen.depth, 'M',
+             '%.1f' % (gen.depth * 0.546807), 'F']]
+
+
+def _gpgga(gen):
+    return [[_time(gen)] + _position(gen) + [
+        '1', '%02d' % len(_used_satellites(gen)), '%.1f' % gen.hdop,
+        '%.1f' % gen.altitude, 'M', '-33.9', 'M', '', '0000']]
+
+
+def _gpgll(gen):
+    return [_position(gen) + [_time(gen), 'A']]
+
+
+def _gpgsa(gen):
+    used = ['%02d' % satellite[0] for satellite in _used_satellites(gen)]
+    used = (used + [''] * 12)[:12]
+    return [['A', '3'] + used + ['%.1f' % (gen.hdop * 1.6),
+                                 '%.1f' % gen.hdop,
+                                 '%.1f' % (gen.hdop * 1.3)]]
+
+
+def _gpgsv(gen):
+    in_view = [satellite for satellite in gen.satellites if satellite[1] > 0]
+    messages = max(1, (len(in_view) + 3) // 4)
+    sentences = []
+    for number in range(messages):
+        fields = [str(messages), str(number + 1), '%02d' % len(in_view)]
+        for prn, elevation, azimuth, snr in in_view[number * 4:
+                                                    number * 4 + 4]:
+            fields += ['%02d' % prn, '%02d' % elevation, '%03d' % azimuth,
+                       '%02d' % snr]
+        sentences.append(fields)
+    return sentences
+
+
+def _gphdg(gen):
+    return [[_magnetic(gen, gen.course), '0.0', 'E'] + _variation(gen)]
+
+
+def _gphdt(gen):
+    return [['%.1f' % gen.course, 'T']]
+
+
+def _gpr00(gen):
+    return [[waypoint[0] for waypoint in gen.waypoints]]
+
+
+def _gprma(gen):
+    return [['A'] + _position(gen) + ['', '', '%.1f' % gen.speed,
+                                      '%.1f' % gen.course] + _variation(gen)]
+
+
+def _gprmb(gen):
+    name, lat, lon = gen.destination
+    bearing, distance = gen._to_destination()
+    error, steer = gen._cross_track()
+    closing = gen.speed * math.cos(math.radians(bearing - gen.course))
+    return [['A', '%.2f' % error, steer, gen.origin[0], name] +
+            _position(gen, lat, lon) +
+            ['%.1f' % distance, '%.1f' % bearing, '%.1f' % closing,
+             _arrived(gen)]]
+
+
+def _gprmc(gen):
+    return [[_time(gen), 'A'] + _position(gen) + [
+        '%.1f' % gen.speed, '%.1f' % gen.course, _date(gen)] +
+        _variation(gen)]
+
+
+def _gprte(gen):
+    return [['1', '1', 'c', '0'] + [waypoint[0]
+                                    for waypoint in gen.waypoints]]
+
+
+def _gpstn(gen):
+    return [['00']]
+
+
+def _gptrf(gen):
+    r = gen.random
+    return [[_time(gen), _date(gen)] + _position(gen) + [
+        '%.1f' % r.uniform(10, 80), str(r.randrange(1, 10)),
+        str(r.randrange(5, 30)), '%.1f' % r.uniform(0, 5),
+        '%02d' % gen.satellites[0][0]]]
+
+
+def _gpvbw(gen):
+    return [['%.1f' % gen.speed, '0.0', 'A', '%.1f' % gen.speed, '0.0', 'A']]
+
+
+def _gpvtg(gen):
+    return [['%.1f' % gen.course, 'T', _magnetic(gen, gen.course), 'M',
+             '%.1f' % gen.speed, 'N', '%.1f' % (gen.speed * 1.852), 'K']]
+
+
+def _gpwcv(gen):
+    bearing, _ = gen._to_destination()
+    closing = gen.speed * math.cos(math.radians(bearing - gen.course))
+    return [['%.1f' % closing, 'N', gen.destination[0]]]
+
+
+def _gpwnc(gen):
+    _, distance = _leg(gen)
+    return [['%.1f' % distance, 'N', '%.1f' % (distance * 1.852), 'K',
+             gen.origin[0], gen.destination[0]]]
+
+
+def _gpwpl(gen):
+    name, lat, lon = gen.destination
+    return [_position(gen, lat, lon) + [name]]
+
+
+def _gpxte(gen):
+    error, steer = gen._cross_track()
+    return [['A', 'A', '%.2f' % error, steer, 'N']]
+
+
+def _gpzda(gen):
+    return [[_time(gen), gen.time.strftime('%d'), gen.time.strftime('%m'),
+             gen.time.strftime('%Y'), '00', '00']]
+
+
+def _pgrme(gen):
+    return [['%.1f' % (gen.hdop * 4), 'M', '%.1f' % (gen.hdop * 6), 'M',
+             '%.1f' % (gen.hdop * 7), 'M']]
+
+
+def _pgrmm(gen):
+    return [['WGS 84']]
+
+
+def _pgrmz(gen):
+    return [['%d' % (gen.altitude * 3.28084), 'f', '3']]
+
+
+SENTENCE_FORMATS = dict(
+    (name[1:].upper(), func) for name, func in list(globals().items())
+    if name.startswith(('_gp', '_pgrm')) and callable(func))
@@ -0,0 +1,268 @@
+""" A sidecar index for NMEA log files, for finding sentences of given types
+    or from a given time without reading the whole log.
+"""
+import collections
+import datetime
+import json
+import os
+
+from pynmea.exceptions import UnknownSentenceTypeError
+from pynmea.nmea import SENTENCE_TYPES, parse
+from pynmea.streamer import NMEAStream
+from pynmea.utils import timestamp_seconds
+
+
+INDEX_VERSION = 1
+
+# One block of the log. offset and end are byte offsets into the log file.
+# prev_time is the last timestamp seen before the block, min_time and
+# max_time are the range of timestamps in it (all in seconds since midnight,
+# or None) and types is a bitmap of the sentence types it holds.
+IndexBlock = collections.namedtuple(
+    'IndexBlock', 'offset end prev_time min_time max_time types')
+
+
+def _timestamp_seconds(raw):
+    """ Turn a hhmmss.ss timestamp field into seconds since midnight.
+        Returns None if it isn't one.
+    """
+    try:
+        return timestamp_seconds(raw)
+    except ValueError:
+        return None
+
+
+def _to_seconds(value):
+    """ Accept a time to query on as seconds since midnight, a
+        datetime.time or a hhmmss string.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, datetime.time):
+        return (value.hour * 3600 + value.minute * 60 + value.second +
+                value.microsecond / 1e6)
+    seconds = _timestamp_seconds(value)
+    if seconds is None:
+        raise ValueError('Not a time: %r' % (value,))
+    return seconds
+
+
+class LogIndex(object):
+    """ Index of an NMEA log file, kept in a JSON file alongside it.
+
+        The log is split into blocks of around block_size bytes, starting on
+        sentence boundaries. For each block the index records where it is,
+        the range of UTC times (taken from the timestamp field of sentences
+        such as GPRMC, GPGGA and GPZDA) and which sentence types it holds.
+        Queries only read the blocks that can match.
+
+        Times are times of day, so a log that runs past midnight will match
+        a time query on either day.
+    """
+    def __init__(self, log_path, index_path=None, block_size=65536):
+        """ Loads the index from index_path (the log path with .idx added, by
+            default) if it exists. Call update() to bring it up to date with
+            the log.
+        """
+        self.log_path = log_path
+        self.index_path = index_path or log_path + '.idx'
+        self.block_size = block_size
+        self._clear()
+
+        if os.path.exists(self.index_path):
+            self.load()
+
+    def _clear(self):
+        self.types = []
+        self.blocks = []
+        self.size = 0
+
+    def load(self):
+        """ Read the index from index_path
+        """
+        with open(self.index_path, 'r') as index_fd:
+            saved = json.load(index_fd)
+        if saved.get('version') != INDEX_VERSION:
+            # Written by something else; start again
+            self._clear()
+            return
+        self.block_size = saved['block_size']
+        self.types = saved['types']
+        self.blocks = [IndexBlock(*block) for block in saved['blocks']]
+        self.size = saved['size']
+
+    def save(self):
+        """ Write the index to index_path
+        """
+        saved = {'version': INDEX_VERSION,
+                 'block_size': self.block_size,
+                 'types': self.types,
+                 'blocks': [list(block) for block in self.blocks],
+                 'size': self.size}
+        with open(self.index_path, 'w') as index_fd:
+            json.dump(saved, index_fd)
+
+    def update(self):
+        """ Index anything added to the log since the last update and save
+            the index. If the log has shrunk, it is indexed from scratch.
+            A sentence still being written at the end of the log is left for
+            the next update. Returns the number of blocks added.
+        """
+        log_size = os.path.getsize(self.log_path)
+        if log_size < self.size:
+            self._clear()
+
+        added = 0
+        with open(self.log_path, 'rb') as log_fd:
+            log_fd.seek(self.size)
+            tail = b''
+            while True:
+                read_data = log_fd.read(self.block_size)
+                data = tail + read_data
+                if not read_data:
+                    # Only a sentence followed by a line break is complete
+                    end = data.rfind(b'\n') + 1
+                else:
+                    end = data.rfind(b'$')
+                    if end <= 0:
+                        # Keep going until there is a sentence boundary
+                        tail = data
+                        continue
+                if end:
+                    self._add_block(data[:end])
+                    added += 1
+                tail = data[end:]
+                if not read_data:
+                    break
+
+        self.save()
+        return added
+
+    def _add_block(self, data):
+        """ Record the block data, which starts at self.size in the log
+        """
+        if self.blocks:
+            last = self.blocks[-1]
+            prev_time = last.max_time
+            if prev_time is None:
+                prev_time = last.prev_time
+        else:
+            prev_time = None
+
+        min_time = max_time = None
+        type_bits = 0
+        for sentence in data.split(b'$'):
+            parts = sentence.split(b',', 2)
+            if len(parts) < 2:
+                continue
+            sen_type = parts[0].decode('latin-1')
+            type_bits |= 1 << self._type_bit(sen_type)
+
+            seconds = self._sentence_time(sen_type, sentence)
+            if seconds is not None:
+                if min_time is None or seconds < min_time:
+                    min_time = seconds
+                if max_time is None or seconds > max_time:
+                    max_time = seconds
+
+        self.blocks.append(IndexBlock(self.size, self.size + len(data),
+                                      prev_time, min_time, max_time,
+                                      type_bits))
+        self.size += len(data)
+
+    def _type_bit(self, sen_type):
+        try:
+            return self.types.index(sen_type)
+        except ValueError:
+            self.types.append(sen_type)
+            return len(self.types) - 1
+
+    def _sentence_time(self, sen_type, sentence):
+        """ Seconds since midnight from the timestamp field of a raw sentence
+            (without the $), if its type has one.
+        """
+        sen_class = SENTENCE_TYPES.get(sen_type)
+        if sen_class is None:
+            return None
+        index = sen_class._field_index.get('timestamp')
+        if index is None:
+            return None
+        parts = sentence.split(b',', index + 1)
+        if len(parts) <= index:
+            return None
+        return _timestamp_seconds(parts[index].partition(b'*')[0])
+
+    def _type_mask(self, sen_types):
+        mask = 0
+        for sen_type in sen_types:
+            if sen_type in self.types:
+                mask |= 1 << self.types.index(sen_type)
+        return mask
+
+    def find_blocks(self, sen_types=None, start=None, end=None):
+        """ Return the blocks that may hold sentences of any of sen_types
+            timed between start and end (inclusive). Times may be seconds
+            since midnight, datetime.time or hhmmss strings.
+        """
+        start = _to_seconds(start)
+        end = _to_seconds(end)
+        mask = self._type_mask(sen_types) if sen_types is not None else None
+
+        blocks = []
+        for block in self.blocks:
+            if mask is not None and not block.types & mask:
+                continue
+            if start is not None or end is not None:
+                times = [t for t in (block.prev_time, block.min_time,
+                                     block.max_time) if t is not None]
+                if not times:
+                    continue
+                if start is not None and max(times) < start:
+                    continue
+                if end is not None and min(times) > end:
+                    continue
+            blocks.append(block)
+        return blocks
+
+    def iter_strings(self, sen_types=None, start=None, end=None):
+        """ Yield the sentences (as bytes) of any of sen_types timed between
+            start and end. A sentence without a timestamp of its own is timed
+            by the last one before it. Only the blocks that may match are
+            read.
+        """
+        start_s = _to_seconds(start)
+        end_s = _to_seconds(end)
+        timed = start_s is not None or end_s is not None
+        if sen_types is not None:
+            sen_types = set(sen_types)
+
+        with open(self.log_path, 'rb') as log_fd:
+            for block in self.find_blocks(sen_types, start_s, end_s):
+                log_fd.seek(block.offset)
+                data = log_fd.read(block.end - block.offset)
+                current = block.prev_time
+                for sentence in NMEAStream().iter_strings(data=data):
+                    sen_type = sentence.partition(b',')[0].decode('latin-1')
+                    seconds = self._sentence_time(sen_type, sentence)
+                    if seconds is not None:
+                        current = seconds
+                    if sen_types is not None and sen_type not in sen_types:
+                        continue
+                    if timed:
+                        if current is None:
+                            continue
+                        if start_s is not None and current < start_s:
+                            continue
+                        if end_s is not None and current > end_s:
+                            continue
+                    yield sentence
+
+    def iter_objects(self, sen_types=None, start=None, end=None):
+        """ As iter_strings, but yield NMEA objects. Unrecognised sentences
+            are skipped.
+        """
+        for sentence in self.iter_strings(sen_types, start, end):
+            try:
+                yield parse(sentence)
+            except UnknownSentenceTypeError:
+                continue
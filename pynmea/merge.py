@@ -0,0 +1,166 @@
+""" Merge several streams of sentences, such as the logs of different
+    receivers, into one in time order
+"""
+import collections
+import heapq
+import math
+
+from pynmea.utils import timestamp_seconds
+
+
+# One sentence from a merge. epoch is the UTC time of the sentence, in
+# seconds from the midnight before the first timestamp read (see
+# merge_streams), or None if nothing before it had a time. source is the name or index the source was
+# given under.
+Merged = collections.namedtuple('Merged', 'epoch source nmea_ob')
+
+_DAY = 24 * 3600
+
+
+def _nearest_day(seconds, near):
+    """ seconds since some midnight, moved by whole days to be as close as
+        can be to the epoch near
+    """
+    return seconds + math.floor((near - seconds) / float(_DAY) + 0.5) * _DAY
+
+
+def merge_streams(sources, lookahead=100):
+    """ Merge sources into one iterator of Merged, in order of epoch.
+
+        sources is a dict of name to source, or a list of sources (named by
+        their index). A source may be an NMEAStream (or anything else with
+        iter_objects, which is used to read it) or any iterable of NMEA
+        objects. Each source is read a sentence at a time as the merge goes
+        on, so only one sentence from each (and the untimed sentences
+        waiting for a timestamp, see below) is held in memory however big
+        the sources are. Don't use streams that reuse their objects.
+
+        The time of a sentence comes from its timestamp field (GGA, RMC,
+        GLL, ZDA, ...). Sentences without one (HDT, DBT, ...) are given the
+        epoch of the last timestamp from the same source. If a source hasn't
+        given a timestamp yet, up to lookahead of them are held back to take
+        the epoch of the next one.
+
+        Past that, or for a source with no timestamps at all (a separate
+        heading or depth log, say), there is nothing to order them by, so
+        they are fed in alongside the timed sentences: one from each such
+        source after each timed sentence that comes out, with the epoch of
+        that sentence. Once the timed sentences run out, the rest come out
+        with the last epoch there was.
+
+        Timestamps are only times of day, so each is put on the day that
+        brings it nearest to the one before it: for the first from a source,
+        the latest epoch read from any source so far, and after that the
+        last from the same source. So a source that starts just after
+        midnight while the others are just before it comes out after them,
+        and a timestamp more than 12 hours behind the last one from its
+        source is on the next day. Epochs count from the midnight before the
+        first timestamp read, so a source that started the day before can
+        give epochs below 0.
+        Sentences with the same epoch come out in the order of the sources,
+        and the sentences of each source always come out in the order they
+        were read.
+    """
+    if isinstance(sources, dict):
+        named = list(sources.items())
+    else:
+        named = list(enumerate(sources))
+    # The latest epoch read from any source, shared between them
+    latest = [None]
+    return _merge([_iter_timed(name, source, lookahead, latest)
+                   for name, source in named])
+
+
+def _merge(timed_sources):
+    """ Merge iterators of Merged, each in order, as merge_streams. Those
+        whose next Merged has an epoch wait on a heap, keyed on the epoch
+        and their place in timed_sources; the rest wait in untimed.
+    """
+    heap = []
+    untimed = []
+    for order, timed in enumerate(timed_sources):
+        merged = next(timed, None)
+        if merged is None:
+            continue
+        if merged.epoch is None:
+            untimed.append((order, timed, merged))
+        else:
+            heap.append((merged.epoch, order, timed, merged))
+    heapq.heapify(heap)
+
+    last_epoch = None
+    while heap or untimed:
+        if heap:
+            epoch, order, timed, merged = heap[0]
+            if last_epoch is None or epoch > last_epoch:
+                last_epoch = epoch
+            yield merged
+            merged = next(timed, None)
+            if merged is not None and merged.epoch is not None:
+                # Usually the source stays on the heap
+                heapq.heapreplace(heap, (merged.epoch, order, timed, merged))
+            else:
+                heapq.heappop(heap)
+                if merged is not None:
+                    untimed.append((order, timed, merged))
+            if not untimed:
+                continue
+
+        waiting = untimed
+        untimed = []
+        for order, timed, merged in waiting:
+            yield merged._replace(epoch=last_epoch)
+            merged = next(timed, None)
+            if merged is None:
+                continue
+            if merged.epoch is None:
+                untimed.append((order, timed, merged))
+            else:
+                heapq.heappush(heap, (merged.epoch, order, timed, merged))
+
+
+def _iter_timed(name, source, lookahead, latest):
+    """ Yield a Merged for each NMEA object in source, with an epoch of None
+        for those that have no time to go by (which _merge then deals with).
+        latest holds the latest epoch read from any source, which the first
+        timestamp from this one is put nearest to.
+    """
+    if hasattr(source, 'iter_objects'):
+        source = source.iter_objects()
+
+    epoch = None
+    # Whole days added to the timestamps of this source
+    offset = 0
+    # Untimed objects from before the first timestamp
+    waiting = []
+    for nmea_ob in source:
+        try:
+            seconds = timestamp_seconds(getattr(nmea_ob, 'timestamp', None))
+        except ValueError:
+            seconds = None
+        if seconds is None:
+            if epoch is None:
+                waiting.append(nmea_ob)
+                if len(waiting) > lookahead:
+                    # No timestamp in sight
+                    for waiting_ob in waiting:
+                        yield Merged(None, name, waiting_ob)
+                    waiting = []
+                continue
+        else:
+            if epoch is None:
+                near = latest[0]
+                if near is not None:
+                    offset = _nearest_day(seconds, near) - seconds
+            elif abs(seconds + offset - epoch) > _DAY / 2:
+                offset = _nearest_day(seconds, epoch) - seconds
+            epoch = seconds + offset
+            if latest[0] is None or epoch > latest[0]:
+                latest[0] = epoch
+            for waiting_ob in waiting:
+                yield Merged(epoch, name, waiting_ob)
+            waiting = []
+        yield Merged(epoch, name, nmea_ob)
+
+    for waiting_ob in waiting:
+        yield Merged(None, name, waiting_ob)
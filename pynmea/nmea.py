@@ -1,61 +1,512 @@
+import datetime
+import operator
 import re
-from pynmea.utils import checksum_calc
+from pynmea.exceptions import UnknownSentenceTypeError
+from pynmea.utils import checksum_calc, split_timestamp
 
-class NMEASentence(object):
+
+_BYTES_CHKSUM_REGEX = re.compile(br"(?i).+((\*{1})(?P<chksum>[0-9a-f]{2}))$")
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+class _Unset(object):
+    """ The type of _UNSET. Pickling or copying it gives back _UNSET itself,
+        so cleared cached attributes stay cleared in copies of a sentence.
+    """
+    __slots__ = ()
+
+    def __reduce__(self):
+        return '_UNSET'
+
+    def __repr__(self):
+        return '_UNSET'
+
+
+# What a cached_attribute holds once it has been cleared
+_UNSET = _Unset()
+
+
+class _UTCZone(datetime.tzinfo):
+    """ UTC, for Pythons without datetime.timezone (2.7) """
+    def utcoffset(self, dt):
+        return datetime.timedelta(0)
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+    def tzname(self, dt):
+        return 'UTC'
+
+
+try:
+    _UTC = datetime.timezone.utc
+except AttributeError:
+    _UTC = _UTCZone()
+
+# What parsing bytes sets before any field is decoded
+_SPLIT_ONLY = ('parts', 'checksum')
+
+def _compile_parse_map(parse_map):
+    """ Turn a parse map into the tables used when parsing:
+        the attribute names in order, a mapping of attribute name to its index
+        in the sentence parts and a function that assigns all of the fields
+        from a list of parts in one go.
+    """
+    fields = tuple(item[1] for item in parse_map)
+    field_index = dict((name, index + 1) for index, name in enumerate(fields))
+
+    # Unpacking a slice straight into the attributes is many times faster
+    # than calling setattr for each field in turn.
+    if fields:
+        source = 'def assign(self, parts):\n    %s, = parts[1:%d]\n' % (
+            ', '.join('self.%s' % name for name in fields), len(fields) + 1)
+    else:
+        source = 'def assign(self, parts):\n    pass\n'
+    namespace = {}
+    exec(source, namespace)
+
+    return fields, field_index, namespace['assign']
+
+
+def _field_getter(fields):
+    """ A function that returns a tuple of the values of fields from an
+        object
+    """
+    if not fields:
+        return lambda obj: ()
+    if len(fields) == 1:
+        getter = operator.attrgetter(fields[0])
+        return lambda obj: (getter(obj),)
+    return operator.attrgetter(*fields)
+
+
+def _compile_projection(fields, field_index, names):
+    """ Turn a list of field names into what is needed to parse only those
+        fields: the index in the sentence parts of each of them and a
+        function that assigns them all from a list of parts.
+    """
+    indexes = []
+    for name in names:
+        if name not in field_index:
+            raise ValueError('No field called %r' % (name,))
+        indexes.append(field_index[name])
+
+    if names:
+        source = 'def assign(self, parts):\n    %s, = %s,\n' % (
+            ', '.join('self.%s' % name for name in names),
+            ', '.join('parts[%d]' % index for index in indexes))
+    else:
+        source = 'def assign(self, parts):\n    pass\n'
+    namespace = {}
+    exec(source, namespace)
+
+    return fields, tuple(indexes), namespace['assign']
+
+
+class cached_attribute(object):
+    """ A read only attribute worked out by func from the other attributes
+        the first time it is used, and kept for as long as the sentence is
+        not parsed again. Sentence classes keep the value in a slot of its
+        own.
+    """
+    def __init__(self, func, doc=None):
+        self.func = func
+        self.__doc__ = doc or func.__doc__
+        self.slot = None
+        self.name = None
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        try:
+            value = self.slot.__get__(obj)
+        except AttributeError:
+            value = _UNSET
+        if value is _UNSET:
+            try:
+                value = self.func(obj)
+            except AttributeError as exc:
+                # Let out as it is, it would be taken to mean there is no
+                # such attribute and the sentence's __getattr__ would hide it
+                raise RuntimeError('Working out %s: %s: %s' % (
+                    self.name, type(exc).__name__, exc))
+            self.slot.__set__(obj, value)
+        return value
+
+    def clear(self, obj):
+        """ Forget the value worked out for obj, if there is one """
+        # Cheaper than deleting it, which raises if there's nothing there
+        self.slot.__set__(obj, _UNSET)
+
+
+def _to_float(raw):
+    """ A numeric field as a float, or None if it is empty """
+    return float(raw) if raw else None
+
+
+def _to_degrees(raw, direction):
+    """ Turn a ddmm.mmmm (or dddmm.mmmm) field and its N/S/E/W direction
+        into signed decimal degrees. Returns None if the field is empty.
+    """
+    if not raw:
+        return None
+    value = float(raw)
+    degrees = int(value // 100)
+    degrees += (value - degrees * 100) / 60.0
+    if direction.upper() in ('S', 'W'):
+        degrees = -degrees
+    return degrees
+
+
+def _to_time(raw):
+    """ A hhmmss(.ss) field as a datetime.time in UTC, or None if it is empty
+    """
+    parts = split_timestamp(raw)
+    if parts is None:
+        return None
+    hours, minutes, seconds = parts
+    whole = int(seconds)
+    return datetime.time(hours, minutes, whole,
+                         int(round((seconds - whole) * 1e6)), tzinfo=_UTC)
+
+
+def _to_date(raw):
+    """ A ddmmyy field as a datetime.date, or None if it is empty. Two digit
+        years from 80 are taken to be 19xx, the rest 20xx.
+    """
+    if not raw:
+        return None
+    year = int(raw[4:6])
+    year += 1900 if year >= 80 else 2000
+    return datetime.date(year, int(raw[2:4]), int(raw[0:2]))
+
+
+def _float_attribute(name, doc):
+    return cached_attribute(lambda self: _to_float(getattr(self, name, '')),
+                            doc)
+
+
+def _degrees_attribute(name, dir_name):
+    return cached_attribute(
+        lambda self: _to_degrees(getattr(self, name, ''),
+                                 getattr(self, dir_name, '')),
+        """ %s in decimal degrees, negative for south or west """ % name)
+
+
+def _time_attribute(name='timestamp'):
+    return cached_attribute(
+        lambda self: _to_time(getattr(self, name, '')),
+        """ %s as a datetime.time in UTC """ % name)
+
+
+def _datetime_attribute(date_name, time_name='timestamp'):
+    def to_datetime(self):
+        date = _to_date(getattr(self, date_name, ''))
+        time = _to_time(getattr(self, time_name, ''))
+        if date is None or time is None:
+            return None
+        return datetime.datetime.combine(date, time)
+    return cached_attribute(
+        to_datetime, """ %s and %s as a datetime.datetime in UTC """ % (
+            date_name, time_name))
+
+
+class _SentenceType(type):
+    """ Metaclass for sentences. A class level parse_map is compiled once,
+        when the class is created, and its field names become __slots__ so
+        that instances don't need a __dict__. Each cached_attribute gets a
+        slot to keep its value in.
+    """
+    def __new__(mcs, name, bases, namespace):
+        cached = dict((key, value) for key, value in namespace.items()
+                      if isinstance(value, cached_attribute))
+        cache_slots = tuple('_cached_' + key for key in cached)
+        parse_map = namespace.get('parse_map')
+        if parse_map is None:
+            if cache_slots:
+                namespace['__slots__'] = (
+                    tuple(namespace.get('__slots__', ())) + cache_slots)
+        else:
+            fields, field_index, assign = _compile_parse_map(parse_map)
+            inherited = set()
+            for base in bases:
+                for klass in base.__mro__:
+                    inherited.update(getattr(klass, '__slots__', ()))
+            slots = tuple(namespace.get('__slots__', ()))
+            slots += tuple(field for field in fields
+                           if field not in inherited and field not in slots)
+            slots += cache_slots
+            namespace['__slots__'] = slots
+            namespace['_fields'] = fields
+            namespace['_field_index'] = field_index
+            namespace['_assign'] = staticmethod(assign)
+            namespace['_get_fields'] = staticmethod(_field_getter(fields))
+            # Field names -> _compile_projection of them, made as needed
+            namespace['_projections'] = {}
+
+        cls = super(_SentenceType, mcs).__new__(mcs, name, bases, namespace)
+        for key, attribute in cached.items():
+            attribute.slot = cls.__dict__['_cached_' + key]
+            attribute.name = key
+        cls._cached = tuple(getattr(cls, '_cached', ())) + tuple(
+            cached.values())
+        return cls
+
+
+_SentenceBase = _SentenceType('_SentenceBase', (object,), {'__slots__': ()})
+
+
+class NMEASentence(_SentenceBase):
     """ Base sentence class. This is used to pull apart a sentence.
         It will not have any real reference to what things mean. Things that
         subclass this base class should all the additional functionality.
-    """
 
-    def __init__(self, parse_map):
+        Subclasses declare their fields with a class level parse_map.
+        A parse_map may also be passed in when creating an instance, for ad
+        hoc use of this class or for older style subclasses.
+    """
+    # _assigned says which attributes parsing may have set, for _forget:
+    # None for none of them, True for all, or else a tuple of their names
+    __slots__ = ('sen_type', 'nmea_sentence', 'parts', 'checksum',
+                 '_assigned')
+    parse_map = ()
+
+    def __new__(cls, *args, **kwargs):
+        if cls is NMEASentence:
+            # Instances of the bare base class have no fields of their own,
+            # so they need a __dict__ to take whatever parse map is given.
+            cls = _AdHocSentence
+        return super(NMEASentence, cls).__new__(cls)
+
+    def __init__(self, parse_map=None):
         self.sen_type = None
-        self.parse_map = parse_map
+        if parse_map is not None and parse_map is not self.parse_map:
+            self.parse_map = parse_map
+            (self._fields, self._field_index,
+             self._assign) = _compile_parse_map(parse_map)
+            self._get_fields = _field_getter(self._fields)
 
     def _parse(self, nmea_str):
         """ Tear the sentence apart, grabbing the name on the way. Create a
             parts attribute on the class and fill in the sentence type in
             sen_type
         """
-        self.nmea_sentence = nmea_str
-        self.parts = nmea_str.split(',')
+        if not isinstance(nmea_str, str):
+            self._parse_bytes(nmea_str)
+            return
 
-        chksum_regex = re.compile(r".+((\*{1})(?i)(?P<chksum>[0-9a-f]{2}))$")
-        m = chksum_regex.match(nmea_str)
+        self.nmea_sentence = nmea_str
+        self.parts = parts = nmea_str.split(',')
+
+        # The same test as the old checksum regex, r"(?i).+\*[0-9a-f]{2}$",
+        # without the regex: a * and two hex digits at the end (or just
+        # before a final newline), with at least one character before them
+        # and no line break anywhere else.
+        body = nmea_str[:-1] if nmea_str[-1:] == '\n' else nmea_str
+        if (len(body) > 3 and body[-3] == '*' and body[-2] in _HEX_DIGITS
+                and body[-1] in _HEX_DIGITS and '\n' not in body):
+            self.checksum = body[-2:]
+            parts[-1] = parts[-1].rpartition('*')[0]
+
+        sen_type = parts[0]
+        if sen_type.startswith('$'):
+            sen_type = parts[0] = sen_type[1:]
+        self.sen_type = sen_type
+
+    def _parse_bytes(self, nmea_bytes):
+        """ As _parse, but for a sentence given as bytes or bytearray. Only
+            the sentence type and checksum are decoded, the fields are left as
+            bytes in parts until they are asked for.
+        """
+        nmea_bytes = bytes(nmea_bytes)
+        self.nmea_sentence = nmea_bytes
+        self.parts = nmea_bytes.split(b',')
 
+        m = _BYTES_CHKSUM_REGEX.match(nmea_bytes)
         if m:
-            self.checksum = m.groupdict()['chksum']
-            d, par, ck = self.parts.pop().rpartition('*')
-            self.parts.extend([d])
+            self.checksum = m.group('chksum').decode('ascii')
+            self.parts[-1] = self.parts[-1].rpartition(b'*')[0]
 
-        #if '*' in self.parts[-1]:
-            #d, par, ck = self.parts.pop().rpartition('*')
-            #self.parts.extend([d])
-
-        self.sen_type = self.parts[0]
-        if self.parts[0].startswith('$'):
+        if self.parts[0].startswith(b'$'):
             self.parts[0] = self.parts[0][1:]
-        self.sen_type = self.parts[0]
+        self.sen_type = self.parts[0].decode('latin-1')
 
-    def parse(self, nmea_str, ignore_err=False):
+    def parse(self, nmea_str, ignore_err=False, lazy=False, fields=None):
         """ Use the parse map. Parse map should be in the format:
             (('Field name', 'field_name'),
              ('Field name', 'field_name'))
 
              Where the first entry in the tuple is the human readable name
              and the second is the parameter name
+
+             nmea_str may also be bytes, in which case each field is only
+             decoded when it is first used.
+
+             If lazy is True, only the sentence type is found straight away.
+             The rest of the parsing is done the first time that parts,
+             checksum or any field is used, so objects that are only checked
+             for their type (or not used at all) cost much less.
+
+             If fields is given, a tuple (or list) of field names, only those
+             fields are split out of the sentence. Any other field, parts or
+             checksum is parsed lazily (as above) if it is used after all.
         """
+        reparse = self.sen_type is not None
+        if reparse:
+            if lazy or fields is not None or not isinstance(nmea_str, str):
+                # Nothing is going to replace the old fields straight away
+                self._reset()
+            else:
+                self._reset(('checksum',))
+
+        if fields is not None:
+            self._parse_fields(nmea_str, fields)
+            return
+
+        if lazy:
+            if not isinstance(nmea_str, str):
+                nmea_str = bytes(nmea_str)
+            self.nmea_sentence = nmea_str
+            self.sen_type = sentence_type(nmea_str)
+            self._assigned = None
+            return
 
         self._parse(nmea_str)
+        self._set_fields(self.parts)
+        if reparse and len(self.parts) <= len(self._fields):
+            # A short sentence, so the fields at the end are left over from
+            # the last one
+            self._forget(self._fields[len(self.parts) - 1:])
+
+    def _parse_fields(self, nmea_str, names):
+        """ Set sen_type and nmea_sentence and just the fields in names. The
+            sentence is only split as far as the last of them.
+        """
+        if not isinstance(names, tuple):
+            # A list, say, which can't be used as a key
+            names = tuple(names)
+        try:
+            fields, indexes, assign = self._projections[names]
+        except KeyError:
+            fields, indexes, assign = self._projections[names] = \
+                _compile_projection(self._fields, self._field_index, names)
+        if fields is not self._fields:
+            # A parse map given to this instance
+            fields, indexes, assign = _compile_projection(
+                self._fields, self._field_index, names)
+
+        last = max(indexes) if indexes else 0
+        if isinstance(nmea_str, str):
+            parts = nmea_str.split(',', last + 1)
+        else:
+            nmea_str = bytes(nmea_str)
+            parts = [part.decode('latin-1')
+                     for part in nmea_str.split(b',', last + 1)]
+        self.nmea_sentence = nmea_str
 
-        #assert len(self.parts[1:]) <= len(self.parse_map)
-        parts_len = len(self.parts) - 1
+        if len(parts) <= last + 1:
+            # Split all the way to the end, so the checksum is on the last
+            parts[-1] = parts[-1].partition('*')[0]
+        sen_type = parts[0]
+        self.sen_type = sen_type[1:] if sen_type.startswith('$') else sen_type
+
+        self._assigned = names
+        try:
+            assign(self, parts)
+        except IndexError:
+            # A short sentence. Leave out the fields it doesn't have.
+            for name, index in zip(names, indexes):
+                if index < len(parts):
+                    setattr(self, name, parts[index])
+
+    def _reset(self, names=None):
+        """ Before parsing again into an object that has been parsed before,
+            forget anything worked out from the old fields and then names, or
+            whatever parsing may have set (see _forget)
+        """
+        for attribute in self._cached:
+            attribute.clear(self)
+        self._forget(names)
 
-        for index, item in enumerate(self.parse_map):
-            if index + 1 > parts_len:
-                break
-            setattr(self, item[1], self.parts[index + 1])
-        #for index, item in enumerate(self.parts[1:]):
-            #setattr(self, self.parse_map[index][1], item)
+    def _forget(self, names=None):
+        """ Unset names, or else whatever parsing may have set: parts,
+            checksum and the fields
+        """
+        if names is None:
+            names = getattr(self, '_assigned', True)
+            if names is None:
+                return
+            if names is True:
+                names = ('parts', 'checksum') + self._fields
+        for name in names:
+            try:
+                delattr(self, name)
+            except AttributeError:
+                pass
+
+    def _set_fields(self, parts):
+        """ Assign parts (the sentence type followed by the fields) to the
+            attributes named in the parse map. Fields missing from the end of
+            a short sentence are left unset.
+        """
+        if isinstance(self.nmea_sentence, bytes):
+            # Fields are decoded on demand by __getattr__. Any that were
+            # set already (parsed with fields) have to stay on the list.
+            try:
+                assigned = NMEASentence._assigned.__get__(self)
+            except AttributeError:
+                assigned = None
+            if assigned is None:
+                self._assigned = _SPLIT_ONLY
+            elif assigned is not True:
+                self._assigned = _SPLIT_ONLY + assigned
+            return
+
+        self._assigned = True
+        fields = self._fields
+        if len(parts) > len(fields):
+            self._assign(self, parts)
+        else:
+            for index, item in enumerate(parts[1:]):
+                setattr(self, fields[index], item)
+
+    def __getattr__(self, name):
+        """ Only called when name has not been set. For sentences parsed
+            lazily, finish parsing the first time parts, checksum or a field
+            is needed. For sentences parsed from bytes, decode the field from
+            parts and keep it, so this happens at most once per field.
+        """
+        index = self._field_index.get(name)
+        if index is None and name not in ('parts', 'checksum'):
+            raise AttributeError(name)
+
+        try:
+            parts = NMEASentence.parts.__get__(self)
+        except AttributeError:
+            # Parsed lazily and not split up yet
+            try:
+                nmea_sentence = NMEASentence.nmea_sentence.__get__(self)
+            except AttributeError:
+                raise AttributeError(name)
+            self._parse(nmea_sentence)
+            self._set_fields(self.parts)
+            return getattr(self, name)
+
+        if index is None:
+            raise AttributeError(name)
+        try:
+            raw = parts[index]
+        except IndexError:
+            raise AttributeError(name)
+
+        self._assigned = True
+        if isinstance(raw, bytes):
+            value = raw.decode('latin-1')
+        elif isinstance(raw, list):
+            value = [item.decode('latin-1') for item in raw]
+        else:
+            raise AttributeError(name)
+        setattr(self, name, value)
+        return value
 
     def check_chksum(self):
         # If there is no checksum, raise AssertionError
@@ -64,6 +515,79 @@ class NMEASentence(object):
         result = checksum_calc(self.nmea_sentence)
         return (result.upper() == self.checksum.upper())
 
+    def render(self, checksum=True):
+        """ Put the sentence back together from sen_type and the fields in
+            the parse map, as it would be sent: $, the fields separated by
+            commas and (unless checksum is False) a * and a freshly worked
+            out checksum. There is no line ending. Any fields that were
+            parsed from past the end of the parse map are kept.
+
+            Fields that are not set are left empty, or left out if they are
+            at the end (as for a short sentence). Values that aren't text are
+            written with str(), and lists (such as a waypoint_list) with
+            their items separated by commas.
+
+            An object that hasn't been parsed, only had its fields set, is
+            rendered as the type its class is registered for (or else the
+            class name), unless sen_type has been set.
+        """
+        sen_type = self.sen_type
+        if sen_type is None:
+            sen_type = self._default_sen_type()
+        try:
+            body = ','.join((sen_type,) + self._get_fields(self))
+        except (AttributeError, TypeError):
+            body = ','.join([sen_type] + self._field_texts())
+
+        try:
+            parts = NMEASentence.parts.__get__(self)
+        except AttributeError:
+            parts = ()
+        if len(parts) > len(self._fields) + 1:
+            # Fields past the end of the parse map (such as the mode on
+            # newer GPRMC sentences) are put back as they were
+            extra = parts[len(self._fields) + 1:]
+            if isinstance(extra[0], bytes):
+                extra = [item.decode('latin-1') for item in extra]
+            body += ',' + ','.join(extra)
+
+        if not checksum:
+            return '$' + body
+        return '$%s*%s' % (body, checksum_calc(body))
+
+    def _default_sen_type(self):
+        """ The sentence type to render an unparsed object as """
+        cls = type(self)
+        if cls is _AdHocSentence:
+            raise ValueError('sen_type must be set to render a sentence '
+                             'with an ad hoc parse map')
+        name = cls.__name__
+        if SENTENCE_TYPES.get(name) is not cls:
+            for sen_type, sen_class in sorted(SENTENCE_TYPES.items()):
+                if sen_class is cls:
+                    return sen_type
+        return name
+
+    def _field_texts(self):
+        """ The fields as text for render, the slow way """
+        values = [getattr(self, name, None) for name in self._fields]
+        while values and values[-1] is None:
+            values.pop()
+        texts = []
+        for value in values:
+            if value is None:
+                texts.append('')
+            elif isinstance(value, list):
+                texts.append(','.join(str(item) for item in value))
+            else:
+                texts.append(str(value))
+        return texts
+
+
+class _AdHocSentence(NMEASentence):
+    """ What NMEASentence(parse_map) actually creates. Without __slots__ it
+        keeps a __dict__ for the fields in its parse map.
+    """
 
 
 
@@ -75,117 +599,109 @@ class NMEASentence(object):
 class GPAAM(NMEASentence):
     """ Waypoint Arrival Alarm
     """
-    def __init__(self):
-        parse_map = (
-            ("Arrival Circle Entered", "arrival_circ_entered"),
-            ("Perpendicular Passed", "perp_passed"),
-            ("Circle Radius", "circle_rad"),
-            ("Nautical Miles", "circle_rad_unit"),
-            ("Waypoint ID", "waypoint_id"))
-
-        super(GPAAM, self).__init__(parse_map)
+    parse_map = (
+        ("Arrival Circle Entered", "arrival_circ_entered"),
+        ("Perpendicular Passed", "perp_passed"),
+        ("Circle Radius", "circle_rad"),
+        ("Nautical Miles", "circle_rad_unit"),
+        ("Waypoint ID", "waypoint_id"))
 
 
 class GPALM(NMEASentence):
     """ GPS Almanac data
     """
-    def __init__(self):
-        parse_map = (("Total number of messages", "total_num_msgs"),
-                     ("Message number", "msg_num"),
-                     ("Satellite PRN number", "sat_prn_num"), # 01 - 32
-                     ("GPS week number", "gps_week_num"), # Week since Jan 6 1980
-                     ("SV Health, bits 17-24 of each almanac page", "sv_health"),
-                     ("Eccentricity", "eccentricity"),
-                     ("Almanac Reference Time", "alamanac_ref_time"),
-                     ("Inclination Angle", "inc_angle"),
-                     ("Rate of right ascension", "rate_right_asc"),
-                     ("Root of semi-major axis", "root_semi_major_axis"),
-                     ("Argument of perigee", "arg_perigee"),
-                     ("Longitude of ascension node", "lat_asc_node"),
-                     ("Mean anomaly", "mean_anom"),
-                     ("F0 Clock parameter", "f0_clock_param"),
-                     ("F1 Clock parameter", "f1_clock_param"))
-
-        super(GPALM, self).__init__(parse_map)
+    parse_map = (("Total number of messages", "total_num_msgs"),
+                 ("Message number", "msg_num"),
+                 ("Satellite PRN number", "sat_prn_num"), # 01 - 32
+                 ("GPS week number", "gps_week_num"), # Week since Jan 6 1980
+                 ("SV Health, bits 17-24 of each almanac page", "sv_health"),
+                 ("Eccentricity", "eccentricity"),
+                 ("Almanac Reference Time", "alamanac_ref_time"),
+                 ("Inclination Angle", "inc_angle"),
+                 ("Rate of right ascension", "rate_right_asc"),
+                 ("Root of semi-major axis", "root_semi_major_axis"),
+                 ("Argument of perigee", "arg_perigee"),
+                 ("Longitude of ascension node", "lat_asc_node"),
+                 ("Mean anomaly", "mean_anom"),
+                 ("F0 Clock parameter", "f0_clock_param"),
+                 ("F1 Clock parameter", "f1_clock_param"))
 
 
 class GPAPA(NMEASentence):
     """ Autopilot Sentence "A"
     """
 
-    def __init__(self):
-        parse_map = (
-            ("General Status", "status_gen"),
-            ("Cycle lock Status", "status_cycle_lock"),
-            ("Cross Track Error Magnitude", "cross_track_err_mag"),
-            ("Direction to Steer (L or R)", "dir_steer"),
-            ("Cross Track Units (Nautical Miles or KM)", "cross_track_unit"),
-            ("Arrival Circle Entered", "arr_circle_entered"), # A = True
-            ("Perpendicular passed at waypoint", "perp_passed"), # A = True
-            ("Bearing origin to destination", "bearing_to_dest"),
-            ("Bearing type", "bearing_type"), # M = Magnetic, T = True
-            ("Destination waypoint ID", "dest_waypoint_id"))
-
-        super(GPAPA, self).__init__(parse_map)
+    parse_map = (
+        ("General Status", "status_gen"),
+        ("Cycle lock Status", "status_cycle_lock"),
+        ("Cross Track Error Magnitude", "cross_track_err_mag"),
+        ("Direction to Steer (L or R)", "dir_steer"),
+        ("Cross Track Units (Nautical Miles or KM)", "cross_track_unit"),
+        ("Arrival Circle Entered", "arr_circle_entered"), # A = True
+        ("Perpendicular passed at waypoint", "perp_passed"), # A = True
+        ("Bearing origin to destination", "bearing_to_dest"),
+        ("Bearing type", "bearing_type"), # M = Magnetic, T = True
+        ("Destination waypoint ID", "dest_waypoint_id"))
 
 
 class GPAPB(NMEASentence):
     """ Autopilot Sentence "B"
     """
 
-    def __init__(self):
-        parse_map = (
-            ("General Status", "status_gen"),
-            ("Cycle lock Status", "status_cycle_lock"),
-            ("Cross Track Error Magnitude", "cross_track_err_mag"),
-            ("Direction to Steer (L or R)", "dir_steer"),
-            ("Cross Track Units (Nautical Miles or KM)", "cross_track_unit"),
-            ("Arrival Circle Entered", "arr_circle_entered"), # A = True
-            ("Perpendicular passed at waypoint", "perp_passed"), # A = True
-            ("Bearing origin to destination", "bearing_to_dest"),
-            ("Bearing type", "bearing_type"), # M = Magnetic, T = True
-            ("Destination waypoint ID", "dest_waypoint_id"),
-            ("Bearing, present position to dest", "bearing_pres_dest"),
-            ("Bearing to destination, type", "bearing_pres_dest_type"), # M = Magnetic, T = True
-            ("Heading to steer to destination", "heading_to_dest"),
-            ("Heading to steer to destination type", "heading_to_dest_type")) # M = Magnetic, T = True
-
-        super(GPAPB, self).__init__(parse_map)
+    parse_map = (
+        ("General Status", "status_gen"),
+        ("Cycle lock Status", "status_cycle_lock"),
+        ("Cross Track Error Magnitude", "cross_track_err_mag"),
+        ("Direction to Steer (L or R)", "dir_steer"),
+        ("Cross Track Units (Nautical Miles or KM)", "cross_track_unit"),
+        ("Arrival Circle Entered", "arr_circle_entered"), # A = True
+        ("Perpendicular passed at waypoint", "perp_passed"), # A = True
+        ("Bearing origin to destination", "bearing_to_dest"),
+        ("Bearing type", "bearing_type"), # M = Magnetic, T = True
+        ("Destination waypoint ID", "dest_waypoint_id"),
+        ("Bearing, present position to dest", "bearing_pres_dest"),
+        ("Bearing to destination, type", "bearing_pres_dest_type"), # M = Magnetic, T = True
+        ("Heading to steer to destination", "heading_to_dest"),
+        ("Heading to steer to destination type", "heading_to_dest_type")) # M = Magnetic, T = True
 
 
 class GPBEC(NMEASentence):
     """ Bearing & Distance to Waypoint, Dead Reckoning
     """
-    def __init__(self):
-        parse_map = (
-            ("Timestamp", "timestamp"),
-            ("Waypoint Latitude", "waypoint_lat"),
-            ("Waypoint Latitude direction", "waypoint_lat_dir"),
-            ("Waypoint Longitude", "waypoint_lon"),
-            ("Waypoint Longitude direction", "waypoint_lon_dir"),
-            ("Bearing, true", "bearing_true"),
-            ("Bearing True symbol", "bearing_true_sym"), # T = true
-            ("Bearing Magnetic", "bearing_mag"),
-            ("Bearing Magnetic symbol", "bearing_mag_sym"),
-            ("Nautical Miles", "nautical_miles"),
-            ("Nautical Miles symbol", "nautical_miles_sym"),
-            ("Waypoint ID", "waypoint_id"),
-            ("FAA mode indicator", "faa_mode"))
-
-        super(GPBEC, self).__init__(parse_map)
+    parse_map = (
+        ("Timestamp", "timestamp"),
+        ("Waypoint Latitude", "waypoint_lat"),
+        ("Waypoint Latitude direction", "waypoint_lat_dir"),
+        ("Waypoint Longitude", "waypoint_lon"),
+        ("Waypoint Longitude direction", "waypoint_lon_dir"),
+        ("Bearing, true", "bearing_true"),
+        ("Bearing True symbol", "bearing_true_sym"), # T = true
+        ("Bearing Magnetic", "bearing_mag"),
+        ("Bearing Magnetic symbol", "bearing_mag_sym"),
+        ("Nautical Miles", "nautical_miles"),
+        ("Nautical Miles symbol", "nautical_miles_sym"),
+        ("Waypoint ID", "waypoint_id"),
+        ("FAA mode indicator", "faa_mode"))
+
+    time = _time_attribute()
+    waypoint_lat_degrees = _degrees_attribute('waypoint_lat',
+                                              'waypoint_lat_dir')
+    waypoint_lon_degrees = _degrees_attribute('waypoint_lon',
+                                              'waypoint_lon_dir')
+    bearing = _float_attribute('bearing_true',
+                               """ True bearing in degrees """)
+    distance = _float_attribute('nautical_miles',
+                                """ Distance in nautical miles """)
 
 
 class GPBOD(NMEASentence):
-    def __init__(self):
-        # 045.,T,023.,M,DEST,START
-        parse_map = (('Bearing True', 'bearing_t'),
-                     ('Bearing True Type', 'bearing_t_type'),
-                     ('Bearing Magnetic', 'bearing_mag'),
-                     ('Bearing Magnetic Type', 'bearing_mag_type'),
-                     ('Destination', 'dest'),
-                     ('Start', 'start'))
-
-        super(GPBOD, self).__init__(parse_map)
+    # 045.,T,023.,M,DEST,START
+    parse_map = (('Bearing True', 'bearing_t'),
+                 ('Bearing True Type', 'bearing_t_type'),
+                 ('Bearing Magnetic', 'bearing_mag'),
+                 ('Bearing Magnetic Type', 'bearing_mag_type'),
+                 ('Destination', 'dest'),
+                 ('Start', 'start'))
 
     @property
     def bearing_true(self):
@@ -205,109 +721,99 @@ class GPBOD(NMEASentence):
 
 
 class GPBWC(NMEASentence):
-    def __init__(self):
-        parse_map = (
-            ('Timestamp', 'timestamp'),
-            ('Latitude of next Waypoint', 'lat_next'),
-            ('Latitude of next Waypoint Direction', 'lat_next_direction'),
-            ('Longitude of next Waypoint', 'lon_next'),
-            ('Longitude of next Waypoint Direction', 'lon_next_direction'),
-            ('True track to waypoint', 'true_track'),
-            ('True Track Symbol', 'true_track_sym'),
-            ('Magnetic track to waypoint', 'mag_track'),
-            ('Magnetic Symbol', 'mag_sym'),
-            ('Range to waypoint', 'range_next'),
-            ('Unit of range', 'range_unit'),
-            ('Waypoint Name', 'waypoint_name'))
-            #('Checksum', 'checksum'))
-
-        super(GPBWC, self).__init__(parse_map)
+    parse_map = (
+        ('Timestamp', 'timestamp'),
+        ('Latitude of next Waypoint', 'lat_next'),
+        ('Latitude of next Waypoint Direction', 'lat_next_direction'),
+        ('Longitude of next Waypoint', 'lon_next'),
+        ('Longitude of next Waypoint Direction', 'lon_next_direction'),
+        ('True track to waypoint', 'true_track'),
+        ('True Track Symbol', 'true_track_sym'),
+        ('Magnetic track to waypoint', 'mag_track'),
+        ('Magnetic Symbol', 'mag_sym'),
+        ('Range to waypoint', 'range_next'),
+        ('Unit of range', 'range_unit'),
+        ('Waypoint Name', 'waypoint_name'))
+        #('Checksum', 'checksum'))
 
 
 class GPBWR(NMEASentence):
-    def __init__(self):
-        parse_map = (
-            ('Timestamp', 'timestamp'),
-            ('Latitude of next Waypoint', 'lat_next'),
-            ('Latitude of next Waypoint Direction', 'lat_next_direction'),
-            ('Longitude of next Waypoint', 'lon_next'),
-            ('Longitude of next Waypoint Direction', 'lon_next_direction'),
-            ('True track to waypoint', 'true_track'),
-            ('True Track Symbol', 'true_track_sym'),
-            ('Magnetic track to waypoint', 'mag_track'),
-            ('Magnetic Symbol', 'mag_sym'),
-            ('Range to waypoint', 'range_next'),
-            ('Unit of range', 'range_unit'),
-            ('Waypoint Name', 'waypoint_name'))
-            #('Checksum', 'checksum'))
-
-        super(GPBWR, self).__init__(parse_map)
+    parse_map = (
+        ('Timestamp', 'timestamp'),
+        ('Latitude of next Waypoint', 'lat_next'),
+        ('Latitude of next Waypoint Direction', 'lat_next_direction'),
+        ('Longitude of next Waypoint', 'lon_next'),
+        ('Longitude of next Waypoint Direction', 'lon_next_direction'),
+        ('True track to waypoint', 'true_track'),
+        ('True Track Symbol', 'true_track_sym'),
+        ('Magnetic track to waypoint', 'mag_track'),
+        ('Magnetic Symbol', 'mag_sym'),
+        ('Range to waypoint', 'range_next'),
+        ('Unit of range', 'range_unit'),
+        ('Waypoint Name', 'waypoint_name'))
+        #('Checksum', 'checksum'))
 
 
 class GPGGA(NMEASentence):
-    def __init__(self):
-        parse_map = (
-            ('Timestamp', 'timestamp'),
-            ('Latitude', 'latitude'),
-            ('Latitude Direction', 'lat_direction'),
-            ('Longitude', 'longitude'),
-            ('Longitude Direction', 'lon_direction'),
-            ('GPS Quality Indicator', 'gps_qual'),
-            ('Number of Satellites in use', 'num_sats'),
-            ('Horizontal Dilution of Precision', 'horizontal_dil'),
-            ('Antenna Alt above sea level (mean)', 'antenna_altitude'),
-            ('Units of altitude (meters)', 'altitude_units'),
-            ('Geoidal Separation', 'geo_sep'),
-            ('Units of Geoidal Separation (meters)', 'geo_sep_units'),
-            ('Age of Differential GPS Data (secs)', 'age_gps_data'),
-            ('Differential Reference Station ID', 'ref_station_id'))
-            #('Checksum', 'checksum'))
-
-        super(GPGGA, self).__init__(parse_map)
+    parse_map = (
+        ('Timestamp', 'timestamp'),
+        ('Latitude', 'latitude'),
+        ('Latitude Direction', 'lat_direction'),
+        ('Longitude', 'longitude'),
+        ('Longitude Direction', 'lon_direction'),
+        ('GPS Quality Indicator', 'gps_qual'),
+        ('Number of Satellites in use', 'num_sats'),
+        ('Horizontal Dilution of Precision', 'horizontal_dil'),
+        ('Antenna Alt above sea level (mean)', 'antenna_altitude'),
+        ('Units of altitude (meters)', 'altitude_units'),
+        ('Geoidal Separation', 'geo_sep'),
+        ('Units of Geoidal Separation (meters)', 'geo_sep_units'),
+        ('Age of Differential GPS Data (secs)', 'age_gps_data'),
+        ('Differential Reference Station ID', 'ref_station_id'))
+        #('Checksum', 'checksum'))
+
+    time = _time_attribute()
+    # latitude and longitude are already the raw fields here
+    lat_degrees = _degrees_attribute('latitude', 'lat_direction')
+    lon_degrees = _degrees_attribute('longitude', 'lon_direction')
+    altitude = _float_attribute('antenna_altitude',
+                                """ Antenna altitude in meters """)
 
 
 class GPBWW(NMEASentence):
     """ Bearing, Waypoint to Waypoint
     """
-    def __init__(self):
-        parse_map = (
-            ("Bearing degrees True", "bearing_deg_true"),
-            ("Bearing degrees True Symbol", "bearing_deg_true_sym"),
-            ("Bearing degrees Magnitude", "bearing_deg_mag"),
-            ("Bearing degrees Magnitude Symbol", "bearing_deg_mag_sym"),
-            ("Destination Waypoint ID", "waypoint_id_dest"),
-            ("Origin Waypoint ID", "waypoint_id_orig"))
-
-        super(GPBWW, self).__init__(parse_map)
+    parse_map = (
+        ("Bearing degrees True", "bearing_deg_true"),
+        ("Bearing degrees True Symbol", "bearing_deg_true_sym"),
+        ("Bearing degrees Magnitude", "bearing_deg_mag"),
+        ("Bearing degrees Magnitude Symbol", "bearing_deg_mag_sym"),
+        ("Destination Waypoint ID", "waypoint_id_dest"),
+        ("Origin Waypoint ID", "waypoint_id_orig"))
 
 
 class GPDBT(NMEASentence):
     """ Depth Below Transducer
     """
-    def __init__(self):
-        parse_map = (
-            ('Feet', 'feet'),
-            ('Feet Symbol', 'feet_symbol'),
-            ('Meters', 'meters'),
-            ('Meters Symbol', 'meters_symbol'),
-            ('Fathoms', 'fathoms'),
-            ('Fathoms Symbol', 'fathoms_symbol'))
-        super(GPDBT, self).__init__(parse_map)
+    parse_map = (
+        ('Feet', 'feet'),
+        ('Feet Symbol', 'feet_symbol'),
+        ('Meters', 'meters'),
+        ('Meters Symbol', 'meters_symbol'),
+        ('Fathoms', 'fathoms'),
+        ('Fathoms Symbol', 'fathoms_symbol'))
 
 
 class GPGLL(NMEASentence):
-    def __init__(self):
-        parse_map = (
-            ('Latitude', 'lat'),
-            ('Latitude Direction', 'lat_dir'),
-            ('Longitude', 'lon'),
-            ('Longitude Direction', 'lon_dir'),
-            ('Timestamp', 'timestamp'),
-            ('Data Validity', "data_valid"))
-
-        super(GPGLL, self).__init__(parse_map)
+    parse_map = (
+        ('Latitude', 'lat'),
+        ('Latitude Direction', 'lat_dir'),
+        ('Longitude', 'lon'),
+        ('Longitude Direction', 'lon_dir'),
+        ('Timestamp', 'timestamp'),
+        ('Data Validity', "data_valid"))
 
-        self._use_data_validity = False
+    _use_data_validity = False
 
     #def _parse(self, nmea_str):
         #""" GPGGL Allows for a couple of different formats.
@@ -361,11 +867,15 @@ class GPGLL(NMEASentence):
             ## Otherwise, call the superclass version
             #return super(GPGLL, self).check_chksum()
 
-    @property
+    time = _time_attribute()
+    lat_degrees = _degrees_attribute('lat', 'lat_dir')
+    lon_degrees = _degrees_attribute('lon', 'lon_dir')
+
+    @cached_attribute
     def latitude(self):
         return float(self.lat)
 
-    @property
+    @cached_attribute
     def longitude(self):
         return float(self.lon)
 
@@ -381,96 +891,84 @@ class GPGLL(NMEASentence):
 
 
 class GPGSA(NMEASentence):
-    def __init__(self):
-        parse_map = (
-            ('Mode', 'mode'),
-            ('Mode fix type', 'mode_fix_type'),
-            ('SV ID01', 'sv_id01'),
-            ('SV ID02', 'sv_id02'),
-            ('SV ID03', 'sv_id03'),
-            ('SV ID04', 'sv_id04'),
-            ('SV ID05', 'sv_id05'),
-            ('SV ID06', 'sv_id06'),
-            ('SV ID07', 'sv_id07'),
-            ('SV ID08', 'sv_id08'),
-            ('SV ID09', 'sv_id09'),
-            ('SV ID10', 'sv_id10'),
-            ('SV ID11', 'sv_id11'),
-            ('SV ID12', 'sv_id12'),
-            ('PDOP (Dilution of precision)', 'pdop'),
-            ('HDOP (Horizontal DOP)', 'hdop'),
-            ('VDOP (Vertical DOP)', 'vdop'))
-            #('Checksum', 'checksum'))
-
-        super(GPGSA, self).__init__(parse_map)
+    parse_map = (
+        ('Mode', 'mode'),
+        ('Mode fix type', 'mode_fix_type'),
+        ('SV ID01', 'sv_id01'),
+        ('SV ID02', 'sv_id02'),
+        ('SV ID03', 'sv_id03'),
+        ('SV ID04', 'sv_id04'),
+        ('SV ID05', 'sv_id05'),
+        ('SV ID06', 'sv_id06'),
+        ('SV ID07', 'sv_id07'),
+        ('SV ID08', 'sv_id08'),
+        ('SV ID09', 'sv_id09'),
+        ('SV ID10', 'sv_id10'),
+        ('SV ID11', 'sv_id11'),
+        ('SV ID12', 'sv_id12'),
+        ('PDOP (Dilution of precision)', 'pdop'),
+        ('HDOP (Horizontal DOP)', 'hdop'),
+        ('VDOP (Vertical DOP)', 'vdop'))
+        #('Checksum', 'checksum'))
 
 
 class GPGSV(NMEASentence):
-    def __init__(self):
-        parse_map = (
-            ('Number of messages of type in cycle', 'num_messages'),
-            ('Message Number', 'msg_num'),
-            ('Total number of SVs in view', 'num_sv_in_view'),
-            ('SV PRN number 1', 'sv_prn_num_1'),
-            ('Elevation in degrees 1', 'elevation_deg_1'), # 90 max
-            ('Azimuth, deg from true north 1', 'azimuth_1'), # 000 to 159
-            ('SNR 1', 'snr_1'), # 00-99 dB
-            ('SV PRN number 2', 'sv_prn_num_2'),
-            ('Elevation in degrees 2', 'elevation_deg_2'), # 90 max
-            ('Azimuth, deg from true north 2', 'azimuth_2'), # 000 to 159
-            ('SNR 2', 'snr_2'), # 00-99 dB
-            ('SV PRN number 3', 'sv_prn_num_3'),
-            ('Elevation in degrees 3', 'elevation_deg_3'), # 90 max
-            ('Azimuth, deg from true north 3', 'azimuth_3'), # 000 to 159
-            ('SNR 3', 'snr_3'), # 00-99 dB
-            ('SV PRN number 4', 'sv_prn_num_4'),
-            ('Elevation in degrees 4', 'elevation_deg_4'), # 90 max
-            ('Azimuth, deg from true north 4', 'azimuth_4'), # 000 to 159
-            ('SNR 4', 'snr_4'))  # 00-99 dB
-            #('Checksum', 'checksum'))
-
-        super(GPGSV, self).__init__(parse_map)
+    parse_map = (
+        ('Number of messages of type in cycle', 'num_messages'),
+        ('Message Number', 'msg_num'),
+        ('Total number of SVs in view', 'num_sv_in_view'),
+        ('SV PRN number 1', 'sv_prn_num_1'),
+        ('Elevation in degrees 1', 'elevation_deg_1'), # 90 max
+        ('Azimuth, deg from true north 1', 'azimuth_1'), # 000 to 159
+        ('SNR 1', 'snr_1'), # 00-99 dB
+        ('SV PRN number 2', 'sv_prn_num_2'),
+        ('Elevation in degrees 2', 'elevation_deg_2'), # 90 max
+        ('Azimuth, deg from true north 2', 'azimuth_2'), # 000 to 159
+        ('SNR 2', 'snr_2'), # 00-99 dB
+        ('SV PRN number 3', 'sv_prn_num_3'),
+        ('Elevation in degrees 3', 'elevation_deg_3'), # 90 max
+        ('Azimuth, deg from true north 3', 'azimuth_3'), # 000 to 159
+        ('SNR 3', 'snr_3'), # 00-99 dB
+        ('SV PRN number 4', 'sv_prn_num_4'),
+        ('Elevation in degrees 4', 'elevation_deg_4'), # 90 max
+        ('Azimuth, deg from true north 4', 'azimuth_4'), # 000 to 159
+        ('SNR 4', 'snr_4'))  # 00-99 dB
+        #('Checksum', 'checksum'))
 
 
 class GPHDG(NMEASentence):
     """ NOTE! This is a GUESS as I cannot find an actual spec
         telling me the fields. Updates are welcome!
     """
-    def __init__(self):
-        parse_map = (
-            ("Heading", "heading"),
-            ("Deviation", "deviation"),
-            ("Deviation Direction", "dev_dir"),
-            ("Variation", "variation"),
-            ("Variation Direction", "var_dir"))
-            #("Checksum", "checksum"))
-
-        super(GPHDG, self).__init__(parse_map)
+    parse_map = (
+        ("Heading", "heading"),
+        ("Deviation", "deviation"),
+        ("Deviation Direction", "dev_dir"),
+        ("Variation", "variation"),
+        ("Variation Direction", "var_dir"))
+        #("Checksum", "checksum"))
 
 
 class GPHDT(NMEASentence):
-    def __init__(self):
-        parse_map = (
-            ("Heading", "heading"),
-            ("True", "hdg_true"))
-            #("Checksum", "checksum"))
-
-        super(GPHDT, self).__init__(parse_map)
+    parse_map = (
+        ("Heading", "heading"),
+        ("True", "hdg_true"))
+        #("Checksum", "checksum"))
 
 
 class GPR00(NMEASentence):
-    def __init__(self):
-        parse_map = (
-            ("Waypoint List", "waypoint_list"),)
-            #("Checksum", "checksum"))
-
-        super(GPR00, self).__init__(parse_map)
+    parse_map = (
+        ("Waypoint List", "waypoint_list"),)
+        #("Checksum", "checksum"))
 
-    def parse(self, nmea_str):
+    def parse(self, nmea_str, ignore_err=False, lazy=False, fields=None):
         """ As the length of the sentence is variable (there can be many or few
             waypoints), parse is overridden to do something special with the
-            different parts
+            different parts. The list is always built straight away, so lazy
+            and fields make no difference.
         """
+        if self.sen_type is not None:
+            self._reset()
         self._parse(nmea_str)
 
         new_parts = [self.parts[0]]
@@ -478,90 +976,106 @@ class GPR00(NMEASentence):
         #new_parts.append(self.parts[-1])
 
         self.parts = new_parts
-
-        for index, item in enumerate(self.parts[1:]):
-            setattr(self, self.parse_map[index][1], item)
+        self._set_fields(self.parts)
 
 
 class GPRMA(NMEASentence):
-    def __init__(self):
-        parse_map = (
-            ("Data status", "data_status"),
-            ("Latitude", "lat"),
-            ("Latitude Direction", "lat_dir"),
-            ("Longitude", "lon"),
-            ("Longitude Direction", "lon_dir"),
-            ("Not Used 1", "not_used_1"),
-            ("Not Used 2", "not_used_2"),
-            ("Speed over ground", "spd_over_grnd"), # Knots
-            ("Course over ground", "crse_over_grnd"),
-            ("Variation", "variation"),
-            ("Variation Direction", "var_dir"))
-            #("Checksum", "checksum"))
-
-        super(GPRMA, self).__init__(parse_map)
+    parse_map = (
+        ("Data status", "data_status"),
+        ("Latitude", "lat"),
+        ("Latitude Direction", "lat_dir"),
+        ("Longitude", "lon"),
+        ("Longitude Direction", "lon_dir"),
+        ("Not Used 1", "not_used_1"),
+        ("Not Used 2", "not_used_2"),
+        ("Speed over ground", "spd_over_grnd"), # Knots
+        ("Course over ground", "crse_over_grnd"),
+        ("Variation", "variation"),
+        ("Variation Direction", "var_dir"))
+        #("Checksum", "checksum"))
+
+    lat_degrees = _degrees_attribute('lat', 'lat_dir')
+    lon_degrees = _degrees_attribute('lon', 'lon_dir')
+    speed = _float_attribute('spd_over_grnd',
+                             """ Speed over ground in knots """)
+    course = _float_attribute('crse_over_grnd',
+                              """ Course over ground in degrees """)
 
 
 class GPRMB(NMEASentence):
     """ Recommended Minimum Navigation Information
     """
-    def __init__(self):
-        parse_map = (
-            ("Data Validity", "validity"),
-            ("Cross Track Error", "cross_track_error"), # nautical miles, 9.9 max
-            ("Cross Track Error, direction to corrent", "cte_correction_dir"),
-            ("Origin Waypoint ID", "origin_waypoint_id"),
-            ("Destination Waypoint ID", "dest_waypoint_id"),
-            ("Destination Waypoint Latitude", "dest_lat"),
-            ("Destination Waypoint Lat Direction", "dest_lat_dir"),
-            ("Destination Waypoint Longitude", "dest_lon"),
-            ("Destination Waypoint Lon Direction", "dest_lon_dir"),
-            ("Range to Destination", "dest_range"), # Nautical Miles
-            ("True Bearing to Destination", "dest_true_bearing"),
-            ("Velocity Towards Destination", "dest_velocity"), # Knots
-            ("Arrival Alarm", "arrival_alarm")) # A = Arrived, V = Not arrived
-            #("Checksum", "checksum"))
-        super(GPRMB, self).__init__(parse_map)
+    parse_map = (
+        ("Data Validity", "validity"),
+        ("Cross Track Error", "cross_track_error"), # nautical miles, 9.9 max
+        ("Cross Track Error, direction to corrent", "cte_correction_dir"),
+        ("Origin Waypoint ID", "origin_waypoint_id"),
+        ("Destination Waypoint ID", "dest_waypoint_id"),
+        ("Destination Waypoint Latitude", "dest_lat"),
+        ("Destination Waypoint Lat Direction", "dest_lat_dir"),
+        ("Destination Waypoint Longitude", "dest_lon"),
+        ("Destination Waypoint Lon Direction", "dest_lon_dir"),
+        ("Range to Destination", "dest_range"), # Nautical Miles
+        ("True Bearing to Destination", "dest_true_bearing"),
+        ("Velocity Towards Destination", "dest_velocity"), # Knots
+        ("Arrival Alarm", "arrival_alarm")) # A = Arrived, V = Not arrived
+        #("Checksum", "checksum"))
+
+    dest_lat_degrees = _degrees_attribute('dest_lat', 'dest_lat_dir')
+    dest_lon_degrees = _degrees_attribute('dest_lon', 'dest_lon_dir')
+    dest_bearing = _float_attribute(
+        'dest_true_bearing', """ True bearing to destination in degrees """)
+    dest_distance = _float_attribute(
+        'dest_range', """ Range to destination in nautical miles """)
+    dest_speed = _float_attribute(
+        'dest_velocity', """ Velocity towards destination in knots """)
 
 
 class GPRMC(NMEASentence):
     """ Recommended Minimum Specific GPS/TRANSIT Data
     """
-    def __init__(self):
-        parse_map = (("Timestamp", "timestamp"),
-                     ("Data Validity", "data_validity"),
-                     ("Latitude", "lat"),
-                     ("Latitude Direction", "lat_dir"),
-                     ("Longitude", "lon"),
-                     ("Longitude Direction", "lon_dir"),
-                     ("Speed Over Ground", "spd_over_grnd"),
-                     ("True Course", "true_course"),
-                     ("Datestamp", "datestamp"),
-                     ("Magnetic Variation", "mag_variation"),
-                     ("Magnetic Variation Direction", "mag_var_dir"))
-                     #("Checksum", "checksum"))
-        super(GPRMC, self).__init__(parse_map)
+    parse_map = (("Timestamp", "timestamp"),
+                 ("Data Validity", "data_validity"),
+                 ("Latitude", "lat"),
+                 ("Latitude Direction", "lat_dir"),
+                 ("Longitude", "lon"),
+                 ("Longitude Direction", "lon_dir"),
+                 ("Speed Over Ground", "spd_over_grnd"),
+                 ("True Course", "true_course"),
+                 ("Datestamp", "datestamp"),
+                 ("Magnetic Variation", "mag_variation"),
+                 ("Magnetic Variation Direction", "mag_var_dir"))
+                 #("Checksum", "checksum"))
+
+    time = _time_attribute()
+    datetime = _datetime_attribute('datestamp')
+    lat_degrees = _degrees_attribute('lat', 'lat_dir')
+    lon_degrees = _degrees_attribute('lon', 'lon_dir')
+    speed = _float_attribute('spd_over_grnd',
+                             """ Speed over ground in knots """)
+    course = _float_attribute('true_course',
+                              """ True course in degrees """)
 
 
 class GPRTE(NMEASentence):
     """ Routes
     """
-    def __init__(self):
-        parse_map = (
-            ("Number of sentences in sequence", "num_in_seq"),
-            ("Sentence Number", "sen_num"),
-            ("Start Type", "start_type"), # The first in the list is either current route or waypoint
-            ("Name or Number of Active Route", "active_route_id"),
-            ("Waypoint List", "waypoint_list"))
-            #("Checksum", "checksum"))
-
-        super(GPRTE, self).__init__(parse_map)
+    parse_map = (
+        ("Number of sentences in sequence", "num_in_seq"),
+        ("Sentence Number", "sen_num"),
+        ("Start Type", "start_type"), # The first in the list is either current route or waypoint
+        ("Name or Number of Active Route", "active_route_id"),
+        ("Waypoint List", "waypoint_list"))
+        #("Checksum", "checksum"))
 
-    def parse(self, nmea_str):
+    def parse(self, nmea_str, ignore_err=False, lazy=False, fields=None):
         """ As the length of the sentence is variable (there can be many or few
             waypoints), parse is overridden to do something special with the
-            different parts
+            different parts. The list is always built straight away, so lazy
+            and fields make no difference.
         """
+        if self.sen_type is not None:
+            self._reset()
         self._parse(nmea_str)
 
         new_parts = []
@@ -569,142 +1083,121 @@ class GPRTE(NMEASentence):
         new_parts.append(self.parts[5:])
 
         self.parts = new_parts
-
-        for index, item in enumerate(self.parts[1:]):
-            setattr(self, self.parse_map[index][1], item)
+        self._set_fields(self.parts)
 
 
 class GPSTN(NMEASentence):
     """ NOTE: No real data could be found for examples of the actual spec so
             it is a guess that there may be a checksum on the end
     """
-    def __init__(self):
-        parse_map = (
-            ("Talker ID Number", "talker_id"),) # 00 - 99
-            #("Checksum", "checksum"))
-
-
-        super(GPSTN, self).__init__(parse_map)
+    parse_map = (
+        ("Talker ID Number", "talker_id"),) # 00 - 99
+        #("Checksum", "checksum"))
 
 
 class GPTRF(NMEASentence):
     """ Transit Fix Data
     """
-    def __init__(self):
-        parse_map = (
-            ("Timestamp (UTC)", "timestamp"),
-            ("Date (DD/MM/YY", "date"),
-            ("Latitude", "lat"),
-            ("Latitude Direction", "lat_dir"),
-            ("Longitude", "lon"),
-            ("Longitude Direction", "lon_dir"),
-            ("Elevation Angle", "ele_angle"),
-            ("Number of Iterations", "num_iterations"),
-            ("Number of Doppler Intervals", "num_doppler_intervals"),
-            ("Update Distance", "update_dist"), # Nautical Miles
-            ("Satellite ID", "sat_id"))
-
-        super(GPTRF, self).__init__(parse_map)
+    parse_map = (
+        ("Timestamp (UTC)", "timestamp"),
+        ("Date (DD/MM/YY", "date"),
+        ("Latitude", "lat"),
+        ("Latitude Direction", "lat_dir"),
+        ("Longitude", "lon"),
+        ("Longitude Direction", "lon_dir"),
+        ("Elevation Angle", "ele_angle"),
+        ("Number of Iterations", "num_iterations"),
+        ("Number of Doppler Intervals", "num_doppler_intervals"),
+        ("Update Distance", "update_dist"), # Nautical Miles
+        ("Satellite ID", "sat_id"))
+
+    time = _time_attribute()
+    datetime = _datetime_attribute('date')
+    lat_degrees = _degrees_attribute('lat', 'lat_dir')
+    lon_degrees = _degrees_attribute('lon', 'lon_dir')
 
 
 class GPVBW(NMEASentence):
     """ Dual Ground/Water Speed
     """
-    def __init__(self):
-        parse_map = (
-            ("Longitudinal Water Speed", "lon_water_spd"), # Knots
-            ("Transverse Water Speed", "trans_water_spd"), # Knots
-            ("Water Speed Data Validity", "data_validity_water_spd"),
-            ("Longitudinal Ground Speed", "lon_grnd_spd"), # Knots
-            ("Transverse Ground Speed", "trans_grnd_spd"), # Knots
-            ("Ground Speed Data Validity", "data_validity_grnd_spd"))
-            #("Checksum", "checksum"))
-        super(GPVBW, self).__init__(parse_map)
+    parse_map = (
+        ("Longitudinal Water Speed", "lon_water_spd"), # Knots
+        ("Transverse Water Speed", "trans_water_spd"), # Knots
+        ("Water Speed Data Validity", "data_validity_water_spd"),
+        ("Longitudinal Ground Speed", "lon_grnd_spd"), # Knots
+        ("Transverse Ground Speed", "trans_grnd_spd"), # Knots
+        ("Ground Speed Data Validity", "data_validity_grnd_spd"))
+        #("Checksum", "checksum"))
 
 
 class GPVTG(NMEASentence):
     """ Track Made Good and Ground Speed
     """
-    def __init__(self):
-        parse_map = (
-            ("True Track made good", "true_track"),
-            ("True Track made good symbol", "true_track_sym"),
-            ("Magnetic Track made good", "mag_track"),
-            ("Magnetic Track symbol", "mag_track_sym"),
-            ("Speed over ground knots", "spd_over_grnd_kts"),
-            ("Speed over ground symbol", "spd_over_grnd_kts_sym"),
-            ("Speed over ground kmph", "spd_over_grnd_kmph"),
-            ("Speed over ground kmph symbol", "spd_over_grnd_kmph_sym"))
-
-        super(GPVTG, self).__init__(parse_map)
+    parse_map = (
+        ("True Track made good", "true_track"),
+        ("True Track made good symbol", "true_track_sym"),
+        ("Magnetic Track made good", "mag_track"),
+        ("Magnetic Track symbol", "mag_track_sym"),
+        ("Speed over ground knots", "spd_over_grnd_kts"),
+        ("Speed over ground symbol", "spd_over_grnd_kts_sym"),
+        ("Speed over ground kmph", "spd_over_grnd_kmph"),
+        ("Speed over ground kmph symbol", "spd_over_grnd_kmph_sym"))
 
 
 class GPWCV(NMEASentence):
     """ Waypoint Closure Velocity
     """
-    def __init__(self):
-        parse_map = (
-            ("Velocity", "velocity"),
-            ("Velocity Units", "vel_units"), # Knots
-            ("Waypoint ID", "waypoint_id"))
-
-        super(GPWCV, self).__init__(parse_map)
+    parse_map = (
+        ("Velocity", "velocity"),
+        ("Velocity Units", "vel_units"), # Knots
+        ("Waypoint ID", "waypoint_id"))
 
 
 class GPWNC(NMEASentence):
     """ Distance, Waypoint to Waypoint
     """
-    def __init__(self):
-        parse_map = (
-            ("Distance, Nautical Miles", "dist_nautical_miles"),
-            ("Distance Nautical Miles Unit", "dist_naut_unit"),
-            ("Distance, Kilometers", "dist_km"),
-            ("Distance, Kilometers Unit", "dist_km_unit"),
-            ("Origin Waypoint ID", "waypoint_origin_id"),
-            ("Destination Waypoint ID", "waypoint_dest_id"))
-
-        super(GPWNC, self).__init__(parse_map)
+    parse_map = (
+        ("Distance, Nautical Miles", "dist_nautical_miles"),
+        ("Distance Nautical Miles Unit", "dist_naut_unit"),
+        ("Distance, Kilometers", "dist_km"),
+        ("Distance, Kilometers Unit", "dist_km_unit"),
+        ("Origin Waypoint ID", "waypoint_origin_id"),
+        ("Destination Waypoint ID", "waypoint_dest_id"))
 
 
 class GPWPL(NMEASentence):
     """ Waypoint Location
     """
-    def __init__(self):
-        parse_map = (
-            ("Latitude", "lat"),
-            ("Latitude Direction", "lat_dir"),
-            ("Longitude", "lon"),
-            ("Longitude Direction", "lon_dir"),
-            ("Waypoint ID", "waypoint_id"))
+    parse_map = (
+        ("Latitude", "lat"),
+        ("Latitude Direction", "lat_dir"),
+        ("Longitude", "lon"),
+        ("Longitude Direction", "lon_dir"),
+        ("Waypoint ID", "waypoint_id"))
 
-        super(GPWPL, self).__init__(parse_map)
+    lat_degrees = _degrees_attribute('lat', 'lat_dir')
+    lon_degrees = _degrees_attribute('lon', 'lon_dir')
 
 
 class GPXTE(NMEASentence):
     """ Cross-Track Error, Measured
     """
-    def __init__(self):
-        parse_map = (("General Warning Flag", "warning_flag"),
-                     ("Lock flag (Not Used)", "lock_flag"),
-                     ("Cross Track Error Distance", "cross_track_err_dist"),
-                     ("Correction Direction (L or R)", "correction_dir"),
-                     ("Distance Units", "dist_units"))
-
-        super(GPXTE, self).__init__(parse_map)
+    parse_map = (("General Warning Flag", "warning_flag"),
+                 ("Lock flag (Not Used)", "lock_flag"),
+                 ("Cross Track Error Distance", "cross_track_err_dist"),
+                 ("Correction Direction (L or R)", "correction_dir"),
+                 ("Distance Units", "dist_units"))
 
 
 class GPZDA(NMEASentence):
-    def __init__(self):
-        parse_map = (
-            ("Timestamp", "timestamp"), # hhmmss.ss = UTC
-            ("Day", "day"), # 01 to 31
-            ("Month", "month"), # 01 to 12
-            ("Year", "year"), # Year = YYYY
-            ("Local Zone Description", "local_zone"), # 00 to +/- 13 hours
-            ("Local Zone Minutes Description", "local_zone_minutes")) # same sign as hours
-        #("Checksum", "checksum"))
-
-        super(GPZDA, self).__init__(parse_map)
+    parse_map = (
+        ("Timestamp", "timestamp"), # hhmmss.ss = UTC
+        ("Day", "day"), # 01 to 31
+        ("Month", "month"), # 01 to 12
+        ("Year", "year"), # Year = YYYY
+        ("Local Zone Description", "local_zone"), # 00 to +/- 13 hours
+        ("Local Zone Minutes Description", "local_zone_minutes")) # same sign as hours
+    #("Checksum", "checksum"))
 
 
 # ---------------------------------- Not Yet Implimented --------------------- #
@@ -922,33 +1415,101 @@ class GPZDA(NMEASentence):
 class PGRME(NMEASentence):
     """ GARMIN Estimated position error
     """
-    def __init__(self):
-        parse_map = (("Estimated Horiz. Position Error", "hpe"),
-                     ("Estimated Horiz. Position Error Unit (M)", "hpe_unit"),
-                     ("Estimated Vert. Position Error", "vpe"),
-                     ("Estimated Vert. Position Error Unit (M)", "vpe_unit"),
-                     ("Estimated Horiz. Position Error", "osepe"),
-                     ("Overall Spherical Equiv. Position Error", "osepe_unit"))
-
-        super(PGRME, self).__init__(parse_map)
+    parse_map = (("Estimated Horiz. Position Error", "hpe"),
+                 ("Estimated Horiz. Position Error Unit (M)", "hpe_unit"),
+                 ("Estimated Vert. Position Error", "vpe"),
+                 ("Estimated Vert. Position Error Unit (M)", "vpe_unit"),
+                 ("Estimated Horiz. Position Error", "osepe"),
+                 ("Overall Spherical Equiv. Position Error", "osepe_unit"))
 
 
 class PGRMM(NMEASentence):
     """ GARMIN Map Datum
     """
-    def __init__(self):
-        parse_map = (('Currently Active Datum', 'datum'),)
-
-        super(PGRMM, self).__init__(parse_map)
+    parse_map = (('Currently Active Datum', 'datum'),)
 
 
 class PGRMZ(NMEASentence):
     """ GARMIN Altitude Information
     """
-    def __init__(self):
-        parse_map = (("Altitude", "altitude"),
-                     ("Altitude Units (Feet)", "altitude_unit"),
-                     ("Positional Fix Dimension (2=user, 3=GPS)",
-                      "pos_fix_dim"))
+    parse_map = (("Altitude", "altitude"),
+                 ("Altitude Units (Feet)", "altitude_unit"),
+                 ("Positional Fix Dimension (2=user, 3=GPS)",
+                  "pos_fix_dim"))
+
+
+# ---------------------------------------------------------------------------- #
+# -------------------------- Sentence Registry ------------------------------- #
+# ---------------------------------------------------------------------------- #
+
+def _build_registry():
+    """ Collect every sentence class defined in this module, keyed on the
+        sentence type it parses (which is also the class name).
+    """
+    registry = {}
+    for name, obj in list(globals().items()):
+        if (isinstance(obj, type) and issubclass(obj, NMEASentence) and
+                not name.startswith('_') and obj is not NMEASentence):
+            registry[name] = obj
+    return registry
+
+
+# Sentence type -> sentence class. Built once at import time.
+SENTENCE_TYPES = _build_registry()
+
+
+def register_sentence(sen_class, sen_type=None):
+    """ Register a sentence class so that parse() and NMEAStream can build it.
+        sen_type defaults to the class name. Registering an existing type
+        replaces it. Returns the class, so it can be used as a decorator:
 
-        super(PGRMZ, self).__init__(parse_map)
+        @register_sentence
+        class PGRMT(NMEASentence):
+            ...
+    """
+    if sen_type is None:
+        sen_type = sen_class.__name__
+    SENTENCE_TYPES[sen_type] = sen_class
+    return sen_class
+
+
+def sentence_type(nmea_str):
+    """ Return the type (first field, without the leading $) of a raw sentence
+        given as str, bytes or bytearray.
+    """
+    if isinstance(nmea_str, str):
+        sen_type = nmea_str.partition(',')[0]
+    else:
+        sen_type = nmea_str.partition(b',')[0].decode('latin-1')
+    if sen_type.startswith('$'):
+        sen_type = sen_type[1:]
+    return sen_type
+
+
+def get_sentence_class(sen_type):
+    """ Look up the class registered for sen_type. Raises
+        UnknownSentenceTypeError if there isn't one.
+    """
+    try:
+        return SENTENCE_TYPES[sen_type]
+    except KeyError:
+        raise UnknownSentenceTypeError(
+            'No sentence class registered for %r' % (sen_type,), sen_type)
+
+
+def parse(nmea_str, lazy=False, fields=None):
+    """ Build and return the appropriate sentence object for nmea_str.
+        Raises UnknownSentenceTypeError if the sentence type is not known.
+        If lazy is True, the fields are only pulled out as they are used (see
+        NMEASentence.parse).
+
+        fields may be a dict of sentence type to a tuple (or list) of the
+        field names wanted from sentences of that type, such as
+        {'GPRMC': ('timestamp', 'lat', 'lat_dir', 'lon', 'lon_dir')}. Only
+        those fields are split out up front, for the types listed.
+    """
+    sen_type = sentence_type(nmea_str)
+    nmea_ob = get_sentence_class(sen_type)()
+    nmea_ob.parse(nmea_str, lazy=lazy,
+                  fields=fields.get(sen_type) if fields else None)
+    return nmea_ob
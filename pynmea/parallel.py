@@ -0,0 +1,100 @@
+""" Parse large log files using several processes at once
+"""
+import mmap
+import multiprocessing
+import os
+
+from pynmea.streamer import NMEAStream
+
+
+def chunk_offsets(path, chunk_size=1048576):
+    """ Split the file at path into (start, end) byte ranges of around
+        chunk_size bytes. Every range after the first starts on a $, so
+        each holds whole sentences, split up the same way NMEAStream would
+        split the whole file.
+    """
+    size = os.path.getsize(path)
+    if not size:
+        return []
+
+    offsets = []
+    with open(path, 'rb') as log_fd:
+        data = mmap.mmap(log_fd.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            start = 0
+            while start < size:
+                end = data.find(b'$', start + chunk_size)
+                if end == -1:
+                    end = size
+                offsets.append((start, end))
+                start = end
+        finally:
+            data.close()
+    return offsets
+
+
+def _iter_chunk(path, start, end, validate, func):
+    """ Parse one range of the file, yielding NMEA objects, or the results
+        of func for them (leaving out None).
+    """
+    with open(path, 'rb') as log_fd:
+        log_fd.seek(start)
+        # Decode the whole chunk here, so that the objects handed back have
+        # all of their fields filled in already.
+        data = log_fd.read(end - start).decode('latin-1')
+
+    nmea_objects = NMEAStream(validate=validate).iter_objects(data=data)
+    if func is None:
+        return nmea_objects
+    return (result for result in map(func, nmea_objects)
+            if result is not None)
+
+
+def _parse_chunk(args):
+    """ Parse one range of the file in a worker process
+    """
+    return list(_iter_chunk(*args))
+
+
+def parse_file_parallel(path, workers=None, chunk_size=1048576,
+                        validate=False, func=None):
+    """ Parse the log file at path in a pool of workers processes (one per
+        CPU by default). The file is cut into chunks of around chunk_size
+        bytes on sentence boundaries and each chunk is parsed separately.
+
+        Returns an iterator over the NMEA objects, in the order they are in
+        the file. Chunks are handed on as soon as they and all of the chunks
+        before them are done, so the results can be consumed while the rest
+        of the file is being parsed.
+
+        Sending whole objects back from the workers costs about as much as
+        parsing them. To make use of more workers, pass func, a function
+        that takes an NMEA object and returns what is actually wanted from
+        it (or None to leave it out). It is run in the workers, so it has to
+        be importable, like anything else given to multiprocessing.
+    """
+    tasks = [(path, start, end, validate, func)
+             for start, end in chunk_offsets(path, chunk_size)]
+    if workers == 1 or len(tasks) <= 1:
+        # Not worth starting any processes
+        return _iter_serial(tasks)
+    return _iter_parallel(tasks, workers)
+
+
+def _iter_serial(tasks):
+    for task in tasks:
+        for result in _iter_chunk(*task):
+            yield result
+
+
+def _iter_parallel(tasks, workers):
+    pool = multiprocessing.Pool(workers)
+    try:
+        # imap hands back the results in the order the tasks were given
+        for results in pool.imap(_parse_chunk, tasks):
+            for result in results:
+                yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
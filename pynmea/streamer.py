@@ -1,19 +1,113 @@
 """ For dealing with streams of nmea data
 """
-from pynmea.exceptions import NoDataGivenError
+import mmap
+
+from pynmea.exceptions import NoDataGivenError, UnknownSentenceTypeError
+from pynmea.nmea import get_sentence_class, parse, sentence_type
+from pynmea.utils import verify_checksum
+
+
+OVERFLOW_POLICIES = ('resync', 'drop')
+
+
+def _prefixes(sen_types, kind):
+    """ The starts of sentences (split apart, without the $) of sen_types,
+        as str or bytes, for use with startswith
+    """
+    if sen_types is None:
+        return None
+    prefixes = []
+    for sen_type in sen_types:
+        prefixes += [sen_type + ',', sen_type + '*']
+    if kind is bytes:
+        return tuple(prefix.encode('latin-1') for prefix in prefixes)
+    return tuple(prefixes)
 
 
 class NMEAStream(object):
     """ NMEAStream object is used to
     """
-    def __init__(self, stream_obj=None):
+    def __init__(self, stream_obj=None, validate=False, max_sentence=4096,
+                 overflow='resync', lazy=False, include=None, exclude=None,
+                 fields=None, cache=None, reuse=False):
         """ stream_obj should be a file like object.
             If the requirement is just to split data in memory, no stream_obj
             is required. Simply create an instance of this class and
             call _split directly with the data.
+
+            The stream (or data) may give either text or bytes. Bytes are
+            split and returned as bytes, and objects made from them only
+            decode the fields that are used.
+
+            If validate is True, get_objects and iter_objects drop any
+            sentence without a correct checksum. For bytes this is done on the
+            raw data, before anything is decoded.
+
+            No more than max_sentence characters of an incomplete sentence
+            are held on to between reads, so a device spewing data without
+            any $ can't use up memory. What happens when there is more is
+            down to overflow:
+                'resync': throw away the incomplete sentence and everything
+                          after it up to the next $.
+                'drop': keep the first max_sentence characters of the
+                        sentence and throw away the rest of it.
+            Either way, discarded counts the characters (or bytes) thrown
+            away and overflows counts the number of times it happened.
+
+            If lazy is True, objects only pull out their fields as they are
+            used (see NMEASentence.parse).
+
+            include and exclude are lists of sentence types, such as
+            ('GPRMC', 'GPGGA'). If include is given, only sentences of those
+            types are returned, and sentences of the types in exclude never
+            are. Sentences are picked out by the start of the raw text, as
+            soon as they are split apart, so the ones left out are never
+            cleaned up, checked or parsed.
+
+            fields is a dict of sentence type to the names of the fields
+            wanted from it, such as {'GPRMC': ['timestamp', 'lat', 'lon']}.
+            Objects of those types only have those fields split out of the
+            sentence to begin with (see NMEASentence.parse).
+
+            cache may be a pynmea.cache.ParseCache, to only parse sentences
+            that are not already in it. Objects come out of it fully parsed
+            (lazy and fields make no difference) and are shared, so they
+            must be treated as read only.
+
+            If reuse is True, iter_objects keeps one object for each sentence
+            type and parses each new sentence into it in place, instead of
+            making a new object every time. Each object is only good until
+            the next sentence of its type comes along, so this is for code
+            that is done with each object before asking for the next one.
+            get_objects always makes new objects.
         """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('overflow must be one of %s' %
+                             ', '.join(OVERFLOW_POLICIES))
+
         self.stream = stream_obj
+        self.validate = validate
+        self.max_sentence = max_sentence
+        self.overflow = overflow
+        self.lazy = lazy
+        self.include = tuple(include) if include is not None else None
+        self.exclude = tuple(exclude) if exclude is not None else ()
+        self.fields = None
+        if fields is not None:
+            self.fields = dict((sen_type, tuple(names))
+                               for sen_type, names in fields.items())
+        self.cache = cache
+        self.reuse = reuse
+        # Sentence type -> the object iter_objects reuses for it
+        self._reused = {}
+        self._prefixes = {str: (_prefixes(self.include, str),
+                                _prefixes(self.exclude, str)),
+                          bytes: (_prefixes(self.include, bytes),
+                                  _prefixes(self.exclude, bytes))}
+        self.discarded = 0
+        self.overflows = 0
         self.head = ''
+        self._skipping = False
 
     def get_strings(self, data=None, size=1024):
         """ Read and return sentences as strings
@@ -24,18 +118,98 @@ class NMEAStream(object):
         """ Get sentences but return list of NMEA objects
         """
         str_data = self._read(data=data, size=size)
+        return self._to_objects(str_data)
+
+    def iter_strings(self, data=None, size=1024):
+        """ Lazily yield sentences as strings, one at a time, until the
+            stream is exhausted. Only one read of size bytes is held in memory
+            at once. If data is given, it is used instead of the stream.
+            The final partial sentence is flushed out at the end, so there is
+            no need to feed in empty data.
+        """
+        for chunk in self._iter_chunks(data=data, size=size):
+            for nmea_str in self._read(data=chunk):
+                yield nmea_str
+
+        for nmea_str in self._flush():
+            yield nmea_str
+
+    def iter_objects(self, data=None, size=1024):
+        """ As iter_strings, but yield NMEA objects. Unrecognised sentences
+            are skipped.
+        """
+        reuse = self.reuse
+        for nmea_str in self.iter_strings(data=data, size=size):
+            nmea_ob = self._to_object(nmea_str, reuse)
+            if nmea_ob is not None:
+                yield nmea_ob
+
+    def _to_object(self, nmea_str, reuse=False):
+        """ Make an NMEA object from a sentence, or if reuse is True parse
+            it into the last object of its type. Returns None if it fails
+            validation or is not recognised.
+        """
+        if self.validate and not verify_checksum(nmea_str):
+            return None
+        try:
+            if self.cache is not None:
+                return self.cache.parse(nmea_str)
+            if reuse:
+                return self._reparse(nmea_str)
+            return parse(nmea_str, lazy=self.lazy, fields=self.fields)
+        except UnknownSentenceTypeError:
+            # NMEA sentence was not recognised
+            return None
+
+    def _reparse(self, nmea_str):
+        """ Parse nmea_str into the object kept for its type """
+        sen_type = sentence_type(nmea_str)
+        try:
+            nmea_ob = self._reused[sen_type]
+        except KeyError:
+            nmea_ob = self._reused[sen_type] = get_sentence_class(sen_type)()
+        nmea_ob.parse(nmea_str, lazy=self.lazy,
+                      fields=self.fields.get(sen_type) if self.fields else None)
+        return nmea_ob
+
+    def _to_objects(self, str_data):
+        """ Make NMEA objects from a list of sentences, leaving out any that
+            _to_object turns down.
+        """
         nmea_objects = []
         for nmea_str in str_data:
-            try:
-                nmea_ob = self._get_type(nmea_str)()
-            except TypeError:
-                # NMEA sentence was not recognised
-                continue
-            nmea_ob.parse(nmea_str)
-            nmea_objects.append(nmea_ob)
-
+            nmea_ob = self._to_object(nmea_str)
+            if nmea_ob is not None:
+                nmea_objects.append(nmea_ob)
         return nmea_objects
 
+    def _iter_chunks(self, data=None, size=1024):
+        """ Yield chunks of raw data from data, if given, otherwise from the
+            stream until it returns nothing.
+        """
+        if data:
+            yield data
+            return
+
+        if not self.stream:
+            if self.head:
+                return
+            raise NoDataGivenError('No data was provided')
+
+        while True:
+            read_data = self.stream.read(size)
+            if not read_data:
+                return
+            yield read_data
+
+    def _flush(self):
+        """ Return whatever is left over from previous reads as sentences
+            and clear it.
+        """
+        raw_sentences = self._split(self.head) if self.head else []
+        self.head = ''
+        self._skipping = False
+        return raw_sentences
 
     def _read(self, data=None, size=1024):
         """ Read size bytes of data. Always strip off the last record and
@@ -51,27 +225,88 @@ class NMEAStream(object):
         else:
             read_data = data
 
-        data = self.head + read_data
-        raw_sentences = self._split(data)
         if not read_data:
-            self.head = ''
-            return raw_sentences
-        self.head = raw_sentences[-1]
-        full_sentences = raw_sentences[:-1]
-        return full_sentences
+            return self._flush()
 
-    def _get_type(self, sentence):
-        """ Get the NMEA type and return the appropriate object. Returns
-            None if no such object was found.
+        ready = self._frame(read_data)
+        return self._split(ready) if ready else []
 
-            TODO: raise error instead of None. Failing silently is a Bad Thing.
-            We can always catch the error later if the user wishes to supress
-            errors.
+    def _frame(self, read_data):
+        """ Add newly read data to the incomplete sentence in head. Returns
+            whatever data is now known to hold only whole sentences (anything
+            before the last $), leaving the rest in head.
+
+            Only the new data is searched for a $, so data that has already
+            been seen is never looked at again.
         """
-        sen_type = sentence.split(',')[0].lstrip('$')
-        sen_mod = __import__('pynmea.nmea', fromlist=[sen_type])
-        sen_obj = getattr(sen_mod, sen_type, None)
-        return sen_obj
+        dollar = '$' if isinstance(read_data, str) else b'$'
+
+        if self._skipping:
+            # Throwing data away until the start of the next sentence
+            start = read_data.find(dollar)
+            if start == -1:
+                self.discarded += len(read_data)
+                return None
+            self.discarded += start
+            read_data = read_data[start:]
+            self._skipping = False
+
+        last = read_data.rfind(dollar)
+        if last == -1:
+            # All of it belongs to the incomplete sentence
+            ready = None
+            # head starts out as text, so only join it on when there is
+            # something in it, in case the data is bytes.
+            self.head = self.head + read_data if self.head else read_data
+        else:
+            ready = read_data[:last]
+            if self.head:
+                ready = self.head + ready
+            self.head = read_data[last:]
+
+        if (self.max_sentence is not None and
+                len(self.head) > self.max_sentence):
+            kept = self._overflowed(self.head[:self.max_sentence],
+                                    len(self.head))
+            if self.overflow == 'drop':
+                self.head = kept
+            else:
+                if kept:
+                    ready = ready + kept if ready else kept
+                self.head = self.head[:0]
+            # Ignore the rest of this sentence, up to the next $
+            self._skipping = True
+
+        return ready
+
+    def _overflowed(self, start, length):
+        """ Deal with a sentence that is longer than max_sentence, according
+            to the overflow policy. start is the first max_sentence characters
+            of it and length is its full length. Returns what should be kept
+            of it, which may be nothing, and counts the rest as discarded.
+        """
+        self.overflows += 1
+        if self.overflow == 'drop':
+            kept = start
+        else:
+            # A complete sentence may be followed by junk, so keep anything up
+            # to the first line break.
+            end = len(start)
+            for line_end in (('\r', '\n') if isinstance(start, str) else
+                             (b'\r', b'\n')):
+                found = start.find(line_end, 0, end)
+                if found != -1:
+                    end = found
+            kept = start[:end] if end < len(start) else start[:0]
+        self.discarded += length - len(kept)
+        return kept
+
+    def _get_type(self, sentence):
+        """ Get the NMEA type and return the appropriate class from the
+            sentence registry. Raises UnknownSentenceTypeError if no such
+            class was found.
+        """
+        return get_sentence_class(sentence_type(sentence))
 
     def _split(self, data, separator=None):
         """ Take some data and split up based on the notion that a sentence
@@ -83,26 +318,179 @@ class NMEAStream(object):
             Without this, there is no real way to tell whether:
             $x,y,zSTUFF
             is legal or if STUFF should be stripped.
+
+            data may be text or bytes (in which case, so is separator) and
+            the sentences are returned as the same type.
         """
-        sentences = data.split('$')
+        if isinstance(data, str):
+            dollar, comma, star = '$', ',', '*'
+        else:
+            data = bytes(data)
+            dollar, comma, star = b'$', b',', b'*'
+        include, exclude = self._prefixes[type(data)]
+
         clean_sentences = []
-        for item in sentences:
-            cleaned_item = item.rstrip()
-            if separator:
-                cleaned_item = cleaned_item.rstrip(separator)
-            if '*' in cleaned_item.split(',')[-1]:
-                # There must be a checksum. Remove any trailing fluff:
-                try:
-                    first, checksum = cleaned_item.split('*')
-                except ValueError:
-                    # Some GPS data recorders have been shown to output
-                    # run-together sentences (no leading $).
-                    # In this case, ignore error and continue, discarding the
-                    # erroneous data.
-                    # TODO: try and fix the data.
-                    continue
-                cleaned_item = '*'.join([first, checksum[:2]])
+        for item in data.split(dollar):
+            if include is not None and not item.startswith(include):
+                continue
+            if exclude and item.startswith(exclude):
+                continue
+            cleaned_item = self._clean(item, separator, comma, star)
             if cleaned_item:
                 clean_sentences.append(cleaned_item)
 
         return clean_sentences
+
+    def _clean(self, item, separator, comma, star):
+        """ Tidy up one sentence, as split out by _split (without the $).
+            comma and star are ',' and '*' of the same type as item. Returns
+            None if the sentence has to be thrown away.
+        """
+        cleaned_item = item.rstrip()
+        if separator:
+            cleaned_item = cleaned_item.rstrip(separator)
+        star_at = cleaned_item.rfind(star)
+        if star_at > cleaned_item.rfind(comma):
+            # There must be a checksum. Remove any trailing fluff:
+            if cleaned_item.count(star) != 1:
+                # Some GPS data recorders have been shown to output
+                # run-together sentences (no leading $).
+                # In this case, ignore error and continue, discarding the
+                # erroneous data.
+                # TODO: try and fix the data.
+                self.discarded += len(cleaned_item)
+                return None
+            cleaned_item = cleaned_item[:star_at + 3]
+        return cleaned_item
+
+
+class MappedNMEAStream(NMEAStream):
+    """ An NMEAStream over a file on disk, for reading large logs. The file
+        is memory mapped and sentences are found directly in the mapping, so
+        nothing is copied until a sentence is returned. Sentences are returned
+        as bytes (see NMEAStream for what that means for objects).
+    """
+    def __init__(self, path, validate=False, max_sentence=4096,
+                 overflow='resync', window=65536, lazy=False, include=None,
+                 exclude=None, fields=None, cache=None, reuse=False):
+        """ path is the name of the file to read. iter_strings and
+            iter_objects work through the file window bytes at a time.
+        """
+        super(MappedNMEAStream, self).__init__(
+            validate=validate, max_sentence=max_sentence, overflow=overflow,
+            lazy=lazy, include=include, exclude=exclude, fields=fields,
+            cache=cache, reuse=reuse)
+        self.path = path
+        self.position = 0
+        self.window = window
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            self._map = b''
+
+    def close(self):
+        """ Unmap and close the file
+        """
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def iter_strings(self, data=None, size=1024):
+        """ Yield every sentence from the current position to the end of the
+            file. If data is given, it is split as for NMEAStream instead.
+        """
+        if data:
+            return super(MappedNMEAStream, self).iter_strings(data=data)
+        return self._iter_mapped()
+
+    def _read(self, data=None, size=1024):
+        """ Return the sentences in (about) the next size bytes of the file,
+            or at least one sentence if there are any left. Returns an empty
+            list at the end of the file.
+        """
+        if data:
+            return super(MappedNMEAStream, self)._read(data=data)
+
+        sentences = []
+        while not sentences and self.position < len(self._map):
+            sentences = self._next_window(size)
+        return sentences
+
+    def _iter_mapped(self):
+        """ Yield sentences from the mapping, a window at a time
+        """
+        while self.position < len(self._map):
+            for sentence in self._next_window(self.window):
+                yield sentence
+
+    def _next_window(self, size):
+        """ Split out the sentences in the next size bytes of the mapping,
+            up to the last $ in them, and move position on past them. The
+            mapping is searched in place, so the only copy made is of the
+            window that gets split.
+        """
+        data = self._map
+        data_len = len(data)
+        max_sentence = self.max_sentence
+        start = self.position
+
+        stop = start + size
+        if stop >= data_len:
+            stop = data_len
+        else:
+            cut = data.rfind(b'$', start + 1, stop)
+            if cut != -1:
+                stop = cut
+            elif max_sentence is None:
+                stop = data.find(b'$', stop)
+                if stop == -1:
+                    stop = data_len
+            else:
+                # A sentence longer than the window. Find where it ends but
+                # don't copy any more of it than is needed.
+                end = data.find(b'$', stop)
+                if end == -1:
+                    end = data_len
+                self.position = end
+                if data[start:start + 1] == b'$':
+                    start += 1
+                if end - start <= max_sentence:
+                    items = [data[start:end]]
+                else:
+                    items = [self._overflowed(
+                        data[start:start + max_sentence], end - start)]
+                return self._clean_all(items)
+
+        self.position = stop
+        items = data[start:stop].split(b'$')
+        if max_sentence is not None:
+            for index, item in enumerate(items):
+                if len(item) > max_sentence:
+                    items[index] = self._overflowed(item[:max_sentence],
+                                                    len(item))
+        return self._clean_all(items)
+
+    def _clean_all(self, items):
+        """ Clean up split out items, dropping any that come to nothing
+        """
+        clean = self._clean
+        include, exclude = self._prefixes[bytes]
+        sentences = []
+        for item in items:
+            if include is not None and not item.startswith(include):
+                continue
+            if exclude and item.startswith(exclude):
+                continue
+            cleaned_item = clean(item, None, b',', b'*')
+            if cleaned_item:
+                sentences.append(cleaned_item)
+        return sentences
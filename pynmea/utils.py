@@ -1,16 +1,116 @@
 """ Functions that get used by multiple classes go in here
 """
+import binascii
+
+# (shift, mask) pairs used to fold an integer of up to 1024 bits down to 8
+_FOLDS = tuple((shift, (1 << shift) - 1)
+               for shift in (512, 256, 128, 64, 32, 16, 8))
+_FOLD_WIDTH = 1024
+_FOLD_MASK = (1 << _FOLD_WIDTH) - 1
+
+# Text: str on Python 3, unicode on Python 2 (where str is bytes)
+_TEXT = type(u'')
+
+
+if hasattr(int, 'from_bytes'):
+    def _from_bytes(data):
+        return int.from_bytes(data, 'little')
+else:
+    def _from_bytes(data):
+        # Python 2. The order of the bytes makes no difference to an XOR of
+        # all of them, so they are taken as they come.
+        return int(binascii.hexlify(data) or b'0', 16)
+
+
+def _xor_bytes(data):
+    """ XOR all of the bytes in data together. Rather than looping over each
+        byte in Python, treat data as one big integer and repeatedly XOR its
+        top half onto its bottom half until a single byte is left.
+    """
+    value = _from_bytes(data)
+    while value >> _FOLD_WIDTH:
+        # Longer than any real sentence, but fold it down all the same
+        value = (value >> _FOLD_WIDTH) ^ (value & _FOLD_MASK)
+    for shift, mask in _FOLDS:
+        value = (value >> shift) ^ (value & mask)
+    return value
+
+
+def _to_bytes(nmea_str):
+    """ Return nmea_str as something bytes-like. Text is encoded, anything
+        else is assumed to be bytes, bytearray or similar already.
+    """
+    if isinstance(nmea_str, _TEXT):
+        return nmea_str.encode('latin-1', 'replace')
+    return nmea_str
+
+
+def checksum_value(nmea_str):
+    """ Return the checksum of nmea_str as an integer. This covers everything
+        after the leading $ (if any) and before the * (if any).
+        nmea_str may be str, bytes or bytearray.
+    """
+    data = _to_bytes(nmea_str)
+    start = 1 if data[:1] == b'$' else 0
+    end = data.find(b'*', start)
+    if end == -1:
+        end = len(data)
+    return _xor_bytes(memoryview(data)[start:end])
 
 
 def checksum_calc(nmea_str):
-    """ Loop through all of the given characters and xor the current to the
-        previous (cumulatively).
+    """ XOR all of the characters of the given sentence together, returning
+        the result as two hex digits, as it would appear after the *.
+    """
+    return "%02X" % checksum_value(nmea_str)
+
+
+def verify_checksum(nmea_str):
+    """ Return True if nmea_str ends with a *hh checksum that matches its
+        contents. Sentences without a checksum are not valid.
+        nmea_str may be str, bytes or bytearray.
     """
-    chksum_val = 0
-    nmea_str = nmea_str.replace('$', '')
-    nmea_str = nmea_str.split('*')[0]
-    for next_char in nmea_str:
-        chksum_val ^= ord(next_char)
+    data = _to_bytes(nmea_str).rstrip()
+    start = 1 if data[:1] == b'$' else 0
+    end = data.find(b'*', start)
+    if end == -1 or len(data) - end != 3:
+        return False
+    try:
+        expected = int(data[end + 1:], 16)
+    except ValueError:
+        return False
+    return _xor_bytes(memoryview(data)[start:end]) == expected
+
 
-    return "%02X" % chksum_val
+def checksum_mask(sentences):
+    """ Check the checksums of many sentences in one call. sentences is
+        either a list (or other iterable) of sentences, or a single str or
+        bytes buffer with one sentence per line. Returns a list with True
+        for each sentence with a valid checksum and False otherwise.
+    """
+    if isinstance(sentences, (_TEXT, bytes, bytearray)):
+        # Encode the whole buffer once, rather than each line
+        sentences = _to_bytes(sentences).splitlines()
+    return [verify_checksum(sentence) for sentence in sentences]
 
+
+def split_timestamp(raw):
+    """ Split a hhmmss(.ss) timestamp field, as str or bytes, into hours,
+        minutes and seconds (a float). Returns None if it is empty, and
+        raises ValueError if it can't be read.
+    """
+    if not raw:
+        return None
+    return int(raw[0:2]), int(raw[2:4]), float(raw[4:])
+
+
+def timestamp_seconds(raw):
+    """ A hhmmss(.ss) timestamp field as seconds since midnight. As
+        split_timestamp, returns None if it is empty and raises ValueError
+        if it can't be read.
+    """
+    parts = split_timestamp(raw)
+    if parts is None:
+        return None
+    hours, minutes, seconds = parts
+    return hours * 3600 + minutes * 60 + seconds
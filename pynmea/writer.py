@@ -0,0 +1,84 @@
+""" Write sentences out to a file or socket, for simulators, relays and test
+    harnesses
+"""
+from pynmea.utils import checksum_calc, checksum_value
+
+
+class NMEAWriter(object):
+    """ Writes sentences to file_obj, which is anything with a write method:
+        a file, an io.StringIO, socket.makefile() and so on. It is written
+        text, or bytes (latin-1) if binary is True.
+
+        Sentences are held until there are batch of them, then written in
+        one go, so call flush() (or close(), or use the writer in a with
+        block) at the end. written counts the sentences written so far.
+    """
+    def __init__(self, file_obj, binary=False, line_ending='\r\n',
+                 batch=1000):
+        self.file_obj = file_obj
+        self.binary = binary
+        self.line_ending = line_ending
+        self.batch = batch
+        self.written = 0
+        self._lines = []
+        # Sentence type -> ('$' + type + ',', the checksum of type + ',')
+        self._templates = {}
+
+    def write(self, nmea_ob):
+        """ Write an NMEA object, as given by its render method """
+        self._add(nmea_ob.render() + self.line_ending)
+
+    def write_many(self, nmea_objects):
+        """ Write each of an iterable of NMEA objects """
+        for nmea_ob in nmea_objects:
+            self.write(nmea_ob)
+
+    def write_fields(self, sen_type, fields):
+        """ Write a sentence of sen_type (such as 'GPRMC') made up of fields,
+            a list of text, without making an object for it. The start of
+            each type of sentence, and its part of the checksum, are only
+            worked out once, so only the fields are gone over each time.
+        """
+        if not fields:
+            self._add('$%s*%s%s' % (sen_type, checksum_calc(sen_type),
+                                    self.line_ending))
+            return
+        try:
+            prefix, prefix_sum = self._templates[sen_type]
+        except KeyError:
+            prefix = '$' + sen_type + ','
+            prefix_sum = checksum_value(prefix)
+            self._templates[sen_type] = (prefix, prefix_sum)
+        body = ','.join(fields)
+        self._add('%s%s*%02X%s' % (prefix, body,
+                                   prefix_sum ^ checksum_value(body),
+                                   self.line_ending))
+
+    def _add(self, line):
+        self._lines.append(line)
+        if len(self._lines) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        """ Write out any sentences being held, and flush file_obj if it can
+            be
+        """
+        if self._lines:
+            data = ''.join(self._lines)
+            if self.binary:
+                data = data.encode('latin-1')
+            self.file_obj.write(data)
+            self.written += len(self._lines)
+            self._lines = []
+        if hasattr(self.file_obj, 'flush'):
+            self.file_obj.flush()
+
+    def close(self):
+        """ Flush what is left. file_obj is left open. """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,83 @@
+import asyncio
+import os
+from unittest import TestCase
+
+from pynmea.aio import AsyncNMEAStream
+from pynmea.streamer import NMEAStream
+
+
+class TestAsyncStream(TestCase):
+    test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                             'test_data_small.gps')
+
+    def setUp(self):
+        with open(self.test_file, 'rb') as test_file_fd:
+            self.data = test_file_fd.read()
+
+    def serve(self, client, piece=37):
+        """ Run client against a loopback server sending self.data in small
+            pieces, returning what client returns.
+        """
+        async def send(reader, writer):
+            for start in range(0, len(self.data), piece):
+                writer.write(self.data[start:start + piece])
+                await writer.drain()
+            writer.close()
+
+        async def run():
+            server = await asyncio.start_server(send, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1',
+                                                               port)
+                result = await client(AsyncNMEAStream(reader, size=50))
+                writer.close()
+                return result
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        return asyncio.run(run())
+
+    def test_async_for(self):
+        async def client(streamer):
+            return [nmea_str async for nmea_str in streamer]
+
+        self.assertEqual(NMEAStream()._split(self.data), self.serve(client))
+
+    def test_iter_objects(self):
+        async def client(streamer):
+            return [nmea_ob.sen_type
+                    async for nmea_ob in streamer.iter_objects()]
+
+        expected_object_types = ['GPRMC', 'GPGGA', 'GPRMC', 'GPGGA', 'GPGLL',
+                                 'GPVTG', 'GPRMC', 'GPGGA', 'GPGLL', 'GPVTG']
+        self.assertEqual(expected_object_types, self.serve(client))
+
+    def test_get_objects(self):
+        async def client(streamer):
+            nmea_objects = []
+            while True:
+                read_objects = await streamer.get_objects()
+                if not read_objects and not streamer.head:
+                    return nmea_objects
+                nmea_objects.extend(read_objects)
+
+        self.assertEqual(10, len(self.serve(client)))
+
+    def test_reads_only_when_asked(self):
+        reads = []
+
+        class Reader(object):
+            async def read(self, size):
+                reads.append(size)
+                return b'$GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36\r\n'
+
+        async def client():
+            streamer = AsyncNMEAStream(Reader(), size=100)
+            nmea_strings = streamer.iter_strings()
+            await nmea_strings.__anext__()
+            await nmea_strings.__anext__()
+            return len(reads)
+
+        self.assertEqual(3, asyncio.run(client()))
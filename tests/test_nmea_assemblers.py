@@ -0,0 +1,308 @@
+import datetime
+from unittest import TestCase
+
+from pynmea.assemblers import (Fix, FixAssembler, Route, RouteAssembler,
+                               SkyView, SkyViewAssembler, Waypoint)
+from pynmea.generator import NMEAGenerator
+from pynmea.nmea import GPGSV
+from pynmea.streamer import NMEAStream
+
+
+EPOCH = """$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B
+$GPGGA,184332.07,1929.459,S,02410.381,E,1,04,2.8,100.00,M,-33.9,M,,0000*67
+$GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1*39
+$GPVTG,16.78,T,,M,74.00,N,137.05,K*5C
+"""
+
+CYCLE = """$GPGSV,3,1,11,03,03,111,00,04,15,270,00,06,01,010,00,13,06,292,00*74
+$GPGSV,3,2,11,14,25,170,00,16,57,208,39,18,67,296,40,19,40,246,00*74
+$GPGSV,3,3,11,22,42,067,42,24,14,311,43,27,05,244,*4D
+"""
+
+ROUTE = """$GPRTE,2,1,c,0,PBRCPK,PBRTO,PTELGR,PPLAND,PYAMBU,PPFAIR,PWARRN*73
+$GPRTE,2,2,c,0,PMORTL,PLISMR*73
+"""
+
+WAYPOINTS = """$GPWPL,4917.16,N,12310.64,W,PBRCPK*2D
+$GPWPL,4916.45,N,12311.12,W,PMORTL*34
+"""
+
+
+class TestFixAssembler(TestCase):
+    def objects(self, data):
+        return list(NMEAStream().iter_objects(data=data))
+
+    def test_complete_epoch(self):
+        assembler = FixAssembler()
+        nmea_objects = self.objects(EPOCH)
+        for nmea_ob in nmea_objects[:-1]:
+            self.assertEqual((), assembler.add(nmea_ob))
+        fix, = assembler.add(nmea_objects[-1])
+
+        self.assertTrue(isinstance(fix, Fix))
+        self.assertEqual(datetime.time(18, 43, 32, 70000,
+                                       tzinfo=datetime.timezone.utc),
+                         fix.time)
+        self.assertEqual(datetime.date(2010, 4, 21), fix.date)
+        self.assertAlmostEqual(-19.49098333, fix.lat)
+        self.assertAlmostEqual(24.17301667, fix.lon)
+        self.assertEqual(100.0, fix.altitude)
+        self.assertEqual(74.0, fix.speed)
+        self.assertEqual(16.78, fix.course)
+        self.assertEqual(1, fix.quality)
+        self.assertEqual(4, fix.num_sats)
+        self.assertEqual(3, fix.fix_type)
+        self.assertEqual((2.5, 1.3, 2.1), (fix.pdop, fix.hdop, fix.vdop))
+        self.assertEqual(True, fix.valid)
+        self.assertEqual(('GPRMC', 'GPGGA', 'GPGSA', 'GPVTG'), fix.sen_types)
+        self.assertEqual((), assembler.flush())
+
+    def test_next_epoch_finishes(self):
+        data = EPOCH.replace('$GPVTG', '$GPXTE')
+        data += data.replace('184332.07', '184333.07')
+        fixes = list(FixAssembler().iter_fixes(self.objects(data)))
+
+        self.assertEqual(2, len(fixes))
+        self.assertEqual(('GPRMC', 'GPGGA', 'GPGSA'), fixes[0].sen_types)
+        self.assertEqual(3, fixes[0].fix_type)
+        self.assertEqual(32, fixes[0].time.second)
+        self.assertEqual(33, fixes[1].time.second)
+
+    def test_late_sentences_dropped(self):
+        assembler = FixAssembler(expect=('GPRMC',))
+        rmc, gga = self.objects(EPOCH)[:2]
+
+        self.assertEqual(1, len(assembler.add(rmc)))
+        self.assertEqual((), assembler.add(gga))
+        self.assertEqual(1, assembler.late)
+        self.assertEqual((), assembler.flush())
+
+    def test_timeout(self):
+        now = [0]
+        assembler = FixAssembler(timeout=1.0, clock=lambda: now[0])
+        self.assertEqual((), assembler.add(self.objects(EPOCH)[0]))
+        self.assertEqual((), assembler.expire())
+        now[0] = 2
+        fix, = assembler.expire()
+        self.assertEqual(('GPRMC',), fix.sen_types)
+
+    def test_generated(self):
+        data = NMEAGenerator(seed=2).generate(20000)
+        fixes = list(FixAssembler().iter_fixes(self.objects(data)))
+        rmc_count = data.count('$GPRMC')
+
+        self.assertEqual(rmc_count, len(fixes))
+        for fix in fixes:
+            self.assertEqual(set(['GPRMC', 'GPGGA', 'GPVTG', 'GPGSA']),
+                             set(fix.sen_types))
+            self.assertTrue(None not in fix)
+
+    def test_bad_fields_dropped(self):
+        # A run together RMC, 72 seconds in the GGA and a garbled GSA
+        data = (EPOCH.replace('1929.459,S,', '1929.459S,', 1)
+                .replace('184332.07,1929', '184372.07,1929')
+                .replace('$GPGSA,A,3,', '$GPGSA,A,x,'))
+        assembler = FixAssembler()
+        fix, = assembler.iter_fixes(self.objects(data))
+
+        self.assertEqual(3, assembler.bad)
+        self.assertEqual(('GPVTG',), fix.sen_types)
+        self.assertEqual((None, None, None), (fix.time, fix.lat, fix.fix_type))
+        self.assertEqual(16.78, fix.course)
+
+    def test_generated_corrupt(self):
+        data = NMEAGenerator(seed=2, corruption=0.1).generate(100000)
+        assembler = FixAssembler()
+        fixes = list(assembler.iter_fixes(self.objects(data)))
+        self.assertTrue(fixes)
+        self.assertTrue(assembler.bad)
+
+    def test_bad_type(self):
+        self.assertRaises(ValueError, FixAssembler, expect=('GPGSV',))
+
+
+class TestSkyViewAssembler(TestCase):
+    def objects(self, data):
+        return list(NMEAStream().iter_objects(data=data))
+
+    def test_cycle(self):
+        assembler = SkyViewAssembler()
+        nmea_objects = self.objects(CYCLE)
+        self.assertEqual((), assembler.add(nmea_objects[0]))
+        self.assertEqual((), assembler.add(nmea_objects[1]))
+        view, = assembler.add(nmea_objects[2])
+
+        self.assertTrue(isinstance(view, SkyView))
+        self.assertEqual('GP', view.talker)
+        self.assertEqual(11, view.count)
+        self.assertEqual(11, view.num_sv_in_view)
+        self.assertEqual((57, 208, 39), (view.elevation[16], view.azimuth[16],
+                                         view.snr[16]))
+        self.assertEqual(-1, view.snr[27])
+        self.assertEqual(-1, view.elevation[1])
+        satellites = list(view.satellites())
+        self.assertEqual((3, 3, 111, 0), satellites[0])
+        self.assertEqual((27, 5, 244, -1), satellites[-1])
+        self.assertEqual(1, view.cycles)
+        self.assertEqual(0, view.incomplete)
+
+    def test_updated_in_place(self):
+        assembler = SkyViewAssembler()
+        first = list(assembler.iter_views(self.objects(CYCLE)))[0]
+        elevation = first.elevation
+
+        # The next cycle has lost satellite 03
+        second_cycle = CYCLE.replace('03,03,111,00,', '')
+        second = list(assembler.iter_views(self.objects(second_cycle)))[0]
+        self.assertTrue(first is second)
+        self.assertTrue(elevation is second.elevation)
+        self.assertEqual(-1, second.elevation[3])
+        self.assertEqual(10, second.count)
+        self.assertEqual(2, second.cycles)
+
+    def test_incomplete(self):
+        lines = CYCLE.splitlines(True)
+        assembler = SkyViewAssembler()
+
+        # Missing middle sentence, then a cycle cut short by the next one,
+        # then one missing its start
+        data = (lines[0] + lines[2] + lines[0] + lines[1] + CYCLE +
+                lines[1] + lines[2])
+        views = list(assembler.iter_views(self.objects(data)))
+        self.assertEqual(1, len(views))
+        self.assertEqual(1, views[0].cycles)
+        self.assertEqual(3, assembler.incomplete)
+        self.assertEqual(11, views[0].count)
+
+    def test_bad_sentence_keeps_last_cycle(self):
+        assembler = SkyViewAssembler()
+        view = list(assembler.iter_views(self.objects(CYCLE)))[0]
+        lines = CYCLE.splitlines(True)
+        bad = lines[1].replace('57,208', 'xx,208')
+        self.assertEqual([], list(assembler.iter_views(
+            self.objects(lines[0] + bad + lines[2]))))
+        self.assertEqual(1, view.incomplete)
+        self.assertEqual(57, view.elevation[16])
+
+    def test_talkers(self):
+        glonass = GPGSV()
+        glonass.parse('$GLGSV,1,1,02,65,10,100,30,66,20,200,35')
+        assembler = SkyViewAssembler()
+        nmea_objects = self.objects(CYCLE)
+        nmea_objects.insert(1, glonass)
+        views = list(assembler.iter_views(nmea_objects))
+
+        self.assertEqual(['GL', 'GP'], [view.talker for view in views])
+        self.assertEqual(35, assembler.views['GL'].snr[66])
+        self.assertEqual(-1, assembler.views['GP'].snr[66])
+
+    def test_generated(self):
+        data = NMEAGenerator(seed=2).generate(20000)
+        assembler = SkyViewAssembler()
+        views = list(assembler.iter_views(self.objects(data)))
+
+        last_messages = [line for line in data.splitlines()
+                         if line.startswith('$GPGSV') and
+                         line.split(',')[1] == line.split(',')[2]]
+        self.assertEqual(len(last_messages), len(views))
+        self.assertEqual(0, assembler.incomplete)
+        view = assembler.views['GP']
+        self.assertEqual(view.num_sv_in_view, view.count)
+
+
+class TestRouteAssembler(TestCase):
+    def objects(self, data):
+        return list(NMEAStream().iter_objects(data=data))
+
+    def test_route(self):
+        assembler = RouteAssembler()
+        self.assertEqual([], list(assembler.iter_routes(
+            self.objects(WAYPOINTS))))
+        first, second = self.objects(ROUTE)
+        self.assertEqual((), assembler.add(first))
+        route, = assembler.add(second)
+
+        self.assertTrue(isinstance(route, Route))
+        self.assertEqual('0', route.route_id)
+        self.assertEqual('c', route.start_type)
+        self.assertEqual(['PBRCPK', 'PBRTO', 'PTELGR', 'PPLAND', 'PYAMBU',
+                          'PPFAIR', 'PWARRN', 'PMORTL', 'PLISMR'],
+                         [waypoint.waypoint_id
+                          for waypoint in route.waypoints])
+        self.assertTrue(isinstance(route.waypoints[0], Waypoint))
+        self.assertAlmostEqual(49.286, route.waypoints[0].lat)
+        self.assertAlmostEqual(-123.17733333, route.waypoints[0].lon)
+        self.assertAlmostEqual(49.2741667, route.waypoints[7].lat)
+        self.assertEqual((None, None), route.waypoints[1][1:])
+        self.assertTrue(assembler.routes['0'] is route)
+
+    def test_repeats_not_published(self):
+        assembler = RouteAssembler()
+        routes = list(assembler.iter_routes(self.objects(
+            WAYPOINTS + ROUTE + ROUTE + WAYPOINTS + ROUTE)))
+        self.assertEqual(1, len(routes))
+
+    def test_changed_route(self):
+        changed = ROUTE.replace(',PLISMR*73', ',PLISMR,PXYZ')
+        routes = list(RouteAssembler().iter_routes(self.objects(
+            ROUTE + changed)))
+        self.assertEqual(2, len(routes))
+        self.assertEqual('PXYZ', routes[1].waypoints[-1].waypoint_id)
+
+    def test_waypoint_moved(self):
+        assembler = RouteAssembler()
+        list(assembler.iter_routes(self.objects(WAYPOINTS + ROUTE)))
+        moved, = self.objects('$GPWPL,4917.16,N,12310.64,E,PBRCPK')
+        route, = assembler.add(moved)
+        self.assertAlmostEqual(123.17733333, route.waypoints[0].lon)
+        self.assertEqual(route, assembler.routes['0'])
+
+        # Not in any route
+        other, = self.objects('$GPWPL,4917.16,N,12310.64,E,POTHER')
+        self.assertEqual((), assembler.add(other))
+        self.assertTrue('POTHER' in assembler.waypoints)
+
+    def test_incomplete(self):
+        first, second = ROUTE.splitlines(True)
+        assembler = RouteAssembler()
+        routes = list(assembler.iter_routes(self.objects(
+            second + first + first + second)))
+        self.assertEqual(1, len(routes))
+        self.assertEqual(2, assembler.incomplete)
+
+    def test_generated(self):
+        data = NMEAGenerator(seed=2, mix='all').generate(50000)
+        assembler = RouteAssembler()
+        routes = list(assembler.iter_routes(self.objects(data)))
+
+        self.assertTrue(routes)
+        self.assertEqual(0, assembler.incomplete)
+        self.assertTrue(data.count('$GPRTE') > len(routes))
+
+    def test_reused_objects(self):
+        assembler = RouteAssembler()
+        nmea_objects = NMEAStream(reuse=True).iter_objects(data=ROUTE)
+        route, = assembler.iter_routes(nmea_objects)
+        self.assertEqual(9, len(route.waypoints))
+        self.assertEqual('PBRCPK', route.waypoints[0].waypoint_id)
+
+    def test_bad_sentences(self):
+        assembler = RouteAssembler()
+        for sentence in ('$GPRTE,2*00', '$GPRTE,2,1,c*00',
+                         '$GPRTE,x,1,c,R1,A*00'):
+            self.assertEqual((), assembler.add(self.objects(sentence)[0]))
+        # The first two have no route ID, so are one broken set
+        self.assertEqual(2, assembler.incomplete)
+
+        bad, = self.objects('$GPWPL,49x7.16,N,12310.64,W,WP1')
+        self.assertEqual((), assembler.add(bad))
+        self.assertEqual(1, assembler.bad)
+        self.assertFalse('WP1' in assembler.waypoints)
+
+    def test_generated_corrupt(self):
+        for seed in (0, 8):
+            data = NMEAGenerator(seed=seed, mix='all',
+                                 corruption=0.1).generate(50000)
+            assembler = RouteAssembler()
+            routes = list(assembler.iter_routes(self.objects(data)))
+            self.assertTrue(routes)
@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+from pynmea.cache import CacheInfo, ParseCache
+from pynmea.exceptions import UnknownSentenceTypeError
+from pynmea.nmea import GPVTG
+from pynmea.streamer import NMEAStream
+
+
+VTG = '$GPVTG,16.78,T,,M,74.00,N,137.05,K*5C'
+HDT = '$GPHDT,16.78,T*28'
+GLL = '$GPGLL,3751.65,S,14507.36,E*77'
+
+
+class TestParseCache(TestCase):
+    def test_hits(self):
+        cache = ParseCache()
+        first = cache.parse(VTG)
+        self.assertTrue(isinstance(first, GPVTG))
+        self.assertEqual('137.05', first.spd_over_grnd_kmph)
+        self.assertTrue(cache.parse(VTG) is first)
+        self.assertEqual(CacheInfo(1, 1, 0, 1024, 1), cache.cache_info())
+        self.assertTrue(VTG in cache)
+
+    def test_evicts_least_recently_used(self):
+        cache = ParseCache(maxsize=2)
+        vtg = cache.parse(VTG)
+        cache.parse(HDT)
+        cache.parse(VTG)
+        cache.parse(GLL)
+
+        self.assertEqual(2, len(cache))
+        self.assertFalse(HDT in cache)
+        self.assertTrue(cache.parse(VTG) is vtg)
+        self.assertEqual(CacheInfo(2, 3, 1, 2, 2), cache.cache_info())
+
+    def test_bytes(self):
+        cache = ParseCache()
+        first = cache.parse(bytearray(VTG.encode('ascii')))
+        self.assertTrue(cache.parse(VTG.encode('ascii')) is first)
+        self.assertFalse(cache.parse(VTG) is first)
+        self.assertEqual('16.78', first.true_track)
+
+    def test_unknown_not_cached(self):
+        cache = ParseCache()
+        self.assertRaises(UnknownSentenceTypeError, cache.parse,
+                          '$GPXXX,1,2*00')
+        self.assertEqual(0, len(cache))
+
+    def test_clear(self):
+        cache = ParseCache()
+        cache.parse(VTG)
+        cache.parse(VTG)
+        cache.clear()
+        self.assertEqual(CacheInfo(0, 0, 0, 1024, 0), cache.cache_info())
+
+    def test_bad_maxsize(self):
+        self.assertRaises(ValueError, ParseCache, maxsize=0)
+
+    def test_stream(self):
+        data = '\r\n'.join([VTG, HDT, '$GPXXX,1*00', VTG, VTG, HDT]) + '\r\n'
+        cache = ParseCache()
+        streamer = NMEAStream(cache=cache)
+        nmea_objects = list(streamer.iter_objects(data=data))
+
+        self.assertEqual(['GPVTG', 'GPHDT', 'GPVTG', 'GPVTG', 'GPHDT'],
+                         [ob.sen_type for ob in nmea_objects])
+        self.assertTrue(nmea_objects[0] is nmea_objects[3])
+        self.assertEqual((3, 2), (cache.hits, cache.misses))
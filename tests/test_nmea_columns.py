@@ -0,0 +1,102 @@
+import math
+import os
+import unittest
+from unittest import TestCase
+
+from pynmea import columns
+from pynmea.columns import parse_columns
+from pynmea.streamer import NMEAStream
+
+
+class TestColumns(TestCase):
+    test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                             'test_data_small.gps')
+
+    def setUp(self):
+        with open(self.test_file, 'r') as test_file_fd:
+            self.data = test_file_fd.read()
+        self.objects = list(NMEAStream().iter_objects(data=self.data))
+
+    def test_python_columns(self):
+        tables = parse_columns(data=self.data, use_numpy=False)
+        self.assertEqual(set(['GPRMC', 'GPGGA', 'GPGLL', 'GPVTG']),
+                         set(tables))
+
+        gpgga = tables['GPGGA']
+        expected = [ob for ob in self.objects if ob.sen_type == 'GPGGA']
+        self.assertEqual(list(type(expected[0])._fields), list(gpgga))
+        self.assertEqual([float(ob.latitude) for ob in expected],
+                         list(gpgga['latitude']))
+        self.assertEqual([float(ob.num_sats) for ob in expected],
+                         list(gpgga['num_sats']))
+        self.assertEqual('d', gpgga['num_sats'].typecode)
+        self.assertEqual(['S', 'S', 'S'], gpgga['lat_direction'])
+        self.assertEqual([ob.timestamp for ob in expected],
+                         gpgga['timestamp'])
+        self.assertTrue(all(math.isnan(value)
+                            for value in gpgga['age_gps_data']))
+
+    def test_empty_values_are_nan(self):
+        data = ('$GPVTG,16.78,T,,M,74.00,N,137.05,K\n'
+                '$GPVTG,,T,,M,74.00,N,137.05,K\n')
+        gpvtg = parse_columns(data=data, use_numpy=False)['GPVTG']
+        self.assertEqual(16.78, gpvtg['true_track'][0])
+        self.assertTrue(math.isnan(gpvtg['true_track'][1]))
+
+    def test_bytes_and_filters(self):
+        data = self.data.encode('latin-1')
+        tables = parse_columns(data=data, sen_types=['GPRMC'],
+                               use_numpy=False)
+        self.assertEqual(['GPRMC'], list(tables))
+        self.assertEqual([74.0, 74.0, 74.0],
+                         list(tables['GPRMC']['spd_over_grnd']))
+
+    def test_validate(self):
+        data = ('$GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36\n'
+                '$GPVTG,16.78,T,,M,74.00,N,137.05,K,A*37\n')
+        tables = parse_columns(data=data, validate=True, use_numpy=False)
+        self.assertEqual(1, len(tables['GPVTG']['true_track']))
+
+    def test_skips_lists(self):
+        data = ('$GPRTE,2,1,c,0,PBRCPK,PBRTO,PTELGR,PPLAND,PYAMBU*6B\n'
+                '$GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36\n')
+        self.assertEqual(['GPVTG'],
+                         list(parse_columns(data=data, use_numpy=False)))
+
+    @unittest.skipUnless(columns.numpy, 'numpy is not installed')
+    def test_numpy_columns(self):
+        tables = parse_columns(data=self.data, use_numpy=True)
+        python_tables = parse_columns(data=self.data, use_numpy=False)
+        for sen_type, table in tables.items():
+            self.assertEqual(tuple(python_tables[sen_type]),
+                             table.dtype.names)
+            for name, column in python_tables[sen_type].items():
+                # Treats NaNs as equal
+                columns.numpy.testing.assert_array_equal(
+                    columns.numpy.array(column), table[name])
+        self.assertEqual(columns.numpy.float64,
+                         tables['GPGGA']['num_sats'].dtype)
+
+    def test_types_fixed_by_field(self):
+        data = ('$GPRMC,003000.00,A,1929.459,S,02410.381,E,74,16.5,010394,,\n'
+                '$GPRMC,003001.00,A,1929.459,S,02410.381,E,fast,17,,,\n'
+                '$GPGGA,003000.00,1929.459,S,02410.381,E,1,04,2.6,100.00,M,'
+                '-33.9,M,,0007\n')
+        batch_rows = columns.BATCH_ROWS
+        columns.BATCH_ROWS = 1
+        try:
+            for use_numpy in ([False, True] if columns.numpy else [False]):
+                tables = parse_columns(data=data, use_numpy=use_numpy)
+                gprmc, gpgga = tables['GPRMC'], tables['GPGGA']
+                self.assertEqual(['003000.00', '003001.00'],
+                                 list(gprmc['timestamp']))
+                self.assertEqual(['010394', ''], list(gprmc['datestamp']))
+                speed = list(gprmc['spd_over_grnd'])
+                self.assertEqual(74.0, speed[0])
+                self.assertTrue(math.isnan(speed[1]))
+                self.assertEqual([16.5, 17.0], list(gprmc['true_course']))
+                self.assertEqual(['0007'], list(gpgga['ref_station_id']))
+                self.assertEqual(['1'], list(gpgga['gps_qual']))
+                self.assertEqual([4.0], list(gpgga['num_sats']))
+        finally:
+            columns.BATCH_ROWS = batch_rows
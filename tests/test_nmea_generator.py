@@ -0,0 +1,90 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from pynmea import generator
+from pynmea.generator import NMEAGenerator, SENTENCE_FORMATS
+from pynmea.nmea import SENTENCE_TYPES, parse
+from pynmea.streamer import NMEAStream
+from pynmea.utils import verify_checksum
+
+
+class TestGenerator(TestCase):
+    def test_same_seed_same_data(self):
+        first = NMEAGenerator(seed=7, corruption=0.1).generate(20000)
+        second = NMEAGenerator(seed=7, corruption=0.1).generate(20000)
+        other = NMEAGenerator(seed=8, corruption=0.1).generate(20000)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_every_type(self):
+        self.assertEqual(set(SENTENCE_TYPES), set(SENTENCE_FORMATS))
+
+        data = NMEAGenerator(mix='all').generate(50000)
+        seen = set()
+        for line in data.splitlines():
+            self.assertTrue(verify_checksum(line), line)
+            nmea_ob = parse(line)
+            self.assertTrue(nmea_ob.check_chksum())
+            seen.add(nmea_ob.sen_type)
+        self.assertEqual(set(SENTENCE_TYPES), seen)
+
+    def test_mix_and_rate(self):
+        generator = NMEAGenerator(mix={'GPRMC': 1, 'GPZDA': 0.5}, rate=2)
+        lines = [line for _ in range(10) for line in generator.fix()]
+        sen_types = [line[1:6] for line in lines]
+
+        self.assertEqual(10, sen_types.count('GPRMC'))
+        self.assertEqual(5, sen_types.count('GPZDA'))
+        times = [line.split(',')[1] for line in lines
+                 if line.startswith('$GPRMC')]
+        self.assertEqual('184332.00', times[0])
+        self.assertEqual('184332.50', times[1])
+
+    def test_talkers(self):
+        data = NMEAGenerator(talkers=('GN', 'GL'),
+                             mix=[('GPRMC', 1), ('PGRME', 1)]).generate(5000)
+        talkers = set(line[1:3] for line in data.splitlines())
+        self.assertEqual(set(['GN', 'GL', 'PG']), talkers)
+
+    def test_corruption(self):
+        data = NMEAGenerator(corruption=0.2).generate(50000)
+        streamer = NMEAStream(validate=True)
+        valid = list(streamer.iter_objects(data=data))
+        total = data.count('$')
+
+        self.assertTrue(0.7 * total < len(valid) < 0.9 * total)
+
+    def test_size(self):
+        data = NMEAGenerator().generate(1000)
+        self.assertTrue(900 < len(data) <= 1000)
+        self.assertTrue(data.endswith('\r\n'))
+
+        stream = NMEAGenerator().stream(1000, binary=True)
+        self.assertEqual(data.encode('latin-1'), stream.read())
+
+    def test_write_file(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            written = NMEAGenerator().write_file(path, 100000)
+            with open(path, 'rb') as test_fd:
+                data = test_fd.read()
+        finally:
+            os.remove(path)
+
+        self.assertEqual(written, len(data))
+        self.assertEqual(NMEAGenerator().generate(100000).encode('latin-1'),
+                         data)
+
+    def test_unknown_type(self):
+        self.assertRaises(ValueError, NMEAGenerator, mix={'GPXXX': 1})
+
+    def test_minutes_carry(self):
+        self.assertEqual(('2000.0000', 'N'), generator._format_lat(19.99999999))
+        self.assertEqual(('02500.0000', 'W'),
+                         generator._format_lon(-24.999999999))
+        self.assertEqual(('3330.0000', 'S'), generator._format_lat(-33.5))
+        self.assertEqual(('14507.4074', 'E'),
+                         generator._format_lon(145.123456))
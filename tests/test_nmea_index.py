@@ -0,0 +1,102 @@
+import datetime
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from pynmea.index import LogIndex
+from pynmea.nmea import GPRMC
+
+
+class TestLogIndex(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.tmp_dir, 'log.gps')
+        source = os.path.join(os.path.dirname(__file__), 'test_data',
+                              'test_data.gps')
+        with open(source, 'rb') as source_fd:
+            self.data = source_fd.read()
+        with open(self.log_path, 'wb') as log_fd:
+            log_fd.write(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_update_builds_blocks(self):
+        index = LogIndex(self.log_path, block_size=512)
+        added = index.update()
+
+        self.assertTrue(added > 1)
+        self.assertEqual(len(self.data), index.size)
+        self.assertEqual(0, index.blocks[0].offset)
+        for block, next_block in zip(index.blocks, index.blocks[1:]):
+            self.assertEqual(block.end, next_block.offset)
+            self.assertEqual(b'$', self.data[next_block.offset:
+                                             next_block.offset + 1])
+        self.assertEqual(['GPRMC', 'GPGGA', 'GPGLL', 'GPVTG'], index.types)
+        # 18:43:32.07
+        self.assertAlmostEqual(67412.07, index.blocks[0].min_time)
+        self.assertTrue(os.path.exists(self.log_path + '.idx'))
+
+    def test_index_is_saved_and_loaded(self):
+        index = LogIndex(self.log_path, block_size=512)
+        index.update()
+        loaded = LogIndex(self.log_path)
+
+        self.assertEqual(index.blocks, loaded.blocks)
+        self.assertEqual(512, loaded.block_size)
+        self.assertEqual(0, loaded.update())
+
+    def test_query_types_and_time(self):
+        index = LogIndex(self.log_path, block_size=512)
+        index.update()
+
+        sentences = list(index.iter_strings(['GPRMC'], '184400', '184500'))
+        self.assertTrue(sentences)
+        for sentence in sentences:
+            self.assertTrue(sentence.startswith(b'GPRMC,1844'))
+
+        # Only some of the blocks need reading
+        blocks = index.find_blocks(['GPRMC'], datetime.time(18, 44),
+                                   datetime.time(18, 45))
+        self.assertTrue(0 < len(blocks) < len(index.blocks))
+
+        nmea_objects = list(index.iter_objects(['GPRMC'], '184400',
+                                               '184500'))
+        self.assertEqual(len(sentences), len(nmea_objects))
+        self.assertTrue(isinstance(nmea_objects[0], GPRMC))
+
+    def test_untimed_sentences_take_last_time(self):
+        index = LogIndex(self.log_path, block_size=512)
+        index.update()
+
+        sentences = list(index.iter_strings(['GPVTG'], '184334', '184335'))
+        # Only the GPVTG straight after the 18:43:34.07 GPGLL
+        self.assertEqual(1, len(sentences))
+
+    def test_update_appended(self):
+        head, tail = self.data[:1000], self.data[1000:]
+        with open(self.log_path, 'wb') as log_fd:
+            log_fd.write(head)
+        index = LogIndex(self.log_path, block_size=256)
+        index.update()
+        indexed = index.size
+        self.assertTrue(indexed <= 1000)
+
+        with open(self.log_path, 'ab') as log_fd:
+            log_fd.write(tail)
+        self.assertTrue(index.update() > 0)
+
+        self.assertEqual(len(self.data), index.size)
+        self.assertEqual(len(self.data.split(b'$')) - 1,
+                         len(list(index.iter_strings())))
+
+    def test_update_truncated_log(self):
+        index = LogIndex(self.log_path)
+        index.update()
+        with open(self.log_path, 'wb') as log_fd:
+            log_fd.write(self.data[:500])
+        index.update()
+
+        self.assertTrue(index.size <= 500)
+        self.assertEqual(0, index.blocks[0].offset)
@@ -0,0 +1,116 @@
+import datetime
+import io
+from unittest import TestCase
+
+from pynmea.generator import NMEAGenerator
+from pynmea.merge import Merged, merge_streams
+from pynmea.streamer import NMEAStream
+
+
+def objects(data):
+    return list(NMEAStream().iter_objects(data=data))
+
+
+class TestMerge(TestCase):
+    def test_time_order(self):
+        start = datetime.datetime(2010, 4, 21, 18, 43, 32)
+        gps = NMEAGenerator(seed=1, rate=2, mix={'GPRMC': 1, 'GPGGA': 1},
+                            start=start).generate(20000)
+        other = NMEAGenerator(seed=2, rate=3, mix={'GPGLL': 1},
+                              start=start).generate(20000)
+        sources = {'gps': NMEAStream(io.StringIO(gps, newline='')),
+                   'other': NMEAStream(io.StringIO(other, newline=''))}
+        merged = list(merge_streams(sources))
+
+        self.assertTrue(isinstance(merged[0], Merged))
+        self.assertEqual(len(objects(gps)) + len(objects(other)),
+                         len(merged))
+        epochs = [item.epoch for item in merged]
+        self.assertEqual(sorted(epochs), epochs)
+        self.assertEqual(set(['gps', 'other']),
+                         set(item.source for item in merged))
+        # Each source still in its own order
+        self.assertEqual([ob.nmea_sentence for ob in objects(other)],
+                         [item.nmea_ob.nmea_sentence for item in merged
+                          if item.source == 'other'])
+        self.assertEqual(18 * 3600 + 43 * 60 + 32, merged[0].epoch)
+        self.assertEqual(['gps', 'gps', 'other'],
+                         [item.source for item in merged[:3]])
+
+    def test_untimed(self):
+        heading = objects('$GPHDT,10.0,T*30\n'
+                          '$GPZDA,184333.00,21,04,2010,00,00*6B\n'
+                          '$GPHDT,11.0,T*31\n'
+                          '$GPZDA,184335.00,21,04,2010,00,00*6D\n')
+        gps = objects('$GPGLL,1929.459,S,02410.381,E,184332.00,A*37\n'
+                      '$GPGLL,1929.459,S,02410.381,E,184334.00,A*31\n')
+        merged = list(merge_streams([gps, heading]))
+
+        self.assertEqual([(0, 'GPGLL'), (1, 'GPHDT'), (1, 'GPZDA'),
+                          (1, 'GPHDT'), (0, 'GPGLL'), (1, 'GPZDA')],
+                         [(item.source, item.nmea_ob.sen_type)
+                          for item in merged])
+        seconds = 18 * 3600 + 43 * 60
+        self.assertEqual([32, 33, 33, 33, 34, 35],
+                         [item.epoch - seconds for item in merged])
+
+    def test_no_timestamps(self):
+        heading = objects('$GPHDT,10.0,T*30\n' * 5)
+        gps = objects('$GPGLL,1929.459,S,02410.381,E,184332.00,A*37\n'
+                      '$GPGLL,1929.459,S,02410.381,E,184333.00,A*36\n'
+                      '$GPGLL,1929.459,S,02410.381,E,184334.00,A*31\n')
+        merged = list(merge_streams({'gps': gps, 'heading': heading}))
+
+        self.assertEqual(['gps', 'heading'] * 3 + ['heading'] * 2,
+                         [item.source for item in merged])
+        seconds = 18 * 3600 + 43 * 60
+        self.assertEqual([32, 32, 33, 33, 34, 34, 34, 34],
+                         [item.epoch - seconds for item in merged])
+
+    def test_lookahead(self):
+        depth = objects('$GPDBT,0.0,f,0.0,M,0.0,F*0C\n' * 3)
+        gps = objects('$GPGLL,1929.459,S,02410.381,E,184332.00,A*37\n')
+        merged = list(merge_streams([gps, depth], lookahead=2))
+
+        self.assertEqual([0, 1, 1, 1], [item.source for item in merged])
+        self.assertEqual([67412.0] * 4, [item.epoch for item in merged])
+
+    def test_nothing_timed(self):
+        depth = objects('$GPDBT,0.0,f,0.0,M,0.0,F*0C\n' * 2)
+        heading = objects('$GPHDT,10.0,T*30\n')
+        merged = list(merge_streams([depth, heading]))
+
+        self.assertEqual([(0, None), (1, None), (0, None)],
+                         [(item.source, item.epoch) for item in merged])
+
+    def test_midnight(self):
+        first = objects('$GPGLL,1929.459,S,02410.381,E,235959.00,A*36\n'
+                        '$GPGLL,1929.459,S,02410.381,E,000001.00,A*3C\n')
+        second = objects('$GPGLL,1929.459,S,02410.381,E,235959.50,A*1B\n'
+                         '$GPGLL,1929.459,S,02410.381,E,000000.50,A*1A\n')
+        merged = list(merge_streams([first, second]))
+
+        self.assertEqual([86399.0, 86399.5, 86400.5, 86401.0],
+                         [item.epoch for item in merged])
+
+    def test_starts_after_midnight(self):
+        start = datetime.datetime(2010, 4, 21, 23, 59, 50)
+        gps = NMEAGenerator(seed=1, mix={'GPRMC': 1, 'GPGGA': 1},
+                            start=start).generate(2000)
+        # Untimed until its first timestamp, which is past midnight
+        heading = ('$GPHDT,10.0,T*30\n$GPDBT,0.0,f,0.0,M,0.0,F*0C\n'
+                   '$GPZDA,000005.00,22,04,2010,00,00*64\n'
+                   '$GPHDT,10.0,T*30\n'
+                   '$GPZDA,000006.00,22,04,2010,00,00*67\n')
+
+        merged = list(merge_streams([objects(gps), objects(heading)]))
+        epochs = [item.epoch for item in merged]
+        self.assertEqual(sorted(epochs), epochs)
+        self.assertEqual([86405.0] * 4 + [86406.0],
+                         [item.epoch for item in merged if item.source == 1])
+
+        # The same, however the sources are given
+        merged = list(merge_streams([objects(heading), objects(gps)]))
+        epochs = [item.epoch for item in merged]
+        self.assertEqual(sorted(epochs), epochs)
+        self.assertEqual(-10.0, merged[0].epoch)
@@ -0,0 +1,58 @@
+import os
+from unittest import TestCase
+
+from pynmea.parallel import chunk_offsets, parse_file_parallel
+from pynmea.streamer import NMEAStream
+
+
+def rmc_position(nmea_ob):
+    if nmea_ob.sen_type == 'GPRMC':
+        return nmea_ob.lat, nmea_ob.lon
+
+
+class TestParallel(TestCase):
+    test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                             'test_data.gps')
+
+    def setUp(self):
+        with open(self.test_file, 'r') as test_file_fd:
+            self.expected = list(NMEAStream(test_file_fd).iter_objects())
+
+    def assertSameObjects(self, expected, result):
+        self.assertEqual(len(expected), len(result))
+        for expected_ob, result_ob in zip(expected, result):
+            self.assertEqual(type(expected_ob), type(result_ob))
+            self.assertEqual(expected_ob.parts, result_ob.parts)
+            self.assertEqual(expected_ob.checksum, result_ob.checksum)
+
+    def test_chunk_offsets(self):
+        with open(self.test_file, 'rb') as test_file_fd:
+            data = test_file_fd.read()
+        offsets = chunk_offsets(self.test_file, chunk_size=500)
+
+        self.assertEqual(0, offsets[0][0])
+        self.assertEqual(len(data), offsets[-1][1])
+        for (start, end), (next_start, next_end) in zip(offsets,
+                                                        offsets[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(b'$', data[next_start:next_start + 1])
+
+    def test_parse_serial(self):
+        result = list(parse_file_parallel(self.test_file, workers=1,
+                                          chunk_size=500))
+        self.assertSameObjects(self.expected, result)
+
+    def test_parse_parallel(self):
+        result = list(parse_file_parallel(self.test_file, workers=2,
+                                          chunk_size=500))
+        self.assertSameObjects(self.expected, result)
+        self.assertEqual('1929.439', result[1].latitude)
+
+    def test_parse_parallel_func(self):
+        expected = [(ob.lat, ob.lon) for ob in self.expected
+                    if ob.sen_type == 'GPRMC']
+        for workers in (1, 2):
+            result = list(parse_file_parallel(self.test_file, workers=workers,
+                                              chunk_size=500,
+                                              func=rmc_position))
+            self.assertEqual(expected, result)
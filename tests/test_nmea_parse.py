@@ -1,11 +1,18 @@
+import copy
+import datetime
+import pickle
 import unittest
 
 from pynmea.nmea import (NMEASentence, GPAAM, GPALM, GPAPA, GPAPB, GPBEC, GPBOD,
                          GPBWC, GPBWR, GPBWW, GPDBT, GPGGA, GPGLL, GPGSA, GPGSV,
                          GPHDG, GPHDT, GPZDA, GPSTN, GPRMA, GPRMB, GPRMC, GPRTE,
                          GPR00, GPTRF, GPVBW, GPVTG, GPWCV, GPWNC, GPWPL, GPXTE,
-                         PGRME, PGRMZ, PGRMM)
-from pynmea.utils import checksum_calc
+                         PGRME, PGRMZ, PGRMM, SENTENCE_TYPES,
+                         _UTCZone, cached_attribute, get_sentence_class, parse,
+                         register_sentence)
+from pynmea.exceptions import UnknownSentenceTypeError
+from pynmea.utils import (checksum_calc, checksum_mask, checksum_value,
+                          verify_checksum)
 
 
 class TestNMEAParse(unittest.TestCase):
@@ -1314,3 +1321,388 @@ class TestUtils(unittest.TestCase):
         self.assertEquals(result5, '77')
         self.assertEquals(result6, '77')
         self.assertEquals(result7, '02')
+
+    def test_checksum_calc_bytes(self):
+        self.assertEqual('77', checksum_calc(b'$GPGLL,3751.65,S,14507.36,E*77'))
+        self.assertEqual('02', checksum_calc(bytearray(b'$GPHDT,227.66,T*02')))
+        self.assertEqual(0x77, checksum_value('GPGLL,3751.65,S,14507.36,E'))
+
+    def test_checksum_calc_long(self):
+        nmea_str = 'GPRTE,' + ','.join(['WPT%03d' % i for i in range(200)])
+        expected = 0
+        for char in nmea_str:
+            expected ^= ord(char)
+
+        self.assertEqual(expected, checksum_value(nmea_str))
+
+    def test_verify_checksum(self):
+        self.assertTrue(verify_checksum('$GPGLL,3751.65,S,14507.36,E*77'))
+        self.assertTrue(verify_checksum(b'$GPHDT,227.66,T*02\r\n'))
+        self.assertTrue(verify_checksum('GPGLL,3751.65,S,14507.36,E*77'))
+        self.assertFalse(verify_checksum('$GPGLL,3751.65,S,14507.36,W*77'))
+        self.assertFalse(verify_checksum('$GPGLL,3751.65,S,14507.36,E'))
+        self.assertFalse(verify_checksum('$GPGLL,3751.65,S,14507.36,E*'))
+        self.assertFalse(verify_checksum('$GPGLL,3751.65,S,14507.36,E*ZZ'))
+
+    def test_checksum_mask(self):
+        sentences = ['$GPGLL,3751.65,S,14507.36,E*77',
+                     '$GPGLL,3751.65,S,14507.36,W*77',
+                     '$GPHDT,227.66,T*02']
+        expected = [True, False, True]
+
+        self.assertEqual(expected, checksum_mask(sentences))
+        self.assertEqual(expected, checksum_mask('\n'.join(sentences)))
+        self.assertEqual(expected,
+                         checksum_mask('\r\n'.join(sentences).encode('ascii')))
+
+
+class TestRegistry(unittest.TestCase):
+    def test_parse_builds_registered_class(self):
+        p = parse("$GPGLL,3751.65,S,14507.36,E*77")
+
+        self.assertTrue(isinstance(p, GPGLL))
+        self.assertEqual("3751.65", p.lat)
+
+    def test_parse_unknown_type(self):
+        self.assertRaises(UnknownSentenceTypeError, parse, "$GPFOO,1,2,3*77")
+
+    def test_register_sentence(self):
+        class PGRMT(NMEASentence):
+            def __init__(self):
+                parse_map = (("Product, model and software version", "info"),)
+                super(PGRMT, self).__init__(parse_map)
+
+        register_sentence(PGRMT)
+        try:
+            self.assertTrue(get_sentence_class('PGRMT') is PGRMT)
+            p = parse("$PGRMT,GPS 16x-LVS Ver. 3.70")
+            self.assertEqual("GPS 16x-LVS Ver. 3.70", p.info)
+        finally:
+            del SENTENCE_TYPES['PGRMT']
+
+
+class TestCompiledParseMap(unittest.TestCase):
+    def test_fields_are_slots(self):
+        p = GPRMC()
+        p.parse("$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B")
+
+        self.assertFalse(hasattr(p, '__dict__'))
+        self.assertEqual(tuple(item[1] for item in GPRMC.parse_map),
+                         GPRMC._fields)
+        self.assertEqual(3, GPRMC._field_index['lat'])
+        self.assertEqual("1929.459", p.lat)
+
+    def test_parse_bytes_decodes_on_access(self):
+        p = GPRMC()
+        p.parse(b"$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B")
+
+        self.assertEqual("GPRMC", p.sen_type)
+        self.assertEqual("2B", p.checksum)
+        self.assertEqual(b"1929.459", p.parts[3])
+        self.assertEqual("1929.459", p.lat)
+        self.assertEqual("E", p.mag_var_dir)
+        self.assertTrue(p.check_chksum())
+
+    def test_parse_bytes_route(self):
+        p = parse(bytearray(b"$GPRTE,2,1,c,0,W3IWI,DRIVWY,32CEDR,32-29*6D"))
+
+        self.assertEqual("GPRTE", p.sen_type)
+        self.assertEqual("c", p.start_type)
+        self.assertEqual(["W3IWI", "DRIVWY", "32CEDR", "32-29"],
+                         p.waypoint_list)
+
+    def test_short_sentence_leaves_fields_unset(self):
+        p = GPGLL()
+        p.parse("$GPGLL,3751.65,S,14507.36,E*77")
+
+        self.assertEqual("E", p.lon_dir)
+        self.assertFalse(hasattr(p, 'timestamp'))
+
+    def test_checksum_found(self):
+        for sentence, checksum, last in (
+                ("$GPHDT,16.78,T*2b", "2b", "T"),
+                ("$GPHDT,16.78,T*2B\n", "2B", "T"),
+                ("$GPHDT,16.78,T*2G", None, "T*2G"),
+                ("$GPHDT,16.78,T*2", None, "T*2"),
+                ("$GPHDT,16.78,T*2B ", None, "T*2B "),
+                ("*2B", None, "*2B")):
+            p = NMEASentence(parse_map=())
+            p._parse(sentence)
+            self.assertEqual(checksum, getattr(p, 'checksum', None))
+            self.assertEqual(last, p.parts[-1])
+
+    def test_parse_lazy(self):
+        p = GPRMC()
+        p.parse("$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B", lazy=True)
+
+        self.assertEqual("GPRMC", p.sen_type)
+        # Not split up until something is used
+        self.assertRaises(AttributeError, GPRMC.parts.__get__, p)
+        self.assertEqual("1929.459", p.lat)
+        self.assertEqual("2B", p.checksum)
+        self.assertTrue(p.check_chksum())
+        self.assertEqual("E", p.mag_var_dir)
+        self.assertEqual("184332.07", GPRMC.timestamp.__get__(p))
+
+    def test_parse_lazy_bytes(self):
+        p = parse(b"$GPGLL,3751.65,S,14507.36,E*77", lazy=True)
+
+        self.assertEqual("GPGLL", p.sen_type)
+        self.assertEqual("E", p.lon_dir)
+        self.assertFalse(hasattr(p, 'timestamp'))
+        self.assertEqual("77", p.checksum)
+
+    def test_parse_lazy_no_checksum(self):
+        p = parse("$GPVTG,16.78,T,,M,74.00,N,137.05,K", lazy=True)
+
+        self.assertFalse(hasattr(p, 'checksum'))
+        self.assertEqual("137.05", p.spd_over_grnd_kmph)
+
+    def test_reparse_lazy_forgets_fields(self):
+        p = GPGLL()
+        p.parse("$GPGLL,3751.65,S,14507.36,E,184446.08,A*79")
+        p.parse("$GPGLL,3751.66,N,14507.36,E*64", lazy=True)
+
+        self.assertEqual("3751.66", p.lat)
+        self.assertFalse(hasattr(p, 'timestamp'))
+
+    def test_reparse_short_sentence(self):
+        p = GPGLL()
+        p.parse("$GPGLL,3751.65,S,14507.36,E,184446.08,A*79")
+        p.parse("$GPGLL,3751.66,N,14507.36,E")
+
+        self.assertEqual("3751.66", p.lat)
+        self.assertFalse(hasattr(p, 'timestamp'))
+        self.assertFalse(hasattr(p, 'checksum'))
+
+    def test_reparse_bytes(self):
+        p = GPGLL()
+        p.parse(b"$GPGLL,3751.65,S,14507.36,E,184446.08,A*79")
+        self.assertEqual("3751.65", p.lat)
+        p.parse(b"$GPGLL,3751.66,N,14507.36,E*64")
+
+        self.assertEqual("3751.66", p.lat)
+        self.assertEqual("64", p.checksum)
+        self.assertFalse(hasattr(p, 'timestamp'))
+
+    def test_reparse_fields(self):
+        p = GPRMC()
+        p.parse("$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B",
+                fields=('lat',))
+        p.parse("$GPRMC,184333.07,A,1929.460,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B",
+                fields=('timestamp',))
+
+        self.assertRaises(AttributeError, GPRMC.lat.__get__, p)
+        self.assertEqual("1929.460", p.lat)
+        self.assertEqual("184333.07", p.timestamp)
+
+    def test_parse_fields(self):
+        p = GPRMC()
+        p.parse("$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B",
+                fields=('lat', 'timestamp'))
+
+        self.assertEqual("GPRMC", p.sen_type)
+        self.assertEqual("1929.459", GPRMC.lat.__get__(p))
+        self.assertEqual("184332.07", GPRMC.timestamp.__get__(p))
+        self.assertRaises(AttributeError, GPRMC.lon.__get__, p)
+        self.assertRaises(AttributeError, GPRMC.parts.__get__, p)
+        # Anything else is parsed when it is used
+        self.assertEqual("E", p.mag_var_dir)
+        self.assertEqual("2B", p.checksum)
+
+    def test_parse_fields_last(self):
+        p = parse("$GPGLL,3751.65,S,14507.36,E,184446.08,A*79",
+                  fields={'GPGLL': ('data_valid', 'lat')})
+        self.assertEqual("A", GPGLL.data_valid.__get__(p))
+        self.assertEqual("3751.65", GPGLL.lat.__get__(p))
+
+        p = parse(b"$GPGLL,3751.65,S,14507.36,E*77",
+                  fields={'GPGLL': ('lon_dir', 'timestamp')})
+        self.assertEqual("E", GPGLL.lon_dir.__get__(p))
+        self.assertFalse(hasattr(p, 'timestamp'))
+        self.assertEqual(b"$GPGLL,3751.65,S,14507.36,E*77", p.nmea_sentence)
+        self.assertEqual("3751.65", p.lat)
+
+    def test_parse_fields_list(self):
+        p = parse("$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B",
+                  fields={'GPRMC': ['timestamp', 'lat']})
+        self.assertEqual("184332.07", GPRMC.timestamp.__get__(p))
+        self.assertEqual("1929.459", GPRMC.lat.__get__(p))
+        self.assertRaises(AttributeError, GPRMC.lon.__get__, p)
+
+        # And again, as the list of names has been seen before
+        p.parse("$GPRMC,184333.07,A,1929.460,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B",
+                fields=['timestamp', 'lat'])
+        self.assertEqual("184333.07", GPRMC.timestamp.__get__(p))
+        self.assertEqual("1929.460", GPRMC.lat.__get__(p))
+
+    def test_parse_fields_other_types(self):
+        p = parse("$GPVTG,16.78,T,,M,74.00,N,137.05,K",
+                  fields={'GPRMC': ('lat',)})
+        self.assertEqual("137.05", GPVTG.spd_over_grnd_kmph.__get__(p))
+
+    def test_parse_fields_unknown(self):
+        p = GPRMC()
+        self.assertRaises(ValueError, p.parse, "$GPRMC,184332.07,A*2B",
+                          fields=('latitude',))
+
+
+class TestRender(unittest.TestCase):
+    def test_round_trip(self):
+        for sentence in (
+                "$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B",
+                "$GPGLL,3751.65,S,14507.36,E*77",
+                "$GPRTE,2,1,c,0,W3IWI,DRIVWY,32CEDR,32-29*06",
+                "$GPR00,A,B,C*29"):
+            for nmea_str in (sentence, sentence.encode('ascii')):
+                self.assertEqual(sentence, parse(nmea_str).render())
+                self.assertEqual(sentence,
+                                 parse(nmea_str, lazy=True).render())
+
+    def test_changed_fields(self):
+        p = parse("$GPHDT,16.78,T*3D")
+        p.heading = 17.5
+        self.assertEqual("$GPHDT,17.5,T*06", p.render())
+        self.assertEqual("$GPHDT,17.5,T", p.render(checksum=False))
+
+    def test_new_object(self):
+        p = GPGLL()
+        p.lat, p.lat_dir = '3751.65', 'S'
+        p.timestamp = '184446.08'
+        self.assertEqual("$GPGLL,3751.65,S,,,184446.08", p.render(False))
+
+        p = GPRMC()
+        p.timestamp, p.data_validity = '184332.07', 'A'
+        self.assertEqual("$GPRMC,184332.07,A", p.render(False))
+
+    def test_new_object_registered_type(self):
+        class Heading(GPHDT):
+            pass
+        register_sentence(Heading, 'HEHDT')
+        try:
+            p = Heading()
+            p.heading, p.hdg_true = '16.78', 'T'
+            self.assertEqual("$HEHDT,16.78,T", p.render(False))
+        finally:
+            del SENTENCE_TYPES['HEHDT']
+
+    def test_new_ad_hoc(self):
+        p = NMEASentence(parse_map=(('Heading', 'heading'), ('True', 't')))
+        p.heading = '16.78'
+        self.assertRaises(ValueError, p.render)
+        p.sen_type = 'GPHDT'
+        self.assertEqual("$GPHDT,16.78", p.render(False))
+
+    def test_ad_hoc(self):
+        p = NMEASentence(parse_map=(('Heading', 'heading'), ('True', 't')))
+        p.parse("$GPHDT,16.78,T*3D")
+        self.assertEqual("$GPHDT,16.78,T*3D", p.render())
+
+
+class TestTypedAttributes(unittest.TestCase):
+    def test_gprmc(self):
+        p = parse("$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B")
+
+        self.assertAlmostEqual(-19.4909833, p.lat_degrees)
+        self.assertAlmostEqual(24.1730167, p.lon_degrees)
+        self.assertEqual(74.0, p.speed)
+        self.assertEqual(16.78, p.course)
+        utc = datetime.timezone.utc
+        self.assertEqual(datetime.time(18, 43, 32, 70000, tzinfo=utc),
+                         p.time)
+        self.assertEqual(datetime.datetime(2010, 4, 21, 18, 43, 32, 70000,
+                                           tzinfo=utc), p.datetime)
+
+    def test_worked_out_once(self):
+        p = parse("$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B")
+
+        self.assertRaises(AttributeError, GPRMC._cached_speed.__get__, p)
+        self.assertEqual(74.0, p.speed)
+        self.assertEqual(74.0, GPRMC._cached_speed.__get__(p))
+        self.assertTrue(p.speed is p.speed)
+
+    def test_parse_again_forgets(self):
+        p = GPRMC()
+        p.parse("$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B")
+        self.assertEqual(74.0, p.speed)
+        p.parse("$GPRMC,184332.07,A,1929.459,N,02410.381,W,12.5,16.78,210410,0.0,E,A*2B")
+        self.assertEqual(12.5, p.speed)
+        self.assertAlmostEqual(19.4909833, p.lat_degrees)
+        self.assertAlmostEqual(-24.1730167, p.lon_degrees)
+
+    def test_copies_after_parse_again(self):
+        p = GPRMC()
+        p.parse("$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,0.0,E,A*2B")
+        self.assertEqual(74.0, p.speed)
+        p.parse("$GPRMC,184332.07,A,1929.459,N,02410.381,W,12.5,16.78,210410,0.0,E,A*2B")
+
+        for copied in (pickle.loads(pickle.dumps(p)), copy.deepcopy(p),
+                       copy.copy(p)):
+            self.assertEqual(12.5, copied.speed)
+            self.assertAlmostEqual(19.4909833, copied.lat_degrees)
+
+    def test_utc_fallback(self):
+        utc = _UTCZone()
+        when = datetime.datetime(2010, 4, 21, 18, 43, 32, tzinfo=utc)
+        self.assertEqual(datetime.timedelta(0), when.utcoffset())
+        self.assertEqual('UTC', when.tzname())
+        self.assertEqual(when, datetime.datetime(2010, 4, 21, 18, 43, 32,
+                                                 tzinfo=datetime.timezone.utc))
+
+    def test_attribute_error_not_hidden(self):
+        class GPXXX(GPHDT):
+            broken = cached_attribute(lambda self: self.heading.missing)
+
+        p = GPXXX()
+        p.parse("$GPXXX,16.78,T")
+        try:
+            p.broken
+        except RuntimeError as exc:
+            self.assertTrue('broken' in str(exc))
+            self.assertTrue('missing' in str(exc))
+        else:
+            self.fail('No RuntimeError')
+
+    def test_empty_fields(self):
+        p = parse("$GPBEC,081837,,,,,,T,,M,,N,*13")
+
+        self.assertEqual(None, p.waypoint_lat_degrees)
+        self.assertEqual(None, p.bearing)
+        self.assertEqual(datetime.time(8, 18, 37,
+                                       tzinfo=datetime.timezone.utc), p.time)
+
+    def test_gpgga(self):
+        p = parse("$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47")
+
+        # The raw fields keep their names
+        self.assertEqual("4807.038", p.latitude)
+        self.assertAlmostEqual(48.1173, p.lat_degrees)
+        self.assertAlmostEqual(11.5166667, p.lon_degrees)
+        self.assertEqual(545.4, p.altitude)
+
+    def test_other_positions(self):
+        p = parse("$GPRMB,A,0.66,L,003,004,4917.24,N,12309.57,W,001.3,052.5,000.5,V*20")
+        self.assertAlmostEqual(49.287333, p.dest_lat_degrees, places=5)
+        self.assertAlmostEqual(-123.1595, p.dest_lon_degrees)
+        self.assertEqual(52.5, p.dest_bearing)
+        self.assertEqual(1.3, p.dest_distance)
+        self.assertEqual(0.5, p.dest_speed)
+
+        p = parse("$GPRMA,A,4630.129,N,147.372,W,,,12.2,5,7,N*51")
+        self.assertAlmostEqual(46.50215, p.lat_degrees)
+        self.assertAlmostEqual(-1.7895333, p.lon_degrees)
+        self.assertEqual(12.2, p.speed)
+        self.assertEqual(5.0, p.course)
+
+        p = parse("$GPTRF,121314.15,020112,123.321,N,0987.232,W,2.3,4.5,6.7,8.9,ABC")
+        self.assertEqual(datetime.datetime(2012, 1, 2, 12, 13, 14, 150000,
+                                           tzinfo=datetime.timezone.utc),
+                         p.datetime)
+
+        p = parse("$GPWPL,4917.16,N,12310.64,W,003*65")
+        self.assertAlmostEqual(49.286, p.lat_degrees)
+        self.assertAlmostEqual(-123.1773333, p.lon_degrees)
+
+        p = parse("$GPGLL,3751.65,S,14507.36,E*77")
+        self.assertAlmostEqual(-37.8608333, p.lat_degrees)
+        self.assertEqual(None, p.time)
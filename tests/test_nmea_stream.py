@@ -1,7 +1,10 @@
+import io
 import os
+import tempfile
 from unittest import TestCase
 
-from pynmea.streamer import NMEAStream
+from pynmea.exceptions import NoDataGivenError, UnknownSentenceTypeError
+from pynmea.streamer import MappedNMEAStream, NMEAStream
 from pynmea.nmea import GPRMC
 
 
@@ -90,6 +93,22 @@ $GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36
         sen_type = streamer._get_type(sentence)
         self.assertTrue(isinstance(sen_type(), GPRMC))
 
+    def test__get_type_unknown(self):
+        streamer = NMEAStream()
+        sentence = '$GPFOO,1,2,3*77'
+        self.assertRaises(UnknownSentenceTypeError, streamer._get_type,
+                          sentence)
+
+    def test_get_objects_skips_unknown(self):
+        data = """$GPFOO,1,2,3*77
+$GPGLL,1928.001,S,02410.820,E,184446.08,A,A*79
+"""
+        streamer = NMEAStream()
+        nmea_objects = streamer.get_objects(data=data)
+        nmea_objects += streamer.get_objects(data='')
+
+        self.assertEqual(['GPGLL'], [ob.sen_type for ob in nmea_objects])
+
     def test_read_data_obj(self):
         test_file = os.path.join(os.path.dirname(__file__), 'test_data',
                                  'test_data_small.gps')
@@ -173,4 +192,343 @@ $GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36
                            'GPGLL,1927.922,S,02410.844,E,184450.08,A,A*7B',
                            'GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36']
 
-        self.assertEqual(expected_result, nmea_objects)
\ No newline at end of file
+        self.assertEqual(expected_result, nmea_objects)
+
+class TestStreamIter(TestCase):
+    def test_iter_strings_file(self):
+        test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                                 'test_data_small.gps')
+        with open(test_file, 'r') as test_file_fd:
+            expected_result = NMEAStream()._split(test_file_fd.read())
+            test_file_fd.seek(0)
+            streamer = NMEAStream(stream_obj=test_file_fd)
+            data = list(streamer.iter_strings(size=50))
+            # Exhausted streams just stop
+            self.assertEqual([], list(streamer.iter_strings()))
+
+        self.assertEqual(expected_result, data)
+
+    def test_iter_strings_any_read_size(self):
+        test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                                 'test_data_small.gps')
+        with open(test_file, 'r') as test_file_fd:
+            expected_result = NMEAStream()._split(test_file_fd.read())
+
+            for size in range(1, 100):
+                test_file_fd.seek(0)
+                streamer = NMEAStream(stream_obj=test_file_fd)
+                data = list(streamer.iter_strings(size=size))
+                self.assertEqual(expected_result, data)
+
+    def test_iter_strings_data(self):
+        data = """$GPGLL,1928.001,S,02410.820,E,184446.08,A,A*79
+$GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36"""
+        streamer = NMEAStream()
+        result = list(streamer.iter_strings(data=data))
+
+        self.assertEqual(['GPGLL,1928.001,S,02410.820,E,184446.08,A,A*79',
+                          'GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36'], result)
+        self.assertEqual('', streamer.head)
+
+    def test_iter_strings_no_data(self):
+        streamer = NMEAStream()
+        self.assertRaises(NoDataGivenError, list, streamer.iter_strings())
+
+    def test_iter_objects(self):
+        test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                                 'test_data_small.gps')
+
+        with open(test_file, 'r') as test_file_fd:
+            streamer = NMEAStream(stream_obj=test_file_fd)
+            nmea_objects = streamer.iter_objects()
+            first = next(nmea_objects)
+            self.assertTrue(isinstance(first, GPRMC))
+            sen_types = [first.sen_type] + [ob.sen_type for ob in nmea_objects]
+
+        expected_object_types = ['GPRMC', 'GPGGA', 'GPRMC', 'GPGGA', 'GPGLL',
+                                 'GPVTG', 'GPRMC', 'GPGGA', 'GPGLL', 'GPVTG']
+        self.assertEqual(expected_object_types, sen_types)
+
+
+    def test_iter_objects_reuse(self):
+        test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                                 'test_data_small.gps')
+        with open(test_file, 'r') as test_file_fd:
+            data = test_file_fd.read()
+
+        for lazy in (False, True):
+            fresh = [(ob.sen_type, ob.parts, getattr(ob, 'checksum', None))
+                     for ob in NMEAStream().iter_objects(data=data)]
+            seen = {}
+            reused = []
+            for ob in NMEAStream(reuse=True, lazy=lazy).iter_objects(
+                    data=data):
+                self.assertTrue(seen.setdefault(ob.sen_type, ob) is ob)
+                reused.append((ob.sen_type, ob.parts,
+                               getattr(ob, 'checksum', None)))
+            self.assertEqual(fresh, reused)
+            self.assertEqual(4, len(seen))
+
+    def test_iter_objects_reuse_lists(self):
+        # GPRTE and GPR00 have parse methods of their own
+        data = ('$GPRTE,2,1,c,0,W1,W2*00\r\n'
+                '$GPRTE,2,2,c,0\r\n'
+                '$GPRTE,1,1,c,R1,W3\r\n'
+                '$GPRTE,1,1\r\n'
+                '$GPR00,A,B,C*00\r\n'
+                '$GPR00,D\r\n')
+        reused = self.assert_reuse_matches(data)
+        self.assertEqual(['0', 'R1', None],
+                         [row[6] for row in reused[1:4]])
+        self.assertEqual([None, None], [row[2] for row in reused[3:6:2]])
+
+    def test_iter_objects_reuse_bytes_fields(self):
+        data = (b'$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,'
+                b'210410,0.0,E,A*2B\r\n'
+                b'$GPRMC,184333.07,A\r\n')
+        # Only the checksum and the fields asked for are used, so the rest
+        # are never decoded
+        names = ('timestamp', 'lat')
+        reused = self.assert_reuse_matches(data, names,
+                                           fields={'GPRMC': names})
+        self.assertEqual(['184333.07', None], reused[1][3:])
+
+    def assert_reuse_matches(self, data, names=None, **options):
+        """ Check that objects reused by the stream end up the same as
+            fresh ones, and return what they had, as lists of sen_type,
+            parts, checksum and the fields in names (or all of them)
+        """
+        def state(ob):
+            # checksum first, to finish parsing anything parsed with fields
+            return [ob.sen_type, getattr(ob, 'checksum', None), ob.parts] + [
+                getattr(ob, name, None) for name in names or ob._fields]
+
+        fresh = [state(ob) for ob in
+                 NMEAStream(**options).iter_objects(data=data)]
+        reused = [state(ob) for ob in
+                  NMEAStream(reuse=True, **options).iter_objects(data=data)]
+        self.assertEqual(fresh, reused)
+        return [[row[0], row[2], row[1]] + row[3:] for row in reused]
+
+    def test_get_objects_not_reused(self):
+        streamer = NMEAStream(reuse=True)
+        data = ('$GPHDT,16.78,T*28\r\n$GPHDT,17.78,T*28\r\n')
+        first, second = streamer.get_objects(data=data) + \
+            streamer.get_objects(data='')
+        self.assertEqual(('16.78', '17.78'), (first.heading, second.heading))
+
+    def test_iter_objects_lazy(self):
+        test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                                 'test_data_small.gps')
+
+        with open(test_file, 'r') as test_file_fd:
+            data = test_file_fd.read()
+        eager = list(NMEAStream().iter_objects(data=data))
+        lazy = list(NMEAStream(lazy=True).iter_objects(data=data))
+
+        self.assertEqual([ob.sen_type for ob in eager],
+                         [ob.sen_type for ob in lazy])
+        for eager_ob, lazy_ob in zip(eager, lazy):
+            for name in eager_ob._fields:
+                self.assertEqual(getattr(eager_ob, name, None),
+                                 getattr(lazy_ob, name, None))
+
+
+class TestStreamBytes(TestCase):
+    def test_splits_bytes(self):
+        test_data = b'$foo,bar,baz*77NOTHING\r\n$Meep,wibble,123,321\r\n'
+        streamer = NMEAStream()
+        result = streamer._split(bytearray(test_data), separator=b'NOTHING')
+        self.assertEqual(result, [b'foo,bar,baz*77', b'Meep,wibble,123,321'])
+
+    def test_iter_strings_bytes(self):
+        test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                                 'test_data_small.gps')
+        with open(test_file, 'r') as test_file_fd:
+            expected_result = [line.strip()[1:].encode('ascii')
+                               for line in test_file_fd]
+
+        with open(test_file, 'rb') as test_file_fd:
+            streamer = NMEAStream(stream_obj=test_file_fd)
+            data = list(streamer.iter_strings(size=64))
+
+        self.assertEqual(expected_result, data)
+
+    def test_get_objects_bytes(self):
+        data = (b'$GPGLL,1928.001,S,02410.820,E,184446.08,A,A*79\r\n'
+                b'$GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36\r\n')
+        streamer = NMEAStream()
+        nmea_objects = streamer.get_objects(data=data)
+        nmea_objects += streamer.get_objects(data=b'')
+
+        self.assertEqual(['GPGLL', 'GPVTG'],
+                         [ob.sen_type for ob in nmea_objects])
+        self.assertEqual('1928.001', nmea_objects[0].lat)
+        self.assertEqual('', nmea_objects[1].mag_track)
+        self.assertTrue(nmea_objects[1].check_chksum())
+
+    def test_validate(self):
+        data = (b'$GPGLL,1928.001,S,02410.820,E,184446.08,A,A*79\r\n'
+                b'$GPGLL,1928.001,S,02410.820,W,184446.08,A,A*79\r\n'
+                b'$GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36\r\n')
+        streamer = NMEAStream(stream_obj=io.BytesIO(data), validate=True)
+        nmea_objects = list(streamer.iter_objects())
+
+        self.assertEqual(['GPGLL', 'GPVTG'],
+                         [ob.sen_type for ob in nmea_objects])
+        self.assertEqual('E', nmea_objects[0].lon_dir)
+
+
+class TestStreamFilter(TestCase):
+    data = ('$GPRMC,184332.07,A,1929.459,S,02410.381,E,74.00,16.78,210410,'
+            '0.0,E,A*2B\r\n'
+            '$GPGSV,3,1,11,03,03,111,00,04,15,270,00,06,01,010,00,13,06,'
+            '292,00*74\r\n'
+            '$GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1*39\r\n'
+            '$GPGGA,184332.07,1929.459,S,02410.381,E,1,04,2.8,100.00,M,'
+            '-33.9,M,,0000*67\r\n'
+            '$GPGSVX,1*00\r\n')
+
+    def test_include(self):
+        streamer = NMEAStream(include=('GPRMC', 'GPGGA'))
+        nmea_objects = list(streamer.iter_objects(data=self.data))
+        self.assertEqual(['GPRMC', 'GPGGA'],
+                         [ob.sen_type for ob in nmea_objects])
+
+    def test_exclude(self):
+        streamer = NMEAStream(exclude=['GPGSV'])
+        self.assertEqual(['GPRMC', 'GPGSA', 'GPGGA', 'GPGSVX'],
+                         [sentence.split(',')[0] for sentence
+                          in streamer.iter_strings(data=self.data)])
+
+    def test_include_and_exclude(self):
+        streamer = NMEAStream(include=('GPRMC', 'GPGGA'), exclude=('GPRMC',))
+        self.assertEqual(['GPGGA'], [ob.sen_type for ob in
+                                     streamer.get_objects(data=self.data) +
+                                     streamer.get_objects(data='')])
+
+    def test_fields(self):
+        streamer = NMEAStream(include=('GPRMC', 'GPGGA'),
+                              fields={'GPRMC': ['lat', 'lat_dir'],
+                                      'GPGGA': ['antenna_altitude']})
+        rmc, gga = streamer.iter_objects(data=self.data)
+        self.assertEqual(('1929.459', 'S'),
+                         (GPRMC.lat.__get__(rmc), GPRMC.lat_dir.__get__(rmc)))
+        self.assertRaises(AttributeError, GPRMC.lon.__get__, rmc)
+        self.assertEqual('100.00', gga.antenna_altitude)
+
+    def test_bytes(self):
+        streamer = NMEAStream(io.BytesIO(self.data.encode('ascii')),
+                              include=('GPGSA',))
+        self.assertEqual([b'GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1*39'],
+                         list(streamer.iter_strings(size=16)))
+
+    def test_mapped(self):
+        log_fd, path = tempfile.mkstemp()
+        os.write(log_fd, self.data.encode('ascii'))
+        os.close(log_fd)
+        try:
+            with MappedNMEAStream(path, exclude=('GPGSV', 'GPGSA'),
+                                  window=64) as streamer:
+                self.assertEqual(['GPRMC', 'GPGGA'],
+                                 [ob.sen_type for ob
+                                  in streamer.iter_objects()])
+        finally:
+            os.remove(path)
+
+
+class TestStreamFraming(TestCase):
+    sentence = '$GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36\n'
+
+    def test_garbage_is_capped_and_resynced(self):
+        data = self.sentence + 'x' * 100000 + self.sentence
+        streamer = NMEAStream(stream_obj=io.StringIO(data), max_sentence=256)
+        result = []
+        for sentence in streamer.iter_strings(size=64):
+            result.append(sentence)
+            self.assertTrue(len(streamer.head) <= 256)
+
+        self.assertEqual([self.sentence[1:-1]] * 2, result)
+        self.assertEqual(1, streamer.overflows)
+        # The newline after the first sentence and all of the garbage
+        self.assertEqual(100001, streamer.discarded)
+
+    def test_overflow_drop(self):
+        data = self.sentence + 'x' * 1000 + self.sentence
+        streamer = NMEAStream(stream_obj=io.BytesIO(data.encode('ascii')),
+                              max_sentence=100, overflow='drop')
+        result = list(streamer.iter_strings(size=64))
+
+        # The start of the first sentence is kept, and cleaned up as usual
+        self.assertEqual([self.sentence[1:-1].encode('ascii')] * 2, result)
+        self.assertEqual(len(self.sentence) + 1000 - 100, streamer.discarded)
+
+    def test_garbage_resync_no_sentence(self):
+        data = 'x' * 1000 + self.sentence
+        streamer = NMEAStream(stream_obj=io.StringIO(data), max_sentence=100)
+        result = list(streamer.iter_strings(size=64))
+
+        self.assertEqual([self.sentence[1:-1]], result)
+        self.assertEqual(1000, streamer.discarded)
+
+    def test_bad_overflow_policy(self):
+        self.assertRaises(ValueError, NMEAStream, overflow='explode')
+
+
+class TestMappedStream(TestCase):
+    test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                             'test_data.gps')
+
+    def setUp(self):
+        with open(self.test_file, 'rb') as test_file_fd:
+            self.expected_result = NMEAStream()._split(test_file_fd.read())
+
+    def test_iter_strings(self):
+        for window in (1, 50, 4096):
+            with MappedNMEAStream(self.test_file, window=window) as streamer:
+                data = list(streamer.iter_strings())
+
+            self.assertEqual(self.expected_result, data)
+
+    def test_get_strings(self):
+        with MappedNMEAStream(self.test_file) as streamer:
+            next_data = streamer.get_strings(size=100)
+            data = []
+            while next_data:
+                data += next_data
+                next_data = streamer.get_strings(size=100)
+
+        self.assertEqual(self.expected_result, data)
+
+    def test_get_objects(self):
+        with MappedNMEAStream(self.test_file) as streamer:
+            nmea_objects = streamer.get_objects(size=400)
+
+        self.assertEqual(['GPRMC', 'GPGGA', 'GPGLL', 'GPVTG'],
+                         [ob.sen_type for ob in nmea_objects[:4]])
+        self.assertEqual('1929.439', nmea_objects[1].latitude)
+
+    def test_empty_file(self):
+        empty_fd, path = tempfile.mkstemp()
+        os.close(empty_fd)
+        try:
+            with MappedNMEAStream(path) as streamer:
+                self.assertEqual([], streamer.get_strings())
+                self.assertEqual([], list(streamer.iter_objects()))
+        finally:
+            os.remove(path)
+
+    def test_long_junk(self):
+        sentence = b'$GPVTG,16.78,T,,M,74.00,N,137.05,K,A*36\r\n'
+        junk_fd, path = tempfile.mkstemp()
+        os.write(junk_fd, sentence + b'x' * 10000 + sentence)
+        os.close(junk_fd)
+        try:
+            with MappedNMEAStream(path, max_sentence=100,
+                                  window=512) as streamer:
+                data = list(streamer.iter_strings())
+                self.assertEqual([sentence[1:-2]] * 2, data)
+                self.assertEqual(1, streamer.overflows)
+                self.assertEqual(10002, streamer.discarded)
+        finally:
+            os.remove(path)
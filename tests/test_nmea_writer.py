@@ -0,0 +1,59 @@
+import io
+import os
+import socket
+from unittest import TestCase
+
+from pynmea.nmea import parse
+from pynmea.streamer import NMEAStream
+from pynmea.utils import verify_checksum
+from pynmea.writer import NMEAWriter
+
+
+class TestWriter(TestCase):
+    test_file = os.path.join(os.path.dirname(__file__), 'test_data',
+                             'test_data_small.gps')
+
+    def test_round_trip(self):
+        with open(self.test_file, 'r') as test_file_fd:
+            data = test_file_fd.read()
+        out = io.StringIO()
+        with NMEAWriter(out, line_ending='\n', batch=3) as writer:
+            writer.write_many(NMEAStream().iter_objects(data=data))
+
+        self.assertEqual(data, out.getvalue())
+        self.assertEqual(len(data.splitlines()), writer.written)
+
+    def test_batches(self):
+        out = io.StringIO()
+        writer = NMEAWriter(out, batch=2)
+        hdt = parse('$GPHDT,16.78,T*3D')
+        writer.write(hdt)
+        self.assertEqual('', out.getvalue())
+        writer.write(hdt)
+        self.assertEqual('$GPHDT,16.78,T*3D\r\n' * 2, out.getvalue())
+        writer.write(hdt)
+        writer.close()
+        self.assertEqual(3, writer.written)
+
+    def test_write_fields(self):
+        out = io.StringIO()
+        with NMEAWriter(out) as writer:
+            writer.write_fields('GPHDT', ['16.78', 'T'])
+            writer.write_fields('GPHDT', ['17.78', 'T'])
+            writer.write_fields('GPSTN', [])
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual('$GPHDT,16.78,T*3D', lines[0])
+        self.assertEqual('$GPSTN*5E', lines[2])
+        for line in lines:
+            self.assertTrue(verify_checksum(line))
+
+    def test_socket(self):
+        sender, receiver = socket.socketpair()
+        try:
+            with NMEAWriter(sender.makefile('wb'), binary=True) as writer:
+                writer.write_fields('GPHDT', ['16.78', 'T'])
+            self.assertEqual(b'$GPHDT,16.78,T*3D\r\n', receiver.recv(1024))
+        finally:
+            sender.close()
+            receiver.close()